@@ -42,8 +42,8 @@ def test2():
     m1.add_constraint(n3, ux=0, uy=0, ur=0) # fixed
     m1.solve() # Solve model
     print(m1.KG)
-    print(m1.U)
-    print(m1.NF)
+    print(m1.u.reshape(-1,m1.dof)) # (uy, ur) of each node
+    print(m1.reaction.reshape(-1,m1.dof)) # (fy, m) reactions
 
 
 if __name__ == '__main__':
@@ -38,7 +38,7 @@ def test3():
     m1.add_constraint(n3, ux=0, uy=0) # fixed
     m1.solve() # Solve model
     print(m1.KG)
-    print(m1.U)
+    print(m1.u.reshape(-1,m1.dof)) # (uy, ur) of each node
 
 
 if __name__ == '__main__':
@@ -34,14 +34,11 @@ for elm in elementos: m.add_element(elm)
 minx = min(x)
 maxx = max(x)
 
-nnf = len([node for node in nodos if node.x==maxx])
+nnf = np.count_nonzero(x == maxx)
 F = (6000./nnf)
 
-for node in nodos:
-    if node.x == minx:
-        m.add_constraint(node, ux=0, uy=0)
-    if node.x == maxx:
-        m.add_force(node, (F,0))
+m.add_constraints(x == minx, ux=0, uy=0)
+m.add_forces(x == maxx, F, 0)
 
 m.plot_model()
 m.solve()
@@ -13,6 +13,9 @@ __email__ = "delossantosmfq@gmail.com"
 from .core import *
 from .element import *
 from .model import *
+from .superelement import *
+from .cache import *
+from .batch import *
 from ._experimental import *
 from .mesh import *
 from .io import *
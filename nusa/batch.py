@@ -0,0 +1,165 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Batched solution of many small independent models.
+
+For models with tens of DOFs the Python overhead of :meth:`solve`
+(assembly, reduction, factorization, one model at a time) dwarfs the
+arithmetic. :func:`solve_batch` groups the models by size, assembles
+each group as a (batch, n, n) stack with one call to the batch
+stiffness of its element class (``get_batch_stiffness``) and solves it
+with a single :func:`numpy.linalg.solve`::
+
+    models = [make_truss(h) for h in heights]
+    solve_batch(models)
+    print(models[0].u)
+
+:func:`solve_stack` is the array-level solver behind it, for stacks
+assembled by other means.
+"""
+import numpy as np
+import numpy.linalg as la
+
+from .core import ASSEMBLY_STATES
+
+
+def solve_stack(K,f,u=None,known=None):
+    """
+    Solve a stack of systems K u = f with prescribed displacements.
+
+    *K* : ndarray
+        (batch, n, n) global matrices
+    *f* : ndarray
+        (batch, n) loads
+    *u* : ndarray
+        (batch, n) displacements, only the prescribed ones are used
+        (default: zero)
+    *known* : ndarray
+        (batch, n) bool, True for prescribed DOFs (default: none)
+
+    Rows and columns of the prescribed DOFs are replaced by the
+    identity (K_fk u_k moves to the right-hand side), so systems with
+    different supports share the same stack and the same solve.
+
+    Returns the (batch, n) displacements and reactions (zero at free
+    DOFs), raises :class:`numpy.linalg.LinAlgError` if a system is
+    singular.
+    """
+    K = np.asarray(K, dtype=float)
+    f = np.asarray(f, dtype=float)
+    known = np.zeros(f.shape, dtype=bool) if known is None else np.asarray(known, dtype=bool)
+    uk = np.zeros(f.shape) if u is None else np.where(known, u, 0.0)
+    free = ~known
+    rhs = np.where(known, uk, f - np.einsum("bij,bj->bi", K, uk))
+    A = K*(free[:,:,None] & free[:,None,:])
+    idx = np.arange(K.shape[1])
+    A[:,idx,idx] += known
+    U = la.solve(A, rhs[:,:,None])[:,:,0]
+    R = np.einsum("bij,bj->bi", K, U) - f
+    R[free] = 0.0
+    return U, R
+
+
+def _batch_signature(model):
+    """
+    Element class, numbers of nodes and elements and nodes per element
+    of a model that can be assembled in a batch, else None
+    """
+    elements = model.get_elements()
+    classes = set(type(elm) for elm in elements)
+    if len(classes) != 1 or model.stiffness_cache is not None:
+        return None
+    cls = classes.pop()
+    if not hasattr(cls, "get_batch_stiffness"):
+        return None
+    nen = len(next(iter(elements)).get_nodes())
+    return (cls, model.dof, model.get_number_of_nodes(), len(elements), nen)
+
+
+def _assemble_stack(models,cls):
+    """
+    (batch, n, n) global matrices of models with the same signature
+    (see :func:`_batch_signature`), all the elements at once
+    """
+    X = np.array([m.get_coordinates() for m in models])
+    EC = np.array([[[nd.label for nd in elm.get_nodes()] for elm in m.get_elements()]
+                   for m in models])
+    props = [np.array([[getattr(elm,name) for elm in m.get_elements()] for m in models], dtype=float)
+             for name in cls._properties]
+    batch, ne, nen = EC.shape
+    dofmap = models[0].dofmap
+    n = dofmap.size
+    XE = X[np.arange(batch)[:,None,None], EC].reshape(batch*ne, nen, 2)
+    KE = cls.get_batch_stiffness(XE, *[p.ravel() for p in props])
+    edofs = dofmap[EC].reshape(batch, ne, -1)
+    keys = (np.arange(batch)[:,None,None,None]*n + edofs[:,:,:,None])*n + edofs[:,:,None,:]
+    return np.bincount(keys.ravel(), weights=KE.ravel(), minlength=batch*n*n).reshape(batch,n,n)
+
+
+def solve_batch(models):
+    """
+    Solve many small independent models at once.
+
+    *models* : sequence of :class:`~nusa.core.Model`
+
+    Models with the same element class and numbers of nodes and
+    elements are assembled together (see :func:`_assemble_stack`);
+    models already assembled reuse their KG. Each group of equal size
+    is then solved by :func:`solve_stack` and displacements and
+    reactions are stored in the models as :meth:`solve` does.
+
+    Models with a sparse, matrix-free or out-of-core KG (e.g.
+    LinearTriangleModel) are solved one by one with :meth:`solve`.
+
+    Raises :class:`numpy.linalg.LinAlgError` with the name of the
+    model if one is singular.
+    """
+    groups = {}
+    for m in models:
+        if m.sparse_matrix or m.matrix_free or m.out_of_core:
+            m.solve()
+            continue
+        m._check_dof_map()
+        if m.IS_KG_BUILDED and m._KG_mode == (False, None) and not m._dirty.intersection(ASSEMBLY_STATES):
+            key = (m.dofmap.size, None)
+        else:
+            key = (m.dofmap.size, _batch_signature(m))
+        groups.setdefault(key, []).append(m)
+
+    for (n,signature),group in groups.items():
+        if signature is not None:
+            K = _assemble_stack(group, signature[0])
+        else:
+            for m in group:
+                if not m.IS_KG_BUILDED or m._dirty.intersection(ASSEMBLY_STATES):
+                    m.build_global_matrix()
+            K = np.array([m.KG for m in group]).reshape(len(group), n, n)
+        f = np.array([m.f for m in group]).reshape(len(group), n)
+        u = np.array([m.u for m in group]).reshape(len(group), n)
+        known = np.array([m._known for m in group]).reshape(len(group), n)
+        try:
+            U, R = solve_stack(K, f, u, known)
+        except la.LinAlgError:
+            for b,m in enumerate(group):
+                try:
+                    solve_stack(K[b:b+1], f[b:b+1], u[b:b+1], known[b:b+1])
+                except la.LinAlgError:
+                    raise la.LinAlgError("Singular matrix (model {0!r})".format(m.name))
+            raise
+        for b,m in enumerate(group):
+            if signature is not None:
+                m.KG = K[b]
+                m._KG_mode = (False, None)
+                m._finish_assembly()
+            m.u[:] = U[b]
+            m.reaction = R[b]
+            m._dirty.clear()
+            m.profile.start_solve()
+
+
+if __name__=='__main__':
+    pass
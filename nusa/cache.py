@@ -0,0 +1,270 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Element stiffness deduplication and on-disk result memoization.
+
+Lattice trusses, beam chains and structured meshes have many elements
+with the same shape, orientation and properties, hence the same
+stiffness matrix. A :class:`StiffnessCache` attached to a model
+(``model.stiffness_cache``) computes that matrix once and shares it
+among all the identical elements during assembly.
+
+Example ::
+
+    m = TrussModel("Tower")
+    m.stiffness_cache = StiffnessCache(maxsize=512)
+    ...
+    m.solve()
+    print(m.stiffness_cache.stats)
+
+A :class:`ResultCache` stores the displacements and reactions of solved
+models keyed by their fingerprint (see
+:meth:`~nusa.core.Model.fingerprint`), so unchanged models are not
+solved again across runs::
+
+    m.solve(cache_dir="~/.cache/nusa")
+"""
+import os
+import hashlib
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+
+
+class StiffnessCache(object):
+    """
+    LRU cache of element stiffness matrices.
+
+    *maxsize* : int
+        Maximum number of distinct matrices kept (least recently used
+        are discarded first)
+    *digits* : int
+        Significant digits of the element shape in the signature,
+        elements that only differ by round-off share their matrix
+
+    The signature of an element is its type, the values of its
+    stiffness parameters (``_properties``: E, A, I...) and the nodal
+    coordinates relative to its first node. Stiffness is invariant to
+    translation, so the relative coordinates capture everything that
+    matters: length and direction cosines of bars, trusses and beams,
+    shape of triangles. Elements without stiffness parameters
+    (e.g. superelements) are not cached.
+
+    Cached matrices are shared: don't modify them in place.
+    """
+    def __init__(self,maxsize=1024,digits=10):
+        self.maxsize = maxsize
+        self.digits = digits
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def signature(self,element):
+        """
+        Hashable signature of *element*, None if it can't be cached
+        """
+        if not element._properties:
+            return None
+        nodes = element.get_nodes()
+        x0, y0 = nodes[0].x, nodes[0].y
+        d = [c for nd in nodes[1:] for c in (nd.x - x0, nd.y - y0)]
+        h = max([abs(c) for c in d]) if d else 0.0
+        if h > 0:
+            scale = 10**self.digits/h
+            shape = tuple([round(c*scale) for c in d])
+            h = float("{0:.{1}g}".format(h, self.digits))
+        else:
+            shape = ()
+        props = tuple([getattr(element,name) for name in element._properties])
+        return (type(element), props, h, shape)
+
+    def get_element_stiffness(self,element):
+        """
+        Stiffness matrix of *element*, computed only if no identical
+        element has been seen before
+        """
+        key = self.signature(element)
+        if key is None:
+            return element.get_element_stiffness()
+        ke = self._data.get(key)
+        if ke is None:
+            self.misses += 1
+            ke = element.get_element_stiffness()
+            self._data[key] = ke
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+        return ke
+
+    def get_batch_stiffness(self,cls,X,*props):
+        """
+        Stiffness matrices of many elements of class *cls* at once.
+
+        *X* : ndarray
+            (ne, nen, 2) nodal coordinates of the elements
+        *props* : ndarray
+            (ne,) values of each stiffness parameter (``cls._properties``)
+
+        Identical elements are found by sorting their quantized
+        signatures (the same as :meth:`signature`), and the
+        batch kernel of the class (``get_batch_stiffness``) computes only
+        the distinct matrices that are not cached yet. Returns a
+        (ne, k, k) array.
+        """
+        ne = X.shape[0]
+        props = [np.asarray(p, dtype=float) for p in props]
+        d = (X[:,1:] - X[:,:1]).reshape(ne,-1)
+        h = np.abs(d).max(axis=1) if d.shape[1] else np.zeros(ne)
+        scale = np.divide(10.0**self.digits, h, out=np.zeros(ne), where=h>0)
+        rows = np.column_stack(props + [h, np.round(d*scale[:,None])])
+        order = np.lexsort(rows.T[::-1]) # unique rows (faster than np.unique(axis=0))
+        rows = rows[order]
+        new = np.concatenate(([True], np.any(rows[1:] != rows[:-1], axis=1)))
+        inv = np.empty(ne, dtype=np.int64)
+        inv[order] = np.cumsum(new) - 1
+        rows, first = rows[new], order[new]
+        npr = len(props)
+        keys = OrderedDict() # signature: slot
+        first_of = [] # representative element of each slot
+        slots = np.empty(len(rows), dtype=np.int64)
+        for k,row in enumerate(rows):
+            h = float("{0:.{1}g}".format(row[npr], self.digits)) if row[npr] > 0 else 0.0
+            shape = tuple([int(c) for c in row[npr+1:]]) if h > 0 else ()
+            key = (cls, tuple(row[:npr].tolist()), h, shape)
+            if key not in keys:
+                keys[key] = len(keys)
+                first_of.append(first[k])
+            slots[k] = keys[key]
+        missing = [key for key in keys if key not in self._data]
+        if missing:
+            idx = np.array([first_of[keys[key]] for key in missing])
+            for key,ke in zip(missing, cls.get_batch_stiffness(X[idx], *[p[idx] for p in props])):
+                self._data[key] = ke
+        for key in keys:
+            self._data.move_to_end(key)
+        KU = np.array([self._data[key] for key in keys])
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        self.misses += len(missing)
+        self.hits += ne - len(missing)
+        return KU[slots[inv]]
+
+    def clear(self):
+        """
+        Discard the cached matrices and reset the statistics
+        """
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self):
+        """
+        Hits, misses, hit rate and current/maximum size
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits/total if total else 0.0,
+                "size": len(self._data), "maxsize": self.maxsize}
+
+    def __len__(self):
+        return len(self._data)
+
+
+
+class ResultCache(object):
+    """
+    Size-bounded LRU cache of solutions on disk.
+
+    *directory* : str
+        Cache directory (created if needed), one ``<key>.npz`` file
+        per solution
+    *max_bytes* : int
+        Maximum total size of the files, the least recently used are
+        deleted first
+
+    Each file stores a checksum of its arrays, files that fail the
+    check (truncated, modified) are discarded.
+    """
+    def __init__(self,directory,max_bytes=2**30):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+
+    def _fname(self,key):
+        return os.path.join(self.directory, key + ".npz")
+
+    @staticmethod
+    def checksum(*arrays):
+        h = hashlib.blake2b(digest_size=16)
+        for arr in arrays:
+            h.update(np.ascontiguousarray(arr).tobytes())
+        return h.hexdigest()
+
+    def get(self,key):
+        """
+        Displacements and reactions stored for *key*, or None
+        """
+        fname = self._fname(key)
+        if not os.path.isfile(fname):
+            return None
+        try:
+            with np.load(fname) as data:
+                u, reaction = data["u"], data["reaction"]
+                valid = str(data["key"]) == key and str(data["checksum"]) == self.checksum(u, reaction)
+        except Exception: # unreadable file
+            valid = False
+        try:
+            if valid:
+                os.utime(fname) # most recently used
+            else:
+                os.remove(fname)
+        except FileNotFoundError: # removed by another process
+            pass
+        return (u, reaction) if valid else None
+
+    def put(self,key,u,reaction):
+        """
+        Store a solution (the oldest ones are evicted if the cache
+        exceeds max_bytes)
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd,"wb") as fobj:
+            np.savez(fobj, key=key, u=u, reaction=reaction,
+                     checksum=self.checksum(u, reaction))
+        os.replace(tmp, self._fname(key))
+        self.evict()
+
+    def evict(self):
+        """
+        Delete least recently used files until the cache fits in max_bytes
+        """
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                try:
+                    st = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError: # evicted by another process
+                    continue
+                files.append((st.st_mtime, st.st_size, name))
+        total = sum(size for mtime,size,name in files)
+        for mtime,size,name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+if __name__=='__main__':
+    pass
@@ -0,0 +1,142 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Command-line interface (``nusa`` console script)::
+
+    $ nusa run "models/*.nusa" --workers 8 --format npz --profile
+    $ nusa serve --port 8642 --workers 4
+
+``nusa run`` solves .nusa models (see :func:`~nusa.io.load_model`) in
+parallel and writes the results of each model next to it, or to
+``--output-dir``; with ``--profile`` it prints one JSON line per model
+with the time of each phase (read, assembly, ..., write).
+"""
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_model(fname,output,format="npz",location="nodes",fields=None):
+    """
+    Read, solve and export the results of a .nusa model.
+
+    Returns a dict with the model and output filenames, number of DOFs
+    and the time of each phase (``read`` and ``write`` plus those of
+    :attr:`~nusa.core.Model.profile`), or the error message if the
+    model fails.
+    """
+    from .io import load_model
+    record = {"model": fname, "output": output}
+    try:
+        t0 = time.perf_counter()
+        m = load_model(fname)
+        t1 = time.perf_counter()
+        m.solve()
+        t2 = time.perf_counter()
+        m.export_results(output, fields, format, location)
+        t3 = time.perf_counter()
+    except Exception as e:
+        record["error"] = "{0}: {1}".format(type(e).__name__, e)
+        return record
+    phases = dict(read=t1-t0)
+    phases.update((name,rec["time"]) for name,rec in m.profile.phases.items())
+    phases["write"] = t3-t2
+    record.update(dofs=int(m.dofmap.size), total_time=t3-t0, phases=phases)
+    return record
+
+
+def _run_job(args):
+    return run_model(*args)
+
+
+def _run(args):
+    files, seen = [], set()
+    for pattern in args.models:
+        for fname in sorted(glob.glob(pattern, recursive=True)) or [pattern]:
+            if fname not in seen:
+                seen.add(fname)
+                files.append(fname)
+    jobs = []
+    for fname in files:
+        root = os.path.splitext(os.path.basename(fname))[0] + "." + args.format
+        output = os.path.join(args.output_dir or os.path.dirname(fname), root)
+        jobs.append((fname, output, args.format, args.location, args.fields))
+    if args.output_dir and not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs)) or 1
+    failed = 0
+    if workers == 1:
+        records = map(_run_job, jobs)
+        pool = None
+    else: # one worker process per core, models are sent in chunks
+        pool = ProcessPoolExecutor(workers)
+        records = pool.map(_run_job, jobs, chunksize=max(1, len(jobs)//(8*workers)))
+    try:
+        for record in records:
+            if "error" in record:
+                failed += 1
+                print("{0}: {1}".format(record["model"], record["error"]), file=sys.stderr)
+            elif args.profile:
+                print(json.dumps(record))
+            elif not args.quiet:
+                print("{0} -> {1}".format(record["model"], record["output"]))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return 1 if failed else 0
+
+
+def _serve(args):
+    from .server import serve
+    serve(args.host, args.port, args.unix, args.workers, args.cache_size, args.window/1000.0)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="nusa", description="Numerical Structural Analysis")
+    commands = parser.add_subparsers(dest="command")
+
+    p = commands.add_parser("run", help="solve .nusa model files and export their results")
+    p.add_argument("models", nargs="+", help="model files or glob patterns (e.g. 'models/**/*.nusa')")
+    p.add_argument("-o", "--output-dir", help="results directory (default: next to each model)")
+    p.add_argument("-w", "--workers", type=int, help="worker processes (default: number of CPUs)")
+    p.add_argument("-f", "--format", choices=["npz","csv","parquet"], default="npz",
+                   help="results format (default: %(default)s)")
+    p.add_argument("--location", choices=["nodes","elements"], default="nodes",
+                   help="nodal or element results (default: %(default)s)")
+    p.add_argument("--fields", type=lambda s: s.split(","),
+                   help="comma-separated results (default: all, see Model.export_results)")
+    p.add_argument("--profile", action="store_true",
+                   help="print the time of each phase, one JSON line per model")
+    p.add_argument("-q", "--quiet", action="store_true", help="only report errors")
+    p.set_defaults(func=_run)
+
+    p = commands.add_parser("serve", help="solve .nusa models sent over HTTP (see nusa.server)")
+    p.add_argument("--host", default="127.0.0.1", help="address (default: %(default)s)")
+    p.add_argument("--port", type=int, default=8642, help="port (default: %(default)s)")
+    p.add_argument("--unix", metavar="PATH", help="serve on a Unix socket instead")
+    p.add_argument("--workers", type=int, help="worker processes (default: number of CPUs)")
+    p.add_argument("--cache-size", type=int, default=32,
+                   help="models kept factorized per worker (default: %(default)s)")
+    p.add_argument("--window", type=float, default=2.0,
+                   help="coalescing window in ms (default: %(default)s)")
+    p.set_defaults(func=_serve)
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+    return args.func(args)
+
+
+if __name__=='__main__':
+    sys.exit(main())
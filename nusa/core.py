@@ -4,7 +4,53 @@
 #  Blog: numython.github.io
 #  License: MIT License
 # ***********************************
+import os
+import hashlib
 import numpy as np
+import numpy.linalg as la
+import scipy.linalg as sla
+import scipy.sparse as sparse
+import scipy.sparse.linalg as spla
+from scipy.spatial import cKDTree
+from .profiling import ModelProfile
+
+# Aliases used by plot_nsol/plot_esol -> Node/Element attributes
+SOLUTION_ALIASES = {"sxx":"sx", "syy":"sy", "exx":"ex", "eyy":"ey"}
+
+# Kinds of changes tracked by models (see Model.mark_dirty)
+DIRTY_STATES = ("topology","geometry","properties","constraints","loads")
+# Changes that require a new global matrix
+ASSEMBLY_STATES = ("topology","geometry","properties")
+
+# Model attributes derived from others, not pickled (see Model.__getstate__)
+MODEL_DERIVED = ("_pattern","_pattern_KG","_factor","_ordering","K2S","_Kuk","F2S","solved_u")
+
+# Batch stiffness kernels by element class (see register_kernel)
+ELEMENT_KERNELS = {}
+
+def register_kernel(element_class):
+    """
+    Decorator that registers a batch stiffness kernel for
+    *element_class*, used by :meth:`Model.build_global_matrix`.
+
+    The kernel is called as ``kernel(model, elements)`` with a list of
+    elements of that class (all of them belong to *model*) and returns
+    their stiffness matrices, an (ne, k, k) array. Properties can be
+    gathered from the elements and the geometry read from
+    :meth:`Model.get_element_geometry`.
+
+    Example ::
+
+        @register_kernel(Spring)
+        def spring_kernel(model, elements):
+            k = np.array([elm.k for elm in elements])
+            return k[:,None,None]*np.array([[1,-1],[-1,1]])
+    """
+    def decorator(kernel):
+        ELEMENT_KERNELS[element_class] = kernel
+        return kernel
+    return decorator
+
 
 #~ ===========================  MODEL  ===========================
 class Model(object):
@@ -14,6 +60,13 @@ class Model(object):
     This class serves as a base container to manage nodes and elements,
     allowing derived models to build and manipulate FEA structures. 
     """
+    sparse_matrix = False # KG as a scipy.sparse CSR matrix (else dense)
+    matrix_free = False # False, "cached" or "onthefly" (see solve)
+    out_of_core = None # Directory of the on-disk KG (see solve)
+    memory_limit = 256*2**20 # Memory budget of the out-of-core assembly [bytes]
+    cg_tol = 1e-10 # Relative tolerance of the iterative solver
+    result_cache_size = 2**30 # Maximum size of solve(cache_dir=...) [bytes]
+
     def __init__(self,name,mtype):
         """
         Initialize a new FEA model.
@@ -29,6 +82,26 @@ class Model(object):
         self.name = name # Name 
         self.nodes = {} # Dictionary for nodes {number: NodeObject}
         self.elements = {} # Dictionary for elements {number: ElementObject}
+        self.profile = ModelProfile() # Phase timings (see nusa.profiling)
+        self.dof_names = () # Nodal DOFs, in equation order (e.g. ("ux","uy"))
+        self.force_names = () # Nodal forces conjugated to dof_names
+        self.dofmap = None # (nodes, dof) array: node label x dof -> equation
+        self.u = None # Displacements (prescribed and solved)
+        self.f = None # Applied loads
+        self.reaction = None # Support reactions
+        self._known = None # True for prescribed displacements
+        self.IS_KG_BUILDED = False
+        self._dirty = set(["topology"]) # Changes since the last solution
+        self._factor = None # Solve function of the factorized K2S
+        self._solver = None # Name of the solver (see profile)
+        self._pattern = None # Symbolic assembly (see _build_pattern)
+        self._pattern_KG = None
+        self._ordering = None # Reusable fill-reducing ordering (see _factorize)
+        self._KG_mode = (False, None) # (matrix_free, out_of_core) of KG
+        self._geometry = {} # Objects derived from the coordinates (KD-tree...)
+        self.stiffness_cache = None # Shared element matrices (see nusa.cache)
+        self._nodal_fields = () # Results exported by default (export_results)
+        self._element_fields = ()
         
     def add_node(self,node):
         """
@@ -47,6 +120,8 @@ class Model(object):
         if node.label is "":
             node.set_label(current_label)
         self.nodes[node.label] = node
+        node._model = self
+        self.mark_dirty("topology")
         
     def add_element(self,element):
         """
@@ -77,6 +152,8 @@ class Model(object):
         if element.label is "":
             element.set_label(current_label)
         self.elements[element.label] = element
+        element._model = self
+        self.mark_dirty("topology")
         # Assign this element to "xxxx" 
         for node in element.get_nodes():
             node._elements.append(element)
@@ -155,139 +232,1213 @@ class Model(object):
             f"Elements: {self.get_number_of_elements()}"
         )
 
-    def simple_report(self,report_type="print",fname="nusa_rpt.txt"):
+    def build_dof_map(self):
         """
-        Placeholder for a future implementation of a simple report.
+        Build the DOF map and the (empty) displacements, loads and
+        reactions arrays.
+
+        ``dofmap[i,k]`` is the equation of the k-th DOF (see
+        ``dof_names``) of the node with label i. ``u``, ``f`` and
+        ``reaction`` are contiguous arrays indexed by equation; the
+        nodal attributes (``node.ux``, ``node.fx``...) are views onto
+        them.
+        """
+        n = self.get_number_of_nodes()
+        u, f, known = self.u, self.f, self._known
+        self.dofmap = np.arange(n*self.dof).reshape(n,self.dof)
+        self.build_forces_vector()
+        self.build_displacements_vector()
+        if u is not None: # Keep loads and constraints of the existing DOFs
+            k = min(len(u), self.dofmap.size)
+            self.u[:k], self.f[:k], self._known[:k] = u[:k], f[:k], known[:k]
+
+    def _check_dof_map(self):
+        """
+        Build (or extend) the DOF map if nodes were added
+        """
+        if self.dofmap is None or len(self.dofmap) != self.get_number_of_nodes():
+            self.build_dof_map()
+
+    def build_forces_vector(self):
+        """
+        Reset the applied loads and the reactions
+        """
+        self.f = np.zeros(self.dofmap.size)
+        self.reaction = np.zeros(self.dofmap.size)
+        self.mark_dirty("loads")
+
+    def build_displacements_vector(self):
+        """
+        Reset the displacements (all of them unknown)
+        """
+        self.u = np.full(self.dofmap.size, np.nan)
+        self._known = np.zeros(self.dofmap.size, dtype=bool)
+        self.mark_dirty("constraints")
+
+    def get_dof(self,node,name):
+        """
+        Return the equation number of the DOF *name* of *node*.
 
         Parameters
         ----------
-        report_type : str, optional
-            Type of report to generate ('print', 'file', etc.).
-        fname : str, optional
-            Output filename for file-based reports.
+        node : :class:`~nusa.core.Node` or int
+            Node (or node label).
+        name : str
+            DOF ('ux', 'uy', 'ur') or its force ('fx', 'fy', 'm').
+
+        Returns
+        -------
+        int or None
+            None if the model has no such DOF.
+        """
+        label = getattr(node,"label",node)
+        if name in self.dof_names:
+            k = self.dof_names.index(name)
+        elif name in self.force_names:
+            k = self.force_names.index(name)
+        else:
+            return None
+        if self.dofmap is None or not (0 <= label < len(self.dofmap)):
+            return None
+        return self.dofmap[label,k]
+
+    def _get_nodal_value(self,label,name):
+        """
+        Value of a nodal quantity stored in u/f/reaction (None if the
+        model does not store it).
+        """
+        eq = self.get_dof(label,name)
+        if eq is None:
+            return None
+        if name in self.dof_names:
+            return self.u[eq]
+        return self.f[eq] + self.reaction[eq]
+
+    def _set_nodal_value(self,label,name,val):
+        """
+        Store a nodal quantity in u (prescribed value, NaN -> unknown)
+        or f (applied load). Returns False if the model does not store it.
+        """
+        eq = self.get_dof(label,name)
+        if eq is None:
+            return False
+        if name in self.dof_names:
+            known = not np.isnan(val)
+            # A new set of unknowns needs a new factorization, a new
+            # prescribed value only changes the right-hand side
+            self.mark_dirty("constraints" if known != self._known[eq] else "loads")
+            self.u[eq] = val
+            self._known[eq] = known
+        else:
+            self.f[eq] = val
+            self.reaction[eq] = 0.0
+            self.mark_dirty("loads")
+        return True
+
+    def get_node_indices(self,nodes):
+        """
+        Return node labels as an integer array.
+
+        Parameters
+        ----------
+        nodes : array_like
+            Node labels (int array), a boolean mask over all nodes, or a
+            sequence of :class:`~nusa.core.Node` objects.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        idx = np.asarray(nodes)
+        if idx.dtype == bool:
+            if idx.shape != (self.get_number_of_nodes(),):
+                raise ValueError("Boolean mask must have one value per node")
+            return np.flatnonzero(idx)
+        if idx.dtype == object:
+            return np.array([nd.label for nd in idx.ravel()], dtype=int)
+        return idx.astype(int).ravel()
+
+    def add_constraints(self,nodes,**constraint):
+        """
+        Prescribe displacements of many nodes at once.
+
+        Parameters
+        ----------
+        nodes : array_like
+            Node labels, boolean mask or nodes (see :meth:`get_node_indices`).
+        **constraint : float or array_like
+            Values of the DOFs (ux, uy, ur), one value for all the nodes
+            or one per node.
+
+        Raises
+        ------
+        ValueError
+            If a name is not a DOF (ux, uy, ur).
+
+        Example
+        -------
+        >>> X = m.get_coordinates()
+        >>> m.add_constraints(X[:,0] == 0, ux=0, uy=0)
+        """
+        for name in constraint:
+            if name not in self.dof_names and name not in ("ux","uy","ur"):
+                raise ValueError("Constraint must be one of: " + ", ".join(self.dof_names))
+        self._check_dof_map()
+        idx = self.get_node_indices(nodes)
+        for name,val in constraint.items():
+            if name in self.dof_names:
+                eqs = self.dofmap[idx,self.dof_names.index(name)]
+                val = np.broadcast_to(np.asarray(val,dtype=float), eqs.shape)
+                known = ~np.isnan(val)
+                if np.any(self._known[eqs] != known):
+                    self.mark_dirty("constraints")
+                self.mark_dirty("loads")
+                self.u[eqs] = val
+                self._known[eqs] = known
+            elif name in ("ux","uy","ur"): # Not a DOF of this model (e.g. beam ux)
+                for label,v in zip(idx, np.broadcast_to(val, idx.shape)):
+                    setattr(self.nodes[label], name, v)
+
+    def add_forces(self,nodes,*forces,**named):
+        """
+        Apply loads to many nodes at once.
+
+        Parameters
+        ----------
+        nodes : array_like
+            Node labels, boolean mask or nodes (see :meth:`get_node_indices`).
+        *forces : float or array_like
+            Load components in the order of ``force_names`` (e.g. fx, fy),
+            one value for all the nodes or one per node.
+        **named : float or array_like
+            Load components by name (fx=..., m=...).
+
+        Example
+        -------
+        >>> m.add_forces(X[:,0] == X[:,0].max(), 100.0, 0.0)
+        """
+        self._check_dof_map()
+        idx = self.get_node_indices(nodes)
+        named.update(zip(self.force_names, forces))
+        for name,val in named.items():
+            if name not in self.force_names:
+                raise ValueError("Force must be one of: " + ", ".join(self.force_names))
+            eqs = self.dofmap[idx,self.force_names.index(name)]
+            self.f[eqs] = val
+            self.reaction[eqs] = 0.0
+        self.mark_dirty("loads")
+
+    def mark_dirty(self,*states):
+        """
+        Record changes of the model, the next :meth:`solve` only re-runs
+        the stages affected by them.
+
+        Parameters
+        ----------
+        states : str
+            'topology' (nodes/elements added), 'geometry' (nodal
+            coordinates), 'properties' (element properties),
+            'constraints' (set of prescribed DOFs) or 'loads'.
+
+        Nodes, elements and the add_* methods call this automatically;
+        call it after modifying the ``u``/``f`` arrays or ``KG`` in place.
+        """
+        for state in states:
+            if state not in DIRTY_STATES:
+                raise ValueError("state must be one of: " + ", ".join(DIRTY_STATES))
+            self._dirty.add(state)
+            if state in ASSEMBLY_STATES:
+                self.IS_KG_BUILDED = False
+            if state == "topology":
+                self._pattern = None
+            if state in ("topology","geometry"):
+                self._geometry.clear()
+
+    def get_element_dofs(self,element):
+        """
+        Return the global DOFs (equations) of *element*, in the order
+        of its stiffness matrix.
+        """
+        labels = [nd.label for nd in element.get_nodes()]
+        return self.dofmap[labels].ravel()
+
+    def _build_pattern(self,edofs,sparse_matrix=False):
+        """
+        Symbolic assembly, computed once per connectivity.
+
+        Each entry of the element matrices is mapped to its slot in KG:
+        the flat index for a dense KG, or the position in ``data`` for a
+        CSR matrix (whose ``indptr``/``indices`` are stored too).
+
+        *edofs* : (ne, nd) int array, or sequence of int arrays
+            Global DOFs of each element (see :meth:`get_element_dofs`)
+        """
+        msz = self.dofmap.size
+        if isinstance(edofs,np.ndarray):
+            nd = edofs.shape[1]
+            rows = np.repeat(edofs, nd, axis=1).ravel()
+            cols = np.tile(edofs, (1,nd)).ravel()
+        else:
+            rows = np.concatenate([np.repeat(d,len(d)) for d in edofs] or [np.zeros(0,int)])
+            cols = np.concatenate([np.tile(d,len(d)) for d in edofs] or [np.zeros(0,int)])
+        keys = rows.astype(np.int64)*msz + cols
+        self._pattern_KG = None
+        if sparse_matrix:
+            slots, scatter = np.unique(keys, return_inverse=True)
+            indptr = np.zeros(msz+1, dtype=np.int64)
+            np.cumsum(np.bincount(slots//msz, minlength=msz), out=indptr[1:])
+            self._pattern = (indptr, slots%msz, scatter.ravel())
+        else:
+            self._pattern = (None, None, keys)
+
+    def _fill_global_matrix(self,data):
+        """
+        Numeric assembly: sum the element matrices entries *data* (in
+        the order used by :meth:`_build_pattern`) into KG. A CSR matrix
+        with the same pattern is refilled in place.
+        """
+        msz = self.dofmap.size
+        indptr, indices, scatter = self._pattern
+        if indptr is None:
+            self.KG = np.bincount(scatter, weights=data, minlength=msz*msz).reshape(msz,msz)
+            return
+        values = np.bincount(scatter, weights=data, minlength=len(indices))
+        if self._pattern_KG is not None and self._pattern_KG is getattr(self,"KG",None):
+            self.KG.data[:] = values
+        else:
+            self.KG = sparse.csr_matrix((values,indices,indptr), shape=(msz,msz))
+            self._pattern_KG = self.KG # CSR matrix that owns the pattern
+
+    def build_global_matrix(self):
+        """
+        Build global matrix -> KG (dense, or CSR if ``sparse_matrix``,
+        an operator if ``matrix_free``, see :meth:`get_operator`, or a
+        memory-mapped CSR if ``out_of_core``, see :mod:`nusa.outofcore`)
+
+        All the element matrices are computed (see
+        :meth:`get_element_matrices`) and scattered into KG in a single
+        vectorized step. The slots of their entries in KG are computed
+        once per connectivity (see :meth:`_build_pattern`), so changing
+        element properties only repeats the numeric phase.
+        """
+        with self.profile.phase("assembly"):
+            self._check_dof_map()
+            self._KG_mode = (self.matrix_free, self.out_of_core)
+            if self.matrix_free:
+                self.KG = self.get_operator(cached=self.matrix_free != "onthefly")
+                self._pattern_KG = None
+            elif self.out_of_core:
+                from .outofcore import assemble_out_of_core
+                dofs, kernel = self._get_chunk_kernel()
+                self.KG = assemble_out_of_core(dofs, kernel, self.get_number_of_elements(),
+                                               self.dofmap.size, self.out_of_core,
+                                               self.memory_limit)
+                self._pattern_KG = None
+            elif self._pattern is None:
+                with self.profile.phase("symbolic"):
+                    EC = self.get_connectivity()
+                    if np.all(EC >= 0): # (ne, nen*dof) table
+                        edofs = self.dofmap[EC].reshape(len(EC),-1)
+                    else:
+                        edofs = [self.get_element_dofs(elm) for elm in self.get_elements()]
+                    self._build_pattern(edofs, sparse_matrix=self.sparse_matrix)
+            if not (self.matrix_free or self.out_of_core):
+                self._fill_global_matrix(self.get_element_matrices())
+        self._finish_assembly()
+
+    def get_operator(self,cached=True):
+        """
+        Return the global matrix as a matrix-free operator.
+
+        Parameters
+        ----------
+        cached : bool
+            Keep the element matrices, computed once ("cached" mode).
+            If False they are recomputed by the batch kernel, in chunks
+            of ``chunksize`` elements, at every product ("onthefly"
+            mode), so only coordinates, connectivity and properties
+            are stored.
+
+        Returns
+        -------
+        :class:`~nusa.matfree.ElementOperator`
+            LinearOperator that applies K element by element.
+
+        All the elements must be of a single class with a batch kernel
+        (see :func:`register_kernel`).
+        """
+        from .matfree import ElementOperator
+        dofs, kernel = self._get_chunk_kernel()
+        edofs = dofs(slice(None))
+        if cached:
+            return ElementOperator(edofs, self.dofmap.size, KE=kernel(slice(None)))
+        chunksize = getattr(self,"chunksize",None) or 50000
+        return ElementOperator(edofs, self.dofmap.size, kernel=kernel, chunksize=chunksize)
+
+    def _get_chunk_kernel(self):
+        """
+        Functions that return the DOF table (m, nen*dof) and the
+        matrices of a chunk (slice) of the elements, for the matrix-free
+        and out-of-core modes.
+
+        Coordinates, connectivity and properties are gathered once, as
+        arrays; element classes with a vectorized ``get_batch_stiffness``
+        then compute each chunk from them (geometry included), without
+        the model-wide geometry cache.
+        """
+        self._check_dof_map()
+        elements = list(self.get_elements())
+        classes = set(type(elm) for elm in elements)
+        if len(classes) != 1 or not (classes <= set(ELEMENT_KERNELS) or
+                                     hasattr(list(classes)[0], "get_batch_stiffness")):
+            raise ValueError("Elements of a single type with a batch kernel are required")
+        cls = classes.pop()
+        EC = self.get_connectivity()
+        dofmap = self.dofmap
+        def dofs(chunk):
+            ec = EC[chunk]
+            return dofmap[ec].reshape(len(ec),-1)
+        if not hasattr(cls, "get_batch_stiffness"):
+            registered = ELEMENT_KERNELS[cls]
+            return dofs, (lambda chunk: registered(self, elements[chunk]))
+        X = self.get_coordinates()
+        props = [self._get_element_property(name) for name in cls._properties]
+        def kernel(chunk):
+            return cls.get_batch_stiffness(X[EC[chunk]], *[p[chunk] for p in props])
+        return dofs, kernel
+
+    def get_element_matrices(self):
+        """
+        Return the entries of all the element stiffness matrices as a
+        flat array, in element order.
+
+        Elements whose class has a batch kernel (see
+        :func:`register_kernel`) are computed by it, all at once; the
+        remaining ones (e.g. superelements) element by element. If a
+        :class:`~nusa.cache.StiffnessCache` is set in ``stiffness_cache``,
+        identical elements share a single element matrix (found all at
+        once if the elements are of a single class with
+        ``get_batch_stiffness``, else element by element).
+        """
+        elements = list(self.get_elements())
+        cache = self.stiffness_cache
+        classes = set(type(elm) for elm in elements)
+        if cache is not None and len(classes) == 1:
+            cls = classes.pop()
+            if cls._properties and hasattr(cls, "get_batch_stiffness"):
+                X = self.get_coordinates()[self.get_connectivity()]
+                props = [self._get_element_property(name) for name in cls._properties]
+                KE = cache.get_batch_stiffness(cls, X, *props)
+                self.profile.record(stiffness_cache=cache.stats)
+                return KE.ravel()
+        if cache is not None:
+            data = [np.ravel(cache.get_element_stiffness(elm)) for elm in elements]
+            self.profile.record(stiffness_cache=cache.stats)
+            return np.concatenate(data) if data else np.zeros(0)
+        groups = {}
+        for k,elm in enumerate(elements):
+            groups.setdefault(type(elm), []).append(k)
+        if len(groups) == 1 and type(elements[0]) in ELEMENT_KERNELS:
+            return ELEMENT_KERNELS[type(elements[0])](self, elements).ravel()
+        sizes = np.array([len(elm.get_nodes())*self.dof for elm in elements], dtype=np.int64)**2
+        offsets = np.concatenate(([0], np.cumsum(sizes)))
+        data = np.empty(offsets[-1])
+        for cls,idx in groups.items():
+            if cls in ELEMENT_KERNELS:
+                KE = ELEMENT_KERNELS[cls](self, [elements[k] for k in idx])
+                pos = offsets[idx][:,None] + np.arange(KE[0].size)
+                data[pos] = KE.reshape(len(idx),-1)
+            else:
+                for k in idx:
+                    data[offsets[k]:offsets[k+1]] = np.ravel(elements[k].get_element_stiffness())
+        return data
+
+    def _finish_assembly(self):
+        """
+        Bookkeeping after building KG: DOF map up to date and previous
+        factorization discarded.
+        """
+        self._check_dof_map()
+        self.IS_KG_BUILDED = True
+        self._factor = None
+        self._dirty.difference_update(ASSEMBLY_STATES)
+
+    def _factorize(self,K):
+        """
+        Factorize the reduced matrix *K*: dense LU, or sparse LU if KG
+        is sparse (``sparse_matrix``).
+
+        The fill-reducing ordering of the first sparse factorization is
+        kept while the pattern of K does not change (same connectivity
+        and constraints): later factorizations only permute K and skip
+        the ordering step (SuperLU still repeats the symbolic analysis).
+
+        Returns a function that solves K x = b and the name of the solver.
+        """
+        if K.shape[0] == 0:
+            return (lambda b: np.zeros(0)), None
+        if sparse.issparse(K):
+            return self._sparse_factorize(K.tocsc())
+        lu = sla.lu_factor(K, check_finite=False)
+        if not np.all(np.diag(lu[0])):
+            raise la.LinAlgError("Singular matrix")
+        return (lambda b: sla.lu_solve(lu, b, check_finite=False)), "scipy.linalg.lu_factor"
+
+    def _sparse_factorize(self,K):
+        """
+        Sparse LU factorization of the CSC matrix *K* (see :meth:`_factorize`)
+        """
+        try:
+            if self._ordering is None or self._ordering[0] is not self._pattern \
+                    or not np.array_equal(self._ordering[1], self._free):
+                lu = spla.splu(K)
+                self._ordering = (self._pattern, self._free, np.argsort(lu.perm_c))
+                return lu.solve, "scipy.sparse.linalg.splu"
+            q = self._ordering[2]
+            lu = spla.splu(K[q][:,q].tocsc(), permc_spec="NATURAL")
+        except RuntimeError: # Singular matrix
+            raise la.LinAlgError("Singular matrix")
+        def solve(b):
+            x = np.empty_like(b)
+            x[q] = lu.solve(b[q])
+            return x
+        return solve, "scipy.sparse.linalg.splu"
+
+    def solve(self,cache_dir=None):
+        """
+        Solve the model.
+
+        Only the stages affected by the changes since the last solution
+        are re-run (see :meth:`mark_dirty`):
+
+        * topology, geometry or properties: assembly and factorization
+        * constraints: reduction and factorization (new unknowns)
+        * loads: new right-hand side, i.e. a single back-substitution
+
+        If ``matrix_free`` is "cached" or "onthefly", KG is never
+        assembled (see :meth:`get_operator`); if ``out_of_core`` is a
+        directory, KG is assembled there and memory-mapped. In both
+        cases the system is solved by conjugate gradients with a Jacobi
+        preconditioner, to a relative tolerance ``cg_tol``, without
+        forming the reduced matrix.
+
+        With *cache_dir*, solutions are stored in that directory keyed
+        by :meth:`fingerprint` (see :class:`~nusa.cache.ResultCache`,
+        up to ``result_cache_size`` bytes), and the displacements and
+        reactions of a model solved before are loaded instead.
+        """
+        if "topology" in self._dirty:
+            self._check_nodes()
+        self.profile.start_solve()
+        if cache_dir is not None:
+            from .cache import ResultCache
+            cache = ResultCache(cache_dir, self.result_cache_size)
+            with self.profile.phase("fingerprint"):
+                key = self.fingerprint()
+            stored = cache.get(key)
+            self.profile.record(result_cache="miss" if stored is None else "hit")
+            if stored is not None:
+                if self._dirty.intersection(ASSEMBLY_STATES + ("constraints",)):
+                    self._factor = None # refactorized by the next solve/solve_loads
+                self.solved_u = None
+                self.u[:], self.reaction = stored
+                self._dirty.clear()
+                return
+        self._prepare()
+        self._iterations = None
+        with self.profile.phase("solver"):
+            self._rhs()
+            self.solved_u = self._factor(self.F2S)
+        self.profile.record_system(self.K2S, solver=self._solver, iterations=self._iterations)
+        with self.profile.phase("update"):
+            self._update_results()
+        self._dirty.clear()
+        if cache_dir is not None:
+            cache.put(key, self.u, self.reaction)
+
+    def _prepare(self):
+        """
+        Assemble KG and reduce and factorize the system, only if the
+        changes since the last solution require it (see :meth:`solve`)
+        """
+        if not self.IS_KG_BUILDED or self._KG_mode != (self.matrix_free, self.out_of_core):
+            self.build_global_matrix()
+        self._check_dof_map()
+        if self._factor is None or "constraints" in self._dirty:
+            with self.profile.phase("reduction"):
+                self._reduce()
+            with self.profile.phase("factorization"):
+                if self.matrix_free or self.out_of_core:
+                    self._factor, self._solver = self._iterative_solver(), "scipy.sparse.linalg.cg"
+                else:
+                    self._factor, self._solver = self._factorize(self.K2S)
+            self._dirty.discard("constraints")
+
+    def _check_nodes(self):
+        """
+        Check the nodes after topology changes, before assembly (e.g.
+        LinearTriangleModel fixes nodes without elements)
         """
         pass
-        
-    def _get_ndisplacements(self,options):
+
+    def solve_loads(self,F):
         """
-        Generate a table of node displacements.
+        Solve many load cases with the current constraints.
+
+        KG is assembled, reduced and factorized if needed (as in
+        :meth:`solve`, but without solving for the current loads); all
+        the load cases then share a single multi-RHS solve. The model
+        state (``u``, ``f``, ``reaction``) is not modified.
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        F : array_like
+            (neq, ncases) load vectors, in equation order (see ``dofmap``).
+
+        Returns
+        -------
+        U, R : numpy.ndarray
+            (neq, ncases) displacements and reactions.
+        """
+        if "topology" in self._dirty:
+            self._check_nodes()
+        self._prepare()
+        F = np.asarray(F, dtype=float).reshape(self.dofmap.size, -1)
+        free, prescribed = self._free, self._prescribed
+        U = np.repeat(self.u[:,None], F.shape[1], axis=1)
+        rhs = F[free]
+        if len(prescribed):
+            rhs = rhs - self._Kuk.dot(U[prescribed])
+        if self.matrix_free or self.out_of_core: # CG: one right-hand side at a time
+            U[free] = np.column_stack([self._factor(b) for b in rhs.T]) if len(free) else rhs
+        else:
+            U[free] = self._factor(rhs)
+        R = self.KG.dot(U) - F
+        R[free] = 0.0
+        return U, R
+
+    def _reduce(self):
+        r"""
+        Partition KG for the reduced system of the unknown displacements:
+
+        .. math::
+
+            [K_{uu}]\{u_u\} = \{f_u\} - [K_{uk}]\{u_k\}
+        """
+        self._free = np.flatnonzero(~self._known)
+        self._prescribed = np.flatnonzero(self._known)
+        if self.matrix_free or self.out_of_core: # operators, K is not sliced
+            from .matfree import submatrix
+            self.K2S = submatrix(self.KG, self._free, self._free)
+            self._Kuk = submatrix(self.KG, self._free, self._prescribed)
+            return
+        Kf = self.KG[self._free] # rows of the free equations (dense or sparse)
+        self.K2S = Kf[:,self._free]
+        self._Kuk = Kf[:,self._prescribed]
+
+    def _iterative_solver(self):
+        """
+        Preconditioned CG solver of the reduced system (matrix-free)
+        """
+        from .matfree import jacobi_cg
+        diagonal = self.KG.diagonal()[self._free]
+        def solve(b):
+            if len(b) == 0:
+                return np.zeros(0)
+            x, self._iterations = jacobi_cg(self.K2S, b, diagonal, tol=self.cg_tol)
+            return x
+        return solve
+
+    def _rhs(self):
+        """
+        Right-hand side of the reduced system (see :meth:`_reduce`)
+        """
+        self.F2S = self.f[self._free]
+        if len(self._prescribed):
+            self.F2S = self.F2S - self._Kuk.dot(self.u[self._prescribed])
+
+    def _update_results(self):
+        """
+        Store the solution of the reduced system and compute the
+        reactions, all in one vectorized step.
+        """
+        free = self._free
+        self.u[free] = self.solved_u
+        self.reaction = self.KG.dot(self.u) - self.f
+        self.reaction[free] = 0.0
+
+    def _get_arrays(self):
+        """
+        The model as a dict of arrays: coordinates, connectivity,
+        element properties ("property.E"...), DOF map, displacements,
+        loads, reactions, prescribed DOFs and the assembled KG ("KG",
+        or "KG.data"/"KG.indices"/"KG.indptr" if sparse).
+        """
+        self._check_dof_map()
+        arrays = {"coordinates": self.get_coordinates(),
+                  "connectivity": self.get_connectivity(),
+                  "dofmap": self.dofmap, "u": self.u, "f": self.f,
+                  "reaction": self.reaction, "known": self._known}
+        names = sorted(set(name for elm in self.get_elements() for name in elm._properties))
+        for name in names:
+            arrays["property."+name] = self._get_element_property(name)
+        KG = getattr(self,"KG",None)
+        if self.IS_KG_BUILDED and isinstance(KG,np.ndarray):
+            arrays["KG"] = KG
+        elif self.IS_KG_BUILDED and sparse.isspmatrix_csr(KG):
+            arrays.update({"KG.data":KG.data, "KG.indices":KG.indices, "KG.indptr":KG.indptr})
+        return arrays
+
+    def to_shared(self):
+        """
+        Copy the model arrays to shared memory blocks.
+
+        Returns
+        -------
+        :class:`~nusa.shared.SharedModel`
+            Handle that pickles as the names of the blocks, so
+            multiprocessing workers attach to the arrays without
+            copying them, and solve load cases against the shared
+            global matrix (assembled here if needed).
+
+        Example
+        -------
+        >>> with m.to_shared() as handle:
+        ...     results = pool.map(task, [(handle, f) for f in loads])
+        """
+        from .shared import SharedModel
+        if not self.IS_KG_BUILDED and not (self.matrix_free or self.out_of_core):
+            self.build_global_matrix()
+        meta = {"name": self.name, "mtype": self.mtype,
+                "dof_names": self.dof_names, "force_names": self.force_names}
+        return SharedModel(self._get_arrays(), meta)
+
+    def fingerprint(self):
+        """
+        Return a stable hash of the model data.
+
+        The hash (``hashlib.blake2b``) covers the model type, DOF names,
+        nodal coordinates, connectivity, element classes and properties,
+        prescribed displacements and loads, so two models with the same
+        fingerprint have the same solution, in this run or another one.
 
         Returns
         -------
         str
-            Tabulated string of displacements.
+            Hexadecimal digest.
         """
-        from tabulate import tabulate
-        D = [["Node","UX","UY"]]
-        for n in self.get_nodes():
-            D.append([n.label+1,n.ux,n.uy])
-        return tabulate(D, **options)
-        
-    def _get_nforces(self,options):
+        self._check_dof_map()
+        h = hashlib.blake2b(digest_size=20)
+        def update(name,values,dtype=float):
+            h.update(name.encode())
+            values = np.ascontiguousarray(values, dtype=dtype)
+            h.update(str(values.shape).encode())
+            h.update(values.tobytes())
+        h.update("{0}.{1}|{2}|{3}".format(type(self).__module__, type(self).__name__,
+                                          self.mtype, ",".join(self.dof_names)).encode())
+        update("coordinates", self.get_coordinates())
+        update("connectivity", self.get_connectivity(), np.int64)
+        elements = list(self.get_elements())
+        h.update(",".join(type(elm).__name__ for elm in elements).encode())
+        for name in sorted(set(name for elm in elements for name in elm._properties)):
+            update("property."+name, self._get_element_property(name))
+        for elm in elements:
+            if not elm._properties: # e.g. superelements: their stiffness
+                update("element.{0}".format(elm.label), elm.get_element_stiffness())
+        update("known", self._known, np.uint8)
+        update("prescribed", self.u[self._known])
+        update("loads", self.f)
+        return h.hexdigest()
+
+    def __getstate__(self):
+        """
+        Compact state for pickle and copy: nodes and elements are
+        stored as arrays (coordinates, connectivity and properties of
+        each element class) instead of object graphs. Objects derived
+        from them (geometry, symbolic assembly, factorization) are
+        rebuilt on demand after unpickling.
+        """
+        state = self._get_state()
+        KG = state.get("KG")
+        if self.matrix_free or self.out_of_core or not (KG is None or isinstance(KG,np.ndarray) or sparse.issparse(KG)):
+            state.pop("KG", None) # operators and memory maps are not pickled
+            state["IS_KG_BUILDED"] = False
+        for key in MODEL_DERIVED:
+            if key in state:
+                state[key] = None
+        state["_geometry"] = {}
+        return state
+
+    def __setstate__(self,state):
+        state = dict(state)
+        nodes, elements = state.pop("_packed_nodes"), state.pop("_packed_elements")
+        self.__dict__.update(state)
+        self.nodes, self.elements = {}, {}
+        labels, X = nodes
+        for label,(x,y) in zip(labels.tolist(), X.tolist()):
+            node = Node((x,y))
+            node._label = label
+            node._model = self
+            self.nodes[label] = node
+        created = {}
+        for cls, labels, conn, props, extras in elements:
+            values = dict((name,vals.tolist()) for name,vals in props.items())
+            for k,label in enumerate(labels.tolist()):
+                elm = cls.__new__(cls)
+                Element.__init__(elm, None)
+                elm.__dict__.update(extras if isinstance(extras,dict) else extras[k])
+                for name,vals in values.items():
+                    elm.__dict__[name] = vals[k]
+                nodes = tuple(self.nodes[nl] for nl in conn[k])
+                elm.__dict__.update(nodes=nodes, label=label, _model=self)
+                for node in nodes:
+                    node._elements.append(elm)
+                created[label] = elm
+        self.elements = dict((label, created[label]) for label in self._element_order)
+        del self._element_order
+
+    def _get_state(self):
+        """
+        Attributes of the model with nodes and elements packed as arrays
+        (see :meth:`__getstate__` and :meth:`clone`)
+        """
+        state = dict(self.__dict__)
+        del state["nodes"], state["elements"]
+        labels = np.array(list(self.nodes.keys()), dtype=int)
+        X = np.array([(nd.x, nd.y) for nd in self.nodes.values()], dtype=float).reshape(-1,2)
+        state["_packed_nodes"] = (labels, X)
+        groups = {}
+        for elm in self.elements.values():
+            groups.setdefault(type(elm), []).append(elm)
+        packed = []
+        for cls,elms in groups.items():
+            skip = ("nodes","label") + tuple(cls._properties)
+            extras = [dict((k,v) for k,v in elm.__dict__.items()
+                           if not k.startswith("_") and k not in skip) for elm in elms]
+            if all(ex == extras[0] for ex in extras):
+                extras = extras[0] # e.g. {"etype":"truss"}, stored once
+            conn = [tuple(nd.label for nd in elm.get_nodes()) for elm in elms]
+            if len(set(len(c) for c in conn)) == 1:
+                conn = np.array(conn, dtype=int)
+            props = dict((name, np.array([getattr(elm,name) for elm in elms])) for name in cls._properties)
+            packed.append((cls, np.array([elm.label for elm in elms]), conn, props, extras))
+        state["_packed_elements"] = packed
+        state["_element_order"] = list(self.elements.keys())
+        return state
+
+    def clone(self):
         """
-        Generate a table of nodal forces.
+        Return an independent copy of the model, e.g. a variant with
+        other loads or constraints.
+
+        Nodes and elements are new objects and the displacement, load
+        and reaction arrays are copied, while the assembled KG, the
+        geometry cache and the factorization are shared until the
+        clone changes them: a variant with new loads is solved with a
+        single back-substitution, without assembling KG again.
+
+        The on-disk KG of an ``out_of_core`` model is not shared: the
+        clone is an in-memory model (set its ``out_of_core`` to another
+        directory if needed) and assembles its own KG.
+        """
+        state = self._get_state()
+        for key in ("u","f","reaction","_known"):
+            if state.get(key) is not None:
+                state[key] = state[key].copy()
+        state["_dirty"] = set(self._dirty)
+        state["_geometry"] = dict(self._geometry)
+        state["_pattern_KG"] = None # KG is refilled into a new matrix, not in place...
+        self._pattern_KG = None # ...by the clone and by the original
+        if self.out_of_core: # never write into the original's memory maps
+            state["out_of_core"] = None
+            state.pop("KG", None)
+            state["IS_KG_BUILDED"] = False
+            for key in MODEL_DERIVED:
+                if key in state:
+                    state[key] = None
+        state["profile"] = ModelProfile(self.profile.enabled)
+        new = self.__class__.__new__(self.__class__)
+        new.__setstate__(state)
+        return new
+
+    def get_coordinates(self):
+        """
+        Return the nodal coordinates as an array.
+
+        Returns
+        -------
+        numpy.ndarray
+            (n, 2) array of (x, y) coordinates, ordered by node label.
+        """
+        nodes = self.get_nodes()
+        X = np.empty((len(nodes),2))
+        for k,n in enumerate(nodes):
+            X[k] = n.x, n.y
+        return X
+
+    def get_kdtree(self):
+        """
+        Return a :class:`scipy.spatial.cKDTree` of the nodal coordinates.
+
+        The tree is cached, and rebuilt only after nodes are added or
+        moved.
+        """
+        if "kdtree" not in self._geometry:
+            self._geometry["kdtree"] = cKDTree(self.get_coordinates())
+        return self._geometry["kdtree"]
+
+    def get_element_geometry(self):
+        """
+        Return the geometric quantities of the elements.
+
+        They are computed for all elements at once and cached until
+        nodes are added or moved, element properties and results
+        (``Truss.L``, ``LinearTriangle.B``...) read them from here.
+
+        Returns
+        -------
+        dict
+            Arrays with a row per element, in the order of
+            :meth:`get_elements` (see :meth:`_get_element_rows`): "L"
+            (length), "C" and "S"
+            (direction cosines) for two-node elements, "A" (area) and
+            "B" ((ne,3,6) strain-displacement matrices) for three-node
+            elements. Entries of other elements are NaN.
+        """
+        if "elements" not in self._geometry:
+            X = self.get_coordinates()
+            EC = self.get_connectivity()
+            nen = (EC >= 0).sum(axis=1)
+            geom = dict((key, np.full(len(EC), np.nan)) for key in ("L","C","S","A"))
+            geom["B"] = np.full((len(EC),3,6), np.nan)
+            two = np.flatnonzero(nen == 2)
+            if len(two):
+                d = X[EC[two,1]] - X[EC[two,0]]
+                geom["L"][two] = L = np.hypot(d[:,0], d[:,1])
+                geom["C"][two] = d[:,0]/L
+                geom["S"][two] = d[:,1]/L
+            three = np.flatnonzero(nen == 3)
+            if len(three):
+                from .element import LinearTriangle
+                A, B = LinearTriangle.get_batch_geometry(X[EC[three,:3]])
+                geom["A"][three] = A
+                geom["B"][three] = B
+            self._geometry["elements"] = geom
+        return self._geometry["elements"]
+
+    def _get_element_rows(self):
+        """
+        Row of each element (by label) in the element arrays
+        (connectivity, geometry...), i.e. its position in
+        :meth:`get_elements`. Labels set with ``set_label`` need not
+        be 0..ne-1.
+        """
+        if "rows" not in self._geometry:
+            self._geometry["rows"] = dict((elm.label,k) for k,elm in enumerate(self.get_elements()))
+        return self._geometry["rows"]
+
+    def select_nodes(self,box=None,circle=None,line=None,tol=None):
+        """
+        Select nodes by location.
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        box : tuple, optional
+            ((x0,y0),(x1,y1)), nodes inside the rectangle.
+        circle : tuple, optional
+            ((xc,yc),r), nodes inside the circle.
+        line : tuple, optional
+            ((x0,y0),(x1,y1)), nodes on the segment.
+        tol : float, optional
+            Distance tolerance (default: 1e-8 times the size of the model).
 
         Returns
         -------
-        str
-            Tabulated string of nodal forces.
+        numpy.ndarray
+            Sorted labels of the nodes that meet all the given criteria
+            (all nodes if none is given). It can be passed directly to
+            :meth:`add_constraints` and :meth:`add_forces`.
+
+        Example
+        -------
+        >>> left = m.select_nodes(line=((0,0),(0,1)))
+        >>> m.add_constraints(left, ux=0, uy=0)
         """
-        from tabulate import tabulate
-        F = [["Node","FX","FY"]]
-        for n in self.get_nodes():
-            F.append([n.label+1,n.fx,n.fy])
-        return tabulate(F, **options)
-        
-    def _get_eforces(self,options):
+        n = self.get_number_of_nodes()
+        if n == 0:
+            return np.zeros(0, dtype=int)
+        tree = self.get_kdtree()
+        X = tree.data
+        if tol is None:
+            tol = 1e-8*max(np.hypot(*np.ptp(X, axis=0)), 1.0)
+        selected = np.ones(n, dtype=bool)
+        if box is not None:
+            lo = np.minimum(box[0], box[1]) - tol
+            hi = np.maximum(box[0], box[1]) + tol
+            idx = tree.query_ball_point((lo+hi)/2, np.max(hi-lo)/2, p=np.inf)
+            mask = np.zeros(n, dtype=bool)
+            idx = np.asarray(idx, dtype=int)
+            mask[idx[np.all((X[idx] >= lo) & (X[idx] <= hi), axis=1)]] = True
+            selected &= mask
+        if circle is not None:
+            center, r = circle
+            mask = np.zeros(n, dtype=bool)
+            mask[tree.query_ball_point(center, r + tol)] = True
+            selected &= mask
+        if line is not None:
+            p0, p1 = np.asarray(line[0], dtype=float), np.asarray(line[1], dtype=float)
+            d = p1 - p0
+            idx = np.asarray(tree.query_ball_point((p0+p1)/2, np.hypot(*d)/2 + tol), dtype=int)
+            s = np.clip(np.dot(X[idx]-p0, d)/max(np.dot(d,d), np.finfo(float).tiny), 0, 1)
+            dist = np.hypot(*(X[idx] - (p0 + s[:,None]*d)).T)
+            mask = np.zeros(n, dtype=bool)
+            mask[idx[dist <= tol]] = True
+            selected &= mask
+        return np.flatnonzero(selected)
+
+    def get_connectivity(self):
         """
-        Generate a table of element internal forces.
+        Return the element connectivity as an array of node labels.
+
+        Returns
+        -------
+        numpy.ndarray
+            (ne, nen) integer array, a row per element in the order of
+            :meth:`get_elements` (the order they were added, not by
+            label). Rows of elements with less than nen nodes (e.g.
+            superelements mixed with regular elements) are padded with
+            -1. The array is cached (read-only) until nodes or elements
+            are added.
+        """
+        if "connectivity" not in self._geometry:
+            conn = [[n.label for n in elm.get_nodes()] for elm in self.get_elements()]
+            nen = max([len(c) for c in conn]) if conn else 0
+            EC = np.full((len(conn),nen), -1, dtype=int)
+            for k,c in enumerate(conn):
+                EC[k,:len(c)] = c
+            EC.flags.writeable = False
+            self._geometry["connectivity"] = EC
+        return self._geometry["connectivity"]
+
+    def get_nsol(self,var):
+        """
+        Return a nodal quantity for all nodes as an array.
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        var : str
+            Node attribute ('ux', 'uy', 'fx', 'sx', ...).
 
         Returns
         -------
-        str
-            Tabulated string of element forces.
+        numpy.ndarray
+            One value per node, ordered by node label.
         """
-        from tabulate import tabulate
-        F = [["Element","F"]]
-        for elm in self.get_elements():
-            F.append([elm.label+1, elm.f])
-        return tabulate(F, **options)
-        
-    def _get_estresses(self,options):
+        var = SOLUTION_ALIASES.get(var,var)
+        if self.dofmap is not None and len(self.dofmap) == self.get_number_of_nodes():
+            if var in self.dof_names:
+                return self.u[self.dofmap[:,self.dof_names.index(var)]]
+            if var in self.force_names:
+                eqs = self.dofmap[:,self.force_names.index(var)]
+                return self.f[eqs] + self.reaction[eqs]
+        nodes = self.get_nodes()
+        return np.fromiter((getattr(n,var) for n in nodes), float, len(nodes))
+
+    def get_esol(self,var):
         """
-        Generate a table of element stresses.
+        Return an element quantity for all elements as an array.
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        var : str
+            Element attribute ('f', 's', 'sx', ...).
 
         Returns
         -------
-        str
-            Tabulated string of element stresses.
+        numpy.ndarray
+            One value per element, in the order of :meth:`get_elements`.
         """
-        from tabulate import tabulate
-        S = [["Element","S"]]
-        for elm in self.get_elements():
-            S.append([elm.label+1, elm.s])
-        return tabulate(S, **options)
-    
-    def _get_nodes_info(self,options):
+        var = SOLUTION_ALIASES.get(var,var)
+        elements = self.get_elements()
+        return np.fromiter((getattr(e,var) for e in elements), float, len(elements))
+
+    def get_results(self,fields,location="nodes"):
         """
-        Generate a table of node coordinates.
+        Return several nodal or element quantities at once.
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        fields : sequence of str
+            Quantities to compute (see :meth:`get_nsol`, :meth:`get_esol`).
+        location : str, optional
+            'nodes' or 'elements'.
 
         Returns
         -------
-        str
-            Tabulated string of node positions.
+        dict
+            {field: numpy.ndarray}
         """
-        from tabulate import tabulate
-        F = [["Node","X","Y"]]
-        for n in self.get_nodes():
-            F.append([n.label+1, n.x, n.y])
-        return tabulate(F, **options)
-    
-    def _get_elements_info(self,options):
+        if location == "nodes":
+            return {var:self.get_nsol(var) for var in fields}
+        elif location == "elements":
+            return {var:self.get_esol(var) for var in fields}
+        raise ValueError("location must be 'nodes' or 'elements'")
+
+    def export_results(self,path,fields=None,format=None,location="nodes",chunksize=100000):
+        """
+        Export nodal or element results to a CSV, Parquet or NPZ file.
+
+        All the columns are computed with :meth:`get_results` before
+        writing; CSV rows and Parquet row groups are then streamed in
+        chunks of *chunksize* rows.
+
+        Parameters
+        ----------
+        path : str
+            Output filename.
+        fields : sequence of str, optional
+            Quantities to export (default: all the results available
+            for this model type at *location*).
+        format : str, optional
+            'csv', 'parquet' or 'npz' (default: inferred from *path*).
+        location : str, optional
+            'nodes' or 'elements'.
+        chunksize : int, optional
+            Rows per CSV chunk / Parquet row group.
+
+        Raises
+        ------
+        ValueError
+            If *format* or *location* is not valid.
+        ImportError
+            If Parquet output is requested and pyarrow is not installed.
+
+        Example
+        -------
+        >>> m.solve()
+        >>> m.export_results("results.csv", fields=["ux","uy","fx","fy"])
+        """
+        if format is None:
+            format = os.path.splitext(path)[1].lstrip(".").lower()
+        if location == "nodes":
+            labels = np.array([n.label for n in self.get_nodes()], dtype=int) + 1
+            default_fields = self._nodal_fields
+            label_name = "node"
+        elif location == "elements":
+            labels = np.array([e.label for e in self.get_elements()], dtype=int) + 1
+            default_fields = self._element_fields
+            label_name = "element"
+        else:
+            raise ValueError("location must be 'nodes' or 'elements'")
+        if fields is None:
+            fields = default_fields
+        results = self.get_results(fields, location)
+        names = [label_name] + list(fields)
+        columns = [labels] + [np.asarray(results[var],dtype=float) for var in fields]
+
+        if format == "csv":
+            from .report import ReportWriter
+            with open(path,"w") as fobj:
+                writer = ReportWriter(fobj, "csv", chunksize)
+                writer.write_table(names, columns, "d"+"g"*len(fields))
+        elif format == "npz":
+            np.savez(path, **dict(zip(names,columns)))
+        elif format == "parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("pyarrow is required to export Parquet files")
+            schema = pa.schema([(name, pa.int64() if k==0 else pa.float64())
+                                for k,name in enumerate(names)])
+            with pq.ParquetWriter(path, schema) as writer:
+                for start in range(0, len(labels), chunksize):
+                    sl = slice(start, start+chunksize)
+                    batch = [pa.array(col[sl]) for col in columns]
+                    writer.write_table(pa.Table.from_arrays(batch, schema=schema))
+        else:
+            raise ValueError("format must be 'csv', 'parquet' or 'npz'")
+
+    def _get_element_property(self,name):
         """
-        Generate a table of element connectivity.
+        Return a property (E, A, I, ...) of all elements as an array
+        (NaN for elements without that property, e.g. superelements).
+        """
+        elements = self.get_elements()
+        return np.fromiter((getattr(e,name,np.nan) for e in elements), float, len(elements))
+
+    def simple_report(self,report_type="print",fname="nusa_rpt.txt",fmt="rst"):
+        """
+        Generate a simple report of the model and its results.
+
+        Tables are streamed in chunks (see :mod:`nusa.report`), so the
+        whole report is never held in memory (except for 'string').
 
         Parameters
         ----------
-        options : dict
-            Tabulate formatting options.
+        report_type : str, optional
+            'print' (standard output), 'write' (file *fname*) or
+            'string' (return the report).
+        fname : str, optional
+            Output filename for 'write' reports.
+        fmt : str, optional
+            Report format: 'rst', 'csv' or 'md'.
 
         Returns
         -------
-        str
-            Tabulated string of element-node relationships.
-        """
-        from tabulate import tabulate
-        S = [["Element","NI","NJ"]]
-        for elm in self.get_elements():
-            ni, nj = elm.get_nodes()
-            S.append([elm.label+1, ni.label+1, nj.label+1])
-        return tabulate(S, **options)
+        str or None
+            The report, except for 'print' and 'write' types.
+        """
+        from .report import ReportWriter
+        if report_type == "print":
+            import sys
+            self._write_report(ReportWriter(sys.stdout,fmt))
+        elif report_type == "write":
+            with open(fname,"w") as fobj:
+                self._write_report(ReportWriter(fobj,fmt))
+        else:
+            import io
+            fobj = io.StringIO()
+            self._write_report(ReportWriter(fobj,fmt))
+            return fobj.getvalue()
+
+    def _write_report(self,writer):
+        """
+        Stream the report sections through a :class:`~nusa.report.ReportWriter`.
+        """
+        from .templates import SIMPLE_REPORT_HEADER
+        writer.write(SIMPLE_REPORT_HEADER.format(
+                model_name=self.name,
+                nodes=self.get_number_of_nodes(),
+                elements=self.get_number_of_elements()))
+        for title,headers,columns,types in self._report_results():
+            writer.write_title(title)
+            writer.write_table(headers,columns,types)
+        writer.write("\n\nFINITE ELEMENT MODEL INFO\n")
+        for title,headers,columns,types in self._report_info():
+            writer.write_title(title)
+            writer.write_table(headers,columns,types)
+
+    def _report_results(self):
+        """
+        Result tables of the report: list of (title, headers, columns, types).
+
+        Each model type defines its own tables.
+        """
+        return []
+
+    def _report_info(self):
+        """
+        Nodes and elements tables of the report.
+        """
+        nlabels = np.array([n.label for n in self.get_nodes()]) + 1
+        elabels = np.array([e.label for e in self.get_elements()]) + 1
+        X = self.get_coordinates()
+        EC = self.get_connectivity() + 1
+        nen = EC.shape[1]
+        nheaders = ["NI","NJ","NM"][:nen] if nen <= 3 else ["N%d"%(k+1) for k in range(nen)]
+        return [("NODES:", ("Node","X","Y"), (nlabels, X[:,0], X[:,1]), "dgg"),
+                ("ELEMENTS:", ["Element"]+nheaders, [elabels]+list(EC.T), "d"*(len(nheaders)+1))]
             
 
 #~ =========================== ELEMENT ===========================
@@ -295,8 +1446,15 @@ class Model(object):
 class Element(object):
     """
     Superclass for all Elements
+
+    Assigning any attribute listed in ``_properties`` (e.g. E, A) or
+    the nodes marks the model as modified, so the next solution
+    rebuilds the global matrix.
     """
+    _properties = () # Attributes that define the element stiffness
+
     def __init__(self,etype):
+        self._model = None # Model (Model.add_element)
         self.etype = etype # element type
         self.label = "" # label (reassignment -> Model.addElement)
         self._fx = 0.0
@@ -321,6 +1479,24 @@ class Element(object):
     def fy(self,val):
         self._fy = val
         
+    def __setattr__(self,name,val):
+        object.__setattr__(self,name,val)
+        if name in self._properties or name == "nodes":
+            model = self.__dict__.get("_model")
+            if model is not None:
+                model.mark_dirty("topology" if name == "nodes" else "properties")
+
+    def _get_geometry(self,key):
+        """
+        Cached geometric quantity of this element (see
+        :meth:`Model.get_element_geometry`), None if the element and
+        its nodes don't belong to a model.
+        """
+        model = self._model
+        if model is None or any(nd._model is not model for nd in self.get_nodes()):
+            return None
+        return model.get_element_geometry()[key][model._get_element_rows()[self.label]]
+
     def set_label(self,label):
         """
         Set the label property
@@ -378,6 +1554,7 @@ class Node(object):
     
     """
     def __init__(self,coordinates):
+        self._model = None # Model storing the nodal results (Model.add_node)
         self.coordinates = coordinates
         self.x = coordinates[0] # usable prop
         self.y = coordinates[1] # usable prop
@@ -396,7 +1573,38 @@ class Node(object):
         # Elements ¿what?
         self._elements = []
         
-        
+    def _get_view(self,name,default):
+        """
+        Nodal quantity stored by the model (see Model.build_dof_map),
+        *default* if the model does not store it.
+        """
+        if self._model is not None:
+            val = self._model._get_nodal_value(self._label,name)
+            if val is not None:
+                return val
+        return default
+
+    def _set_view(self,name,val):
+        return self._model is not None and self._model._set_nodal_value(self._label,name,val)
+
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self,val):
+        self._x = val
+        if self._model is not None: self._model.mark_dirty("geometry")
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self,val):
+        self._y = val
+        if self._model is not None: self._model.mark_dirty("geometry")
+
     @property
     def label(self):
         return self._label
@@ -410,60 +1618,57 @@ class Node(object):
         
     @property
     def ux(self):
-        return self._ux
+        return self._get_view("ux", self._ux)
     
     @ux.setter
     def ux(self,val):
-        if True:#type(val) in [int,float]:
+        if not self._set_view("ux", val):
             self._ux = val
-        else:
-            raise ValueError("Value must be float or int")
     
     @property
     def uy(self):
-        return self._uy
+        return self._get_view("uy", self._uy)
     
     @uy.setter
     def uy(self,val):
-        if True:#type(val) in [int,float]:
+        if not self._set_view("uy", val):
             self._uy = val
-        else:
-            raise ValueError("Value must be float or int")
     
     @property
     def ur(self):
-        return self._ur
+        return self._get_view("ur", self._ur)
     
     @ur.setter
     def ur(self,val):
-        if True:#type(val) in [int,float]:
+        if not self._set_view("ur", val):
             self._ur = val
-        else:
-            raise ValueError("Value must be float or int")
         
     @property
     def fx(self):
-        return self._fx
+        return self._get_view("fx", self._fx)
     
     @fx.setter
     def fx(self,val):
-        self._fx = val
+        if not self._set_view("fx", val):
+            self._fx = val
     
     @property
     def fy(self):
-        return self._fy
+        return self._get_view("fy", self._fy)
     
     @fy.setter
     def fy(self,val):
-        self._fy = val
+        if not self._set_view("fy", val):
+            self._fy = val
         
     @property
     def m(self):
-        return self._m
+        return self._get_view("m", self._m)
     
     @m.setter
     def m(self,val):
-        self._m = val
+        if not self._set_view("m", val):
+            self._m = val
         
     @property
     def sx(self):
@@ -556,19 +1761,19 @@ class Node(object):
         self._label = label
     
     def get_displacements(self):
-        return self._ux,self._uy,self._ur
+        return self.ux,self.uy,self.ur
         
     def set_displacements(self,ux=np.nan, uy=np.nan, ur=np.nan):
-        self._ux = ux
-        self._uy = uy
-        self._ur = ur
+        self.ux = ux
+        self.uy = uy
+        self.ur = ur
     
     def get_forces(self):
-        return (self._fx,self._fy)
+        return (self.fx,self.fy)
     
     def set_forces(self,fx=np.nan,fy=np.nan):
-        self._fx = fx
-        self._fy = fy
+        self.fx = fx
+        self.fy = fy
         
     def __str__(self):
         _str = self.__class__
@@ -4,8 +4,9 @@
 #  Blog: numython.github.io
 #  License: MIT License
 # ***********************************
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-from .core import Element
+from .core import Element, register_kernel
 import nusa.templates as tmp
 from scipy.sparse import csr_matrix
 
@@ -27,6 +28,8 @@ class Spring(Element):
         e1 = Spring((n1,n2), 1000)
     
     """
+    _properties = ("k",) # Stiffness parameters (see Element)
+
     def __init__(self,nodes,ke):
         Element.__init__(self, etype="spring")
         self.nodes = nodes
@@ -62,6 +65,20 @@ class Spring(Element):
         """
         self._KE = np.array([[self.k,-self.k],[-self.k,self.k]])
         return self._KE
+
+    @staticmethod
+    def get_batch_stiffness(X,k):
+        """
+        Stiffness matrices of many springs at once (vectorized).
+
+        *X* : ndarray
+            (ne, 2, 2) nodal coordinates of the elements (not used)
+        *k* : ndarray
+            (ne,) spring stiffness
+
+        Returns a (ne, 2, 2) array.
+        """
+        return np.asarray(k)[:,None,None]*np.array([[1,-1],[-1,1]])
     
     def get_global_stiffness(self,msz):
         pass
@@ -96,6 +113,8 @@ class Bar(Element):
     *A* : float
         Area of element
     """
+    _properties = ("E","A") # Stiffness parameters (see Element)
+
     def __init__(self,nodes,E,A):
         Element.__init__(self,etype="bar")
         self.nodes = nodes
@@ -148,9 +167,11 @@ class Bar(Element):
         """
         Length of element
         """
-        ni,nj = self.get_nodes()
-        x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
-        _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
+        _l = self._get_geometry("L")
+        if _l is None:
+            ni,nj = self.get_nodes()
+            x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
+            _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
         return _l
 
     def get_element_stiffness(self):
@@ -171,6 +192,24 @@ class Bar(Element):
         """
         self._KE = (self.A*self.E/self.L)*np.array([[1,-1],[-1,1]])
         return self._KE
+
+    @staticmethod
+    def get_batch_stiffness(X,E,A,L=None):
+        """
+        Stiffness matrices of many bars at once (vectorized).
+
+        *X* : ndarray
+            (ne, 2, 2) nodal coordinates of the elements
+        *E*, *A* : ndarray
+            (ne,) Young's modulus and cross-section
+        *L* : ndarray
+            Precomputed lengths, *X* is not used if given.
+
+        Returns a (ne, 2, 2) array.
+        """
+        if L is None:
+            L = np.hypot(*(X[:,1] - X[:,0]).T)
+        return (E*A/L)[:,None,None]*np.array([[1,-1],[-1,1]])
         
     def get_nodes(self):
         """
@@ -195,6 +234,8 @@ class Truss(Element):
     *A* : float
         Area of element
     """
+    _properties = ("E","A") # Stiffness parameters (see Element)
+
     def __init__(self,nodes,E,A):
         Element.__init__(self,etype="truss")
         self.nodes = nodes
@@ -206,9 +247,11 @@ class Truss(Element):
         """
         Length of element
         """
-        ni,nj = self.get_nodes()
-        x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
-        _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
+        _l = self._get_geometry("L")
+        if _l is None:
+            ni,nj = self.get_nodes()
+            x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
+            _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
         return _l
     
     @property
@@ -216,13 +259,20 @@ class Truss(Element):
         """
         Element angle, measure from X-positive axis counter-clockwise.
         """
-        ni,nj = self.get_nodes()
-        x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
-        # ~ if x0==x1:
-            # ~ theta = 90*(np.pi/180)
-        # ~ else:
-        theta = np.arctan2((y1-y0),(x1-x0))
+        C, S = self._direction_cosines()
+        theta = np.arctan2(S,C)
         return theta
+
+    def _direction_cosines(self):
+        """
+        cos(theta), sin(theta) (cached by the model)
+        """
+        C = self._get_geometry("C")
+        if C is None:
+            ni,nj = self.get_nodes()
+            L = self.L
+            return (nj.x-ni.x)/L, (nj.y-ni.y)/L
+        return C, self._get_geometry("S")
     
     @property
     def f(self):
@@ -255,10 +305,8 @@ class Truss(Element):
         return s
         
     def _compute_force(self):
-        theta = self.theta
         E, A, L = self.E, self.A, self.L
-        C = np.cos(theta)
-        S = np.sin(theta)
+        C, S = self._direction_cosines()
         ni, nj = self.get_nodes()
         u = np.array([ni.ux, ni.uy, nj.ux, nj.uy]).T
         F = (E*A/L)*np.dot(np.array([-C, -S, C, S]), u)
@@ -269,14 +317,35 @@ class Truss(Element):
         Get stiffness matrix for this element
         """
         multiplier = (self.A*self.E/self.L)
-        C = np.cos(self.theta)
-        S = np.sin(self.theta)
+        C, S = self._direction_cosines()
         CS = C*S
         self._K = multiplier*np.array([[C**2 , CS   , -C**2, -CS  ],
                                        [CS   , S**2 , -CS  , -S**2],
                                        [-C**2, -CS  , C**2 , CS   ],
                                        [-CS  , -S**2,  CS  , S**2 ]])
         return self._K
+
+    @staticmethod
+    def get_batch_stiffness(X,E,A,L=None,C=None,S=None):
+        """
+        Stiffness matrices of many truss elements at once (vectorized).
+
+        *X* : ndarray
+            (ne, 2, 2) nodal coordinates of the elements
+        *E*, *A* : ndarray
+            (ne,) Young's modulus and cross-section
+        *L*, *C*, *S* : ndarray
+            Precomputed lengths and direction cosines, *X* is not used
+            if given.
+
+        Returns a (ne, 4, 4) array.
+        """
+        if L is None or C is None or S is None:
+            d = X[:,1] - X[:,0]
+            L = np.hypot(d[:,0], d[:,1])
+            C, S = d[:,0]/L, d[:,1]/L
+        v = np.column_stack((C, S, -C, -S))
+        return (E*A/L)[:,None,None]*v[:,:,None]*v[:,None,:]
         
     def get_nodes(self):
         return self.nodes
@@ -297,6 +366,8 @@ class Beam(Element):
         Moment of inertia
     
     """
+    _properties = ("E","I") # Stiffness parameters (see Element)
+
     def __init__(self,nodes,E,I):
         Element.__init__(self,etype="beam")
         self.nodes = nodes
@@ -318,6 +389,29 @@ class Beam(Element):
                                        [  a, c,  -a, b]])
         return self._K
 
+    @staticmethod
+    def get_batch_stiffness(X,E,I,L=None):
+        """
+        Stiffness matrices of many beam elements at once (vectorized).
+
+        *X* : ndarray
+            (ne, 2, 2) nodal coordinates of the elements
+        *E*, *I* : ndarray
+            (ne,) Young's modulus and moment of inertia
+        *L* : ndarray
+            Precomputed lengths, *X* is not used if given.
+
+        Returns a (ne, 4, 4) array.
+        """
+        if L is None:
+            L = np.hypot(*(X[:,1] - X[:,0]).T)
+        a, b, c, one = 6*L, 4*L**2, 2*L**2, np.ones_like(L)
+        K = np.stack((np.column_stack(( 12*one, a, -12*one, a)),
+                      np.column_stack((  a,    b,  -a,     c)),
+                      np.column_stack((-12*one,-a,  12*one,-a)),
+                      np.column_stack((  a,    c,  -a,     b))), axis=1)
+        return (E*I/L**3)[:,None,None]*K
+
     def _compute_element_forces(self):
         """
         Just that 
@@ -360,9 +454,11 @@ class Beam(Element):
         """
         Length of element
         """
-        ni,nj = self.get_nodes()
-        x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
-        _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
+        _l = self._get_geometry("L")
+        if _l is None:
+            ni,nj = self.get_nodes()
+            x0,x1,y0,y1 = ni.x, nj.x, ni.y, nj.y
+            _l = np.sqrt( (x1-x0)**2 + (y1-y0)**2 )
         return _l
         
     def get_nodes(self):
@@ -392,6 +488,8 @@ class LinearTriangle(Element):
         n3 = Node((0.5,0.25))
         e1 = LinearTriangle((n1,n2,n3),210e9, 0.3, 0.025)
     """
+    _properties = ("E","nu","t") # Stiffness parameters (see Element)
+
     def __init__(self,nodes,E,nu,t):
         Element.__init__(self,etype="triangle")
         self.nodes = nodes
@@ -478,6 +576,9 @@ class LinearTriangle(Element):
     
     @property
     def B(self):
+        B = self._get_geometry("B")
+        if B is not None:
+            return B
         ni, nj, nm = self.nodes
         A = self.A
         betai = nj.y - nm.y
@@ -494,6 +595,9 @@ class LinearTriangle(Element):
     
     @property
     def A(self):
+        A = self._get_geometry("A")
+        if A is not None:
+            return A
         n1, n2, n3 = self.nodes
         xi, yi = n1.x, n1.y
         xj, yj = n2.x, n2.y
@@ -509,6 +613,56 @@ class LinearTriangle(Element):
         A, nu, t, E = self.A, self.nu, self.t, self.E
         B, D = self.B, self.D
         return t*A*np.dot(np.dot(B.T,D),B)
+
+    @staticmethod
+    def get_batch_geometry(X):
+        """
+        Areas and strain-displacement matrices of many elements at
+        once (vectorized).
+
+        *X* : ndarray
+            (ne, 3, 2) nodal coordinates of the elements
+
+        Returns the (ne,) areas and the (ne, 3, 6) [B] matrices.
+        """
+        x, y = X[:,:,0], X[:,:,1]
+        A = (x[:,0]*(y[:,1]-y[:,2]) + x[:,1]*(y[:,2]-y[:,0]) + x[:,2]*(y[:,0]-y[:,1]))/2
+        beta = np.column_stack((y[:,1]-y[:,2], y[:,2]-y[:,0], y[:,0]-y[:,1]))
+        gamma = np.column_stack((x[:,2]-x[:,1], x[:,0]-x[:,2], x[:,1]-x[:,0]))
+        B = np.zeros((X.shape[0],3,6))
+        B[:,0,0::2] = beta
+        B[:,1,1::2] = gamma
+        B[:,2,0::2] = gamma
+        B[:,2,1::2] = beta
+        with np.errstate(divide="ignore", invalid="ignore"):
+            B *= (1/(2*A))[:,None,None]
+        return A, B
+
+    @staticmethod
+    def get_batch_stiffness(X,E,nu,t,A=None,B=None):
+        r"""
+        Stiffness matrices of many elements at once (vectorized).
+
+        *X* : ndarray
+            (ne, 3, 2) nodal coordinates of the elements
+        *E*, *nu*, *t* : ndarray
+            (ne,) Young's modulus, Poisson ratio and thickness
+        *A*, *B* : ndarray
+            Precomputed areas and [B] matrices (see
+            :meth:`get_batch_geometry`), *X* is not used if given.
+
+        Returns a (ne, 6, 6) array with :math:`[k]_e = tA[B]^T[D][B]`
+        for each element. Batched matmul releases the GIL, so chunks
+        can be computed concurrently (see LinearTriangleModel).
+        """
+        if A is None or B is None:
+            A, B = LinearTriangle.get_batch_geometry(X)
+        D = np.zeros((B.shape[0],3,3))
+        D[:,0,0] = D[:,1,1] = 1
+        D[:,0,1] = D[:,1,0] = nu
+        D[:,2,2] = (1-nu)/2
+        D *= (E/(1-nu**2))[:,None,None]
+        return (t*A)[:,None,None]*np.matmul(np.matmul(B.transpose(0,2,1),D),B)
         
     def get_element_stresses(self):
         ni, nj, nm = self.nodes
@@ -528,6 +682,68 @@ class LinearTriangle(Element):
         return self.nodes
 
 
+#~ ======================  BATCH KERNELS  ======================
+# Stiffness matrices of many elements at once (see core.register_kernel)
+
+def _gather(elements,name):
+    """
+    Attribute *name* of all *elements* as a float array
+    """
+    return np.fromiter((getattr(elm,name) for elm in elements), float, len(elements))
+
+def _geometry(model,elements,key):
+    """
+    Cached geometry *key* (see Model.get_element_geometry) of *elements*
+    """
+    rows = model._get_element_rows()
+    idx = np.fromiter((rows[elm.label] for elm in elements), int, len(elements))
+    return model.get_element_geometry()[key][idx]
+
+@register_kernel(Spring)
+def _spring_kernel(model,elements):
+    return Spring.get_batch_stiffness(None, _gather(elements,"k"))
+
+@register_kernel(Bar)
+def _bar_kernel(model,elements):
+    return Bar.get_batch_stiffness(None, _gather(elements,"E"), _gather(elements,"A"),
+                                   L=_geometry(model,elements,"L"))
+
+@register_kernel(Truss)
+def _truss_kernel(model,elements):
+    return Truss.get_batch_stiffness(None, _gather(elements,"E"), _gather(elements,"A"),
+                                     L=_geometry(model,elements,"L"),
+                                     C=_geometry(model,elements,"C"),
+                                     S=_geometry(model,elements,"S"))
+
+@register_kernel(Beam)
+def _beam_kernel(model,elements):
+    return Beam.get_batch_stiffness(None, _gather(elements,"E"), _gather(elements,"I"),
+                                    L=_geometry(model,elements,"L"))
+
+@register_kernel(LinearTriangle)
+def _triangle_kernel(model,elements):
+    """
+    Computed in chunks of ``model.chunksize`` elements, on a thread
+    pool when ``model.n_workers > 1`` (merged in element order).
+    """
+    E, nu, t = _gather(elements,"E"), _gather(elements,"nu"), _gather(elements,"t")
+    A, B = _geometry(model,elements,"A"), _geometry(model,elements,"B")
+
+    def kernel(chunk):
+        return LinearTriangle.get_batch_stiffness(None, E[chunk], nu[chunk], t[chunk],
+                                                  A=A[chunk], B=B[chunk])
+
+    ne = len(elements)
+    chunksize = getattr(model, "chunksize", ne) or 1
+    n_workers = getattr(model, "n_workers", 1)
+    chunks = [slice(k, k+chunksize) for k in range(0, ne, chunksize)]
+    if n_workers > 1 and len(chunks) > 1:
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            parts = list(pool.map(kernel, chunks))
+    else:
+        parts = [kernel(chunk) for chunk in chunks]
+    return np.concatenate(parts) if parts else np.zeros((0,6,6))
+
 
 
 if __name__=='__main__':
@@ -7,10 +7,14 @@
 """
 The purpose of this module is to provide tools to build 
 a model automatically from text files with coordinates 
-and connectivities.
+and connectivities (or JSON .nusa files), and to write
+results to VTK files (ParaView).
 """
 import numpy as np
 import re
+import os
+import base64
+import json
 
 FLOATS = "[-+]?([0-9]*\.[0-9]+|[0-9]+)"
 
@@ -81,6 +85,304 @@ def ModelFromFiles(nodesfile,elementsfile,model):
         #~ cel = Spring((na,nb))
         #~ model.addElement(cel)
     
-    
+
+
+# ======================== VTK (ParaView) output ========================
+
+VTK_CELL_TYPES = {"spring":3, "bar":3, "truss":3, "beam":3, "triangle":5} # VTK_LINE, VTK_TRIANGLE
+VTK_CELL_NODES = {3:2, 5:3}
+VTK_POLY_VERTEX = 2 # other elements (e.g. superelements): their nodes
+
+VTK_DATA_TYPES = {"f8":"Float64", "i8":"Int64", "u1":"UInt8"}
+
+
+def write_vtu(model,fname,encoding="raw"):
+    """
+    Write the mesh and results of a solved model to a VTK unstructured
+    grid file (.vtu) with appended binary data.
+
+    *model* : :class:`~nusa.core.Model`
+        Solved model
+    *fname* : str
+        Output filename (.vtu)
+    *encoding* : str
+        "raw" (raw binary, smallest and fastest) or "base64"
+
+    Point data: "displacement" vector and the nodal results of the model
+    (averaged stresses and strains for triangles). Cell data: element
+    results (element stresses for triangles, forces for trusses).
+    Elements with other numbers of nodes (e.g. superelements) are
+    written as VTK_POLY_VERTEX cells of their nodes.
+    Arrays are written one by one straight from the model arrays, in
+    little-endian byte order on any platform.
+
+    Example ::
+
+        m.solve()
+        write_vtu(m, "plate.vtu")
+    """
+    if encoding not in ("raw","base64"):
+        raise ValueError("encoding must be 'raw' or 'base64'")
+    X = model.get_coordinates()
+    EC = model.get_connectivity()
+    n, ne = X.shape[0], EC.shape[0]
+    nen = (EC >= 0).sum(axis=1) # nodes of each element (rows padded with -1)
+    points = np.zeros((n,3))
+    points[:,:2] = X
+
+    nodal = model.get_results(model._nodal_fields,"nodes") if model._nodal_fields else {}
+    disp = np.zeros((n,3))
+    for k,var in enumerate(("ux","uy")):
+        if var in nodal:
+            disp[:,k] = np.nan_to_num(nodal[var])
+    point_data = [("displacement",disp)] + list(nodal.items())
+    cell_data = []
+    if model._element_fields:
+        cell_data = list(model.get_results(model._element_fields,"elements").items())
+
+    cell_type = VTK_CELL_TYPES[model.mtype]
+    cells = [("connectivity", EC[EC >= 0].astype("<i8")),
+             ("offsets", np.cumsum(nen, dtype="<i8")),
+             ("types", np.where(nen == VTK_CELL_NODES[cell_type], cell_type,
+                                VTK_POLY_VERTEX).astype("u1"))]
+
+    arrays = [] # (array, xml line) in appended order
+    def data_array(name,array,indent):
+        array = np.ascontiguousarray(array)
+        if array.dtype.kind == "f": array = array.astype("<f8")
+        elif array.dtype.kind == "i": array = array.astype("<i8")
+        ncomp = array.shape[1] if array.ndim == 2 else 1
+        dtype = VTK_DATA_TYPES[array.dtype.str[1:]]
+        arrays.append(array)
+        return ('{0}<DataArray type="{1}" Name="{2}" NumberOfComponents="{3}" '
+                'format="appended" offset="{{{4}}}"/>\n').format(
+                    " "*indent, dtype, name, ncomp, len(arrays)-1)
+
+    xml = ['<?xml version="1.0"?>\n',
+           '<VTKFile type="UnstructuredGrid" version="1.0" byte_order="LittleEndian" '
+           'header_type="UInt64">\n',
+           '  <UnstructuredGrid>\n',
+           '    <Piece NumberOfPoints="{0}" NumberOfCells="{1}">\n'.format(n,ne),
+           '      <Points>\n', data_array("Points",points,8), '      </Points>\n',
+           '      <Cells>\n']
+    xml += [data_array(name,array,8) for name,array in cells]
+    xml += ['      </Cells>\n', '      <PointData Vectors="displacement">\n']
+    xml += [data_array(name,array,8) for name,array in point_data]
+    xml += ['      </PointData>\n', '      <CellData>\n']
+    xml += [data_array(name,array,8) for name,array in cell_data]
+    xml += ['      </CellData>\n', '    </Piece>\n', '  </UnstructuredGrid>\n']
+
+    # Offsets of each block in the appended section
+    offsets, pos = [], 0
+    for array in arrays:
+        offsets.append(pos)
+        nbytes = 8 + array.nbytes
+        pos += nbytes if encoding == "raw" else 4*((nbytes + 2)//3)
+    header = "".join(xml).format(*offsets)
+
+    with open(fname,"wb") as fobj:
+        fobj.write(header.encode("ascii"))
+        fobj.write('  <AppendedData encoding="{0}">\n   _'.format(encoding).encode("ascii"))
+        for array in arrays:
+            block_header = np.array([array.nbytes], dtype="<u8").tobytes()
+            if encoding == "raw":
+                fobj.write(block_header)
+                array.tofile(fobj)
+            else:
+                fobj.write(base64.b64encode(block_header + array.tobytes()))
+        fobj.write(b"\n  </AppendedData>\n</VTKFile>\n")
+
+
+class PVDWriter(object):
+    """
+    Writer for time series (load cases, modes...) of VTU files,
+    collected in a ParaView data file (.pvd).
+
+    *fname* : str
+        Collection filename (.pvd). Each step is written as
+        "<fname without extension>_<step>.vtu" next to it.
+    *encoding* : str
+        See :func:`write_vtu`
+
+    Example ::
+
+        pvd = PVDWriter("cases.pvd")
+        for k,P in enumerate(loads):
+            ... # apply load P and solve
+            pvd.add(m, time=k)
+        pvd.close()
+    """
+    def __init__(self,fname,encoding="raw"):
+        self.fname = fname
+        self.encoding = encoding
+        self.steps = [] # (time, vtu filename)
+
+    def add(self,model,time=None):
+        """
+        Write the current results of *model* as a new step
+        """
+        if time is None: time = len(self.steps)
+        base = os.path.splitext(self.fname)[0]
+        vtu = "{0}_{1}.vtu".format(base, len(self.steps))
+        write_vtu(model, vtu, self.encoding)
+        self.steps.append((time, vtu))
+        return vtu
+
+    def close(self):
+        """
+        Write the .pvd collection file
+        """
+        write_pvd(self.fname, [vtu for t,vtu in self.steps], [t for t,vtu in self.steps])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.close()
+
+
+def write_pvd(fname,files,times=None):
+    """
+    Write a ParaView collection (.pvd) referencing *files* (.vtu),
+    one per time step (*times*, default: 0, 1, 2...).
+    """
+    if times is None: times = range(len(files))
+    dirname = os.path.dirname(os.path.abspath(fname))
+    with open(fname,"w") as fobj:
+        fobj.write('<?xml version="1.0"?>\n')
+        fobj.write('<VTKFile type="Collection" version="0.1">\n  <Collection>\n')
+        for t,vtu in zip(times,files):
+            vtu = os.path.relpath(os.path.abspath(vtu), dirname)
+            fobj.write('    <DataSet timestep="{0}" part="0" file="{1}"/>\n'.format(t,vtu))
+        fobj.write('  </Collection>\n</VTKFile>\n')
+
+
+# ======================== JSON models (.nusa) ========================
+
+def _model_types():
+    """
+    Model and element classes by type name, as used in .nusa files
+    """
+    from .model import SpringModel, BarModel, TrussModel, BeamModel, LinearTriangleModel
+    from .element import Spring, Bar, Truss, Beam, LinearTriangle
+    models = {"spring":SpringModel, "bar":BarModel, "truss":TrussModel,
+              "beam":BeamModel, "triangle":LinearTriangleModel}
+    elements = {"spring":Spring, "bar":Bar, "truss":Truss, "beam":Beam,
+                "triangle":LinearTriangle}
+    return models, elements
+
+
+def model_from_dict(data):
+    """
+    Build a model from a dict (e.g. a parsed .nusa JSON file)::
+
+        {"type": "truss", "name": "Truss 01",
+         "nodes": [[0,0], [1,0], [0,1]],
+         "elements": [{"type": "truss", "connectivity": [[0,1], [1,2]],
+                       "E": 200e9, "A": [1e-4, 2e-4]}],
+         "constraints": [{"nodes": [0], "ux": 0, "uy": 0}],
+         "forces": [{"nodes": [1], "fy": -1000}]}
+
+    Node labels are the positions in "nodes". Element properties
+    (see ``_properties``: k, E, A, I, nu, t), prescribed displacements
+    and loads are given by one value, or one value per element/node.
+    """
+    models, elements = _model_types()
+    from .core import Node
+    mtype = data["type"]
+    if mtype not in models:
+        raise ValueError("Model type must be one of: " + ", ".join(models))
+    m = models[mtype](data.get("name", mtype.capitalize() + " Model 01"))
+    nodes = [Node((x,y)) for x,y in data["nodes"]]
+    for node in nodes:
+        m.add_node(node)
+    for group in data.get("elements", []):
+        cls = elements[group.get("type", mtype)]
+        conn = group["connectivity"]
+        props = [np.broadcast_to(group[name], (len(conn),)).tolist() for name in cls._properties]
+        for k,labels in enumerate(conn):
+            m.add_element(cls(tuple(nodes[j] for j in labels), *[p[k] for p in props]))
+    apply_constraints(m, data.get("constraints", []))
+    apply_loads(m, data.get("forces", []))
+    return m
+
+
+def apply_constraints(model,constraints):
+    """
+    Prescribe displacements given as [{"nodes": [...], "ux": ...}, ...]
+    """
+    for spec in constraints:
+        spec = dict(spec)
+        model.add_constraints(np.asarray(spec.pop("nodes"), dtype=int), **spec)
+
+
+def apply_loads(model,forces,reset=False):
+    """
+    Apply loads given as [{"nodes": [...], "fx": ..., "fy": ...}, ...]
+    (all the previous loads are removed if *reset*)
+    """
+    model._check_dof_map()
+    if reset:
+        model.f[:] = 0.0
+        model.mark_dirty("loads")
+    for spec in forces:
+        spec = dict(spec)
+        model.add_forces(np.asarray(spec.pop("nodes"), dtype=int), **spec)
+
+
+def model_to_dict(model):
+    """
+    Dict of a model (see :func:`model_from_dict`), JSON-serializable
+    """
+    models, elements = _model_types()
+    names = dict((cls,name) for name,cls in elements.items())
+    model._check_dof_map()
+    data = {"type": model.mtype, "name": model.name,
+            "nodes": model.get_coordinates().tolist(), "elements": []}
+    groups = {}
+    for elm in model.get_elements():
+        if type(elm) not in names:
+            raise ValueError("Elements of type {0} can't be written".format(type(elm).__name__))
+        groups.setdefault(type(elm), []).append(elm)
+    for cls,elms in groups.items():
+        group = {"type": names[cls],
+                 "connectivity": [[nd.label for nd in elm.get_nodes()] for elm in elms]}
+        for name in cls._properties:
+            values = [float(getattr(elm,name)) for elm in elms]
+            group[name] = values[0] if len(set(values)) == 1 else values
+        data["elements"].append(group)
+    labels = np.arange(len(model.dofmap))
+    data["constraints"], data["forces"] = [], []
+    for k,(dof,force) in enumerate(zip(model.dof_names, model.force_names)):
+        eqs = model.dofmap[:,k]
+        known = model._known[eqs]
+        if np.any(known):
+            data["constraints"].append({"nodes": labels[known].tolist(), dof: model.u[eqs][known].tolist()})
+        loaded = model.f[eqs] != 0
+        if np.any(loaded):
+            data["forces"].append({"nodes": labels[loaded].tolist(), force: model.f[eqs][loaded].tolist()})
+    return data
+
+
+def load_model(filename):
+    """
+    Read a model from a .nusa (JSON) file, see :func:`model_from_dict`.
+
+    Not to be confused with ``nusa.read_model(filename, mtype)``, which
+    reads the older per-type JSON files (e.g. nusa/data/truss_model.nusa).
+    """
+    with open(filename) as fobj:
+        return model_from_dict(json.load(fobj))
+
+
+def save_model(model,filename):
+    """
+    Write a model to a .nusa (JSON) file, see :func:`model_to_dict`
+    """
+    with open(filename,"w") as fobj:
+        json.dump(model_to_dict(model), fobj)
+
+
+
 if __name__=='__main__':
     pass
@@ -0,0 +1,133 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Matrix-free (element-by-element) stiffness operator.
+
+The global matrix is never assembled: K·u gathers the element DOFs of
+u, multiplies them by the element matrices and scatter-adds the
+products back, so memory scales with the number of elements instead
+of the non-zeros of K. Systems are solved by preconditioned conjugate
+gradients (Jacobi preconditioner, computed element-wise).
+
+Models use it with ``matrix_free`` (see :meth:`~nusa.core.Model.solve`)::
+
+    m = LinearTriangleModel()
+    ...
+    m.matrix_free = "onthefly" # or "cached"
+    m.solve()
+    print(m.profile.info["iterations"])
+"""
+import numpy as np
+import numpy.linalg as la
+import scipy.sparse.linalg as spla
+
+
+class ElementOperator(spla.LinearOperator):
+    """
+    Global stiffness matrix as a :class:`scipy.sparse.linalg.LinearOperator`.
+
+    *edofs* : (ne, k) int array
+        Global DOFs of each element
+    *n* : int
+        Number of global DOFs
+    *KE* : (ne, k, k) array
+        Element matrices ("cached" mode), or None
+    *kernel* : callable
+        ``kernel(chunk)`` returns the element matrices of the elements
+        in the slice *chunk*; used when *KE* is None, element matrices
+        are then recomputed at every product ("onthefly" mode)
+    *chunksize* : int
+        Elements per chunk in "onthefly" mode
+    """
+    def __init__(self,edofs,n,KE=None,kernel=None,chunksize=50000):
+        if KE is None and kernel is None:
+            raise ValueError("KE or kernel must be given")
+        spla.LinearOperator.__init__(self, dtype=np.float64, shape=(n,n))
+        self.edofs = edofs
+        self.KE = KE
+        self.kernel = kernel
+        self.chunksize = chunksize
+        self._diagonal = None
+
+    def _chunks(self):
+        ne = len(self.edofs)
+        if self.KE is not None:
+            yield slice(0, ne), self.KE
+            return
+        for k in range(0, ne, self.chunksize):
+            chunk = slice(k, k+self.chunksize)
+            yield chunk, self.kernel(chunk)
+
+    def _matvec(self,u):
+        u = np.ravel(u)
+        y = np.zeros(self.shape[0])
+        for chunk,KE in self._chunks():
+            edofs = self.edofs[chunk]
+            Y = np.matmul(KE, u[edofs][:,:,None])[:,:,0]
+            y += np.bincount(edofs.ravel(), weights=Y.ravel(), minlength=len(y))
+        return y
+
+    def _rmatvec(self,u):
+        return self._matvec(u) # K is symmetric
+
+    def diagonal(self):
+        """
+        Diagonal of K (summed element-wise, cached)
+        """
+        if self._diagonal is None:
+            d = np.zeros(self.shape[0])
+            for chunk,KE in self._chunks():
+                d += np.bincount(self.edofs[chunk].ravel(),
+                                 weights=np.diagonal(KE, axis1=1, axis2=2).ravel(),
+                                 minlength=len(d))
+            self._diagonal = d
+        return self._diagonal
+
+    def submatrix(self,rows,cols):
+        """
+        Operator of K[rows][:,cols] (e.g. free x free DOFs)
+        """
+        return submatrix(self, rows, cols)
+
+
+def submatrix(K,rows,cols):
+    """
+    Operator of K[rows][:,cols] for any matrix or operator *K* with a
+    ``dot`` method, K itself is not sliced (nor copied).
+    """
+    n = K.shape[1]
+    def matvec(x):
+        u = np.zeros(n)
+        u[cols] = np.ravel(x)
+        return K.dot(u)[rows]
+    return spla.LinearOperator((len(rows),len(cols)), matvec=matvec, dtype=np.float64)
+
+
+def jacobi_cg(K,b,diagonal,tol=1e-10,maxiter=None):
+    """
+    Solve K x = b (K symmetric positive definite) by conjugate
+    gradients with a Jacobi (diagonal) preconditioner.
+
+    Returns the solution and the number of iterations, raises
+    :class:`numpy.linalg.LinAlgError` if CG does not converge.
+    """
+    d = np.where(diagonal != 0, diagonal, 1.0)
+    M = spla.LinearOperator(K.shape, matvec=lambda r: np.ravel(r)/d, dtype=np.float64)
+    iterations = [0]
+    def callback(xk):
+        iterations[0] += 1
+    try:
+        x, info = spla.cg(K, b, rtol=tol, atol=0.0, maxiter=maxiter, M=M, callback=callback)
+    except TypeError: # scipy < 1.12
+        x, info = spla.cg(K, b, tol=tol, atol=0.0, maxiter=maxiter, M=M, callback=callback)
+    if info != 0:
+        raise la.LinAlgError("CG did not converge in {0} iterations".format(iterations[0]))
+    return x, iterations[0]
+
+
+if __name__=='__main__':
+    pass
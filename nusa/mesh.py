@@ -4,8 +4,51 @@
 #  Blog: numython.github.io
 #  License: MIT License
 # ***********************************
+import numpy as np
 import nusa._mesh as msh
 import meshio
+from scipy.spatial import cKDTree
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+def merge_coincident_nodes(nc,ec,tol=1e-8):
+    """
+    Merge nodes closer than *tol* and remap the connectivity.
+
+    *nc* : ndarray
+        (n, 2) or (n, 3) nodal coordinates
+    *ec* : ndarray
+        (ne, nen) connectivity (indices into *nc*)
+    *tol* : float
+        Distance tolerance
+
+    Pairs of close nodes are found with a KD-tree, and each group of
+    connected pairs is replaced by its first node, so the order of the
+    remaining nodes is preserved. Elements that collapse (repeated
+    nodes after merging) are removed.
+
+    Returns the new coordinates, the new connectivity and the number
+    of merged nodes.
+    """
+    nc = np.asarray(nc)
+    ec = np.asarray(ec, dtype=int)
+    n = len(nc)
+    pairs = cKDTree(nc).query_pairs(tol, output_type="ndarray")
+    if len(pairs) == 0:
+        return nc, ec, 0
+    graph = coo_matrix((np.ones(len(pairs)), (pairs[:,0], pairs[:,1])), shape=(n,n))
+    groups = connected_components(graph, directed=False)[1]
+    _, first, inverse = np.unique(groups, return_index=True, return_inverse=True)
+    order = np.argsort(first) # groups sorted by their first node
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    newindex = rank[inverse.ravel()]
+    ec = newindex[ec]
+    srt = np.sort(ec, axis=1)
+    ec = ec[np.all(srt[:,1:] != srt[:,:-1], axis=1)]
+    return nc[first[order]], ec, n - len(first)
+
 
 class Modeler(object):
     def __init__(self):
@@ -125,12 +168,31 @@ class Modeler(object):
         self.ec = ec
         return nc,ec
 
-    def generate_mesh_from_file(self,filename):
+    def generate_mesh_from_file(self,filename,merge_tol=None):
+        """
+        Read a triangle mesh (any format supported by meshio). If
+        *merge_tol* is given, coincident nodes are merged (see
+        :meth:`merge_coincident_nodes`).
+        """
         mesh = meshio.read(filename)
         self.nc = mesh.points
         self.x, self.y = self.nc[:,0], self.nc[:,1]
         self.ec = mesh.cells_dict["triangle"]
-        return mesh.points, mesh.cells_dict["triangle"]
+        if merge_tol is not None:
+            self.merge_coincident_nodes(merge_tol)
+        return self.nc, self.ec
+
+    def merge_coincident_nodes(self,tol=1e-8):
+        """
+        Merge the coincident nodes of the generated mesh (e.g. meshes
+        stitched from several surfaces), which otherwise are mechanisms
+        of the model.
+
+        Returns the number of merged nodes.
+        """
+        self.nc, self.ec, merged = merge_coincident_nodes(self.nc, self.ec, tol)
+        self.x, self.y = self.nc[:,0], self.nc[:,1]
+        return merged
 
     
 if __name__=='__main__':
@@ -6,10 +6,11 @@
 # ***********************************
 import re
 import numpy as np
-import numpy.linalg as la
+import scipy.sparse.linalg as spla
 import nusa.templates as tmp
 import matplotlib.pyplot as plt
-from .core import Model
+from .core import Model, SOLUTION_ALIASES
+from .superelement import Superelement
 
 #~ *********************************************************************
 #~ ****************************  SpringModel ***************************
@@ -21,123 +22,48 @@ class SpringModel(Model):
     """
     def __init__(self,name="Spring Model 01"):
         Model.__init__(self,name=name,mtype="spring")
-        self.F = {} # Forces
-        self.U = {} # Displacements
         self.dof = 1 # 1 DOF per Node
-        self.IS_KG_BUILDED = False
-
-    def build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes() # Matrix size
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            self.KG[n1.label, n1.label] += ku[0,0]
-            self.KG[n1.label, n2.label] += ku[0,1]
-            self.KG[n2.label, n1.label] += ku[1,0]
-            self.KG[n2.label, n2.label] += ku[1,1]
-        
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-        
-    def _build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes() # Matrix size
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            for ii,jj in self._nodal_index(n1.label,n2.label):
-                self.KG[ii[0],ii[1]] += ku[jj[0],jj[1]]
-        
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-        
-    def _nodal_index(self,ii,jj):
-        from itertools import product,izip
-        iter1 = product((ii,jj),repeat=2)
-        iter2 = product((0,1),repeat=2)
-        return izip(iter1,iter2)
-        
-    def build_forces_vector(self):
-        for node in self.nodes.values():
-            self.F[node.label] = {"fx":0, "fy":0}
-        
-    def build_displacements_vector(self):
-        for node in self.nodes.values():
-            self.U[node.label] = {"ux":np.nan, "uy":np.nan}
-        
+        self.dof_names = ("ux",)
+        self.force_names = ("fx",)
+        self._nodal_fields = ("ux","fx")
+        self._element_fields = ("f",)
+
     def add_force(self,node,force):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["fx"] = force[0]
+        self._check_dof_map()
+        node.fx = force[0]
         
     def add_constraint(self,node,**constraint):
         """
         Only displacement in x-dir 
         """
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
+        self._check_dof_map()
         if "ux" in constraint:
-            ux = constraint.get("ux")
-            node.set_displacements(ux=ux)
-            self.U[node.label]["ux"] = ux
+            node.ux = constraint.get("ux")
         
-    def solve(self):
-        # known and unknown values
-        self.VU = [node[key] for node in self.U.values() for key in ("ux",)]
-        self.VF = [node[key] for node in self.F.values() for key in ("fx",)]
-        knw = [pos for pos,value in enumerate(self.VU) if not value is np.nan]
-        unknw = [pos for pos,value in enumerate(self.VU) if value is np.nan]
-        # Matrices to solve
-        self.K2S = np.delete(np.delete(self.KG,knw,0),knw,1)
-        self.F2S = np.delete(self.VF,knw,0)
-        # For displacements
-        self.solved_u = la.solve(self.K2S,self.F2S)
-        # Updating U (displacements vector)
-        for k,ic in enumerate(unknw):
-            nd, var = self.index2key(ic)
-            self.U[nd][var] = self.solved_u[k]
-            self.nodes[ic].ux = self.solved_u[k]
-        # For nodal forces/reactions
-        self.NF = self.F.copy()
-        self.VU = [node[key] for node in self.U.values() for key in ("ux",)]
-        nf_calc = np.dot(self.KG, self.VU)
-        for k,ic in enumerate(range(self.get_number_of_nodes())):
-            nd, var = self.index2key(ic, ("fx",))
-            self.NF[nd][var] = nf_calc[k]
-            self.nodes[ic].fx = nf_calc[k]
-            
     def index2key(self,idx,opts=("ux",)):
         node = idx
         var = opts[0]
         return node,var
 
-    def simple_report(self,report_type="print",fname="nusa_rpt.txt"):
-        from .templates import SPRING_SIMPLE_REPORT
-        options = {"headers":"firstrow",
-                   "tablefmt":"rst",
-                   "numalign":"right"}
-        _str = SPRING_SIMPLE_REPORT.format(
-                model_name=self.name,
-                nodes=self.get_number_of_nodes(),
-                elements=self.get_number_of_elements(),
-                nodal_displacements=self._get_ndisplacements(options),
-                nodal_forces=self._get_nforces(options),
-                element_forces=self._get_eforces(options),
-                nodes_info=self._get_nodes_info(options),
-                elements_info=self._get_elements_info(options))
-        if report_type=="print": print(_str)
-        elif report_type=="write": self._write_report(_str, fname)
-        elif report_type=="string": return _str
-        else: return _str
-
-    def _get_eforces(self,options):
-        from tabulate import tabulate
-        F = [["Element","F"]]
-        for elm in self.get_elements():
-            F.append([elm.label+1, elm.fx])
-        return tabulate(F, **options)
-        
+    def get_esol(self,var):
+        """
+        Element results as arrays. "f" (or "fx") is the spring force,
+        computed for all elements at once as k*(uj - ui).
+        """
+        if var in ("f","fx"):
+            EC = self.get_connectivity()
+            ux = self.get_nsol("ux")
+            k = self._get_element_property("k")
+            return k*(ux[EC[:,1]] - ux[EC[:,0]])
+        return Model.get_esol(self,var)
+
+    def _report_results(self):
+        nlabels = np.array([n.label for n in self.get_nodes()]) + 1
+        elabels = np.array([e.label for e in self.get_elements()]) + 1
+        return [("NODAL DISPLACEMENTS", ("Node","UX"), (nlabels, self.get_nsol("ux")), "dg"),
+                ("NODAL FORCES", ("Node","FX"), (nlabels, self.get_nsol("fx")), "dg"),
+                ("ELEMENT FORCES", ("Element","F"), (elabels, self.get_esol("f")), "dg")]
+
 
 
 #~ *********************************************************************
@@ -149,84 +75,41 @@ class BarModel(Model):
     """
     def __init__(self,name="Bar Model 01"):
         Model.__init__(self,name=name,mtype="bar")
-        self.F = {} # Forces
-        self.U = {} # Displacements
         self.dof = 1 # 1 DOF for bar element (per node)
-        self.IS_KG_BUILDED = False
-        
-    def build_forces_vector(self):
-        for node in self.nodes.values():
-            self.F[node.label] = {"fx":0, "fy":0}
-        
-    def build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes()
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            self.KG[n1.label, n1.label] += ku[0,0]
-            self.KG[n1.label, n2.label] += ku[0,1]
-            self.KG[n2.label, n1.label] += ku[1,0]
-            self.KG[n2.label, n2.label] += ku[1,1]
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-        
-    def build_displacements_vector(self):
-        for node in self.nodes.values():
-            self.U[node.label] = {"ux":np.nan, "uy":np.nan}
+        self.dof_names = ("ux",)
+        self.force_names = ("fx",)
+        self._nodal_fields = ("ux","fx")
+        self._element_fields = ("f","s")
         
     def add_force(self,node,force):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["fx"] = force[0]
+        self._check_dof_map()
+        node.fx = force[0]
         
     def add_constraint(self,node,**constraint):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
+        self._check_dof_map()
         if "ux" in constraint:
-            ux = constraint.get('ux')
-            node.set_displacements(ux=ux)
-            self.U[node.label]["ux"] = ux
-        
-    def solve(self):
-        # known and unknown values
-        self.VU = [node[key] for node in self.U.values() for key in ("ux",)]
-        self.VF = [node[key] for node in self.F.values() for key in ("fx",)]
-        knw = [pos for pos,value in enumerate(self.VU) if not value is np.nan]
-        unknw = [pos for pos,value in enumerate(self.VU) if value is np.nan]
+            node.ux = constraint.get('ux')
         
-        if len(unknw)==1:
-            _k = unknw[0]
-            _rowtmp = self.KG[_k,:]
-            _ftmp = self.VF[_k]
-            _fk = _ftmp - np.dot(np.delete(_rowtmp,_k), np.delete(self.VU,_k))
-            _uk = _fk / self.KG[_k, _k]
-            # Then 
-            self.solved_u = np.array([_uk])
-        else: # "Normal" case
-            self.K2S = np.delete(np.delete(self.KG,knw,0),knw,1)
-            self.F2S = np.delete(self.VF,knw,0)
-            self.solved_u = la.solve(self.K2S,self.F2S)
-            
-        # For displacements
-        # Updating U (displacements vector)
-        for k,ic in enumerate(unknw):
-            nd, var = self.index2key(ic)
-            self.U[nd][var] = self.solved_u[k]
-            self.nodes[ic].ux = self.solved_u[k]
-        # For nodal forces/reactions
-        self.NF = self.F.copy()
-        self.VU = [node[key] for node in self.U.values() for key in ("ux",)]
-        nf_calc = np.dot(self.KG, self.VU)
-        for k,ic in enumerate(range(self.get_number_of_nodes())):
-            nd, var = self.index2key(ic, ("fx",))
-            self.NF[nd][var] = nf_calc[k]
-            self.nodes[ic].fx = nf_calc[k]
-
     def index2key(self,idx,opts=("ux",)):
         node = idx
         var = opts[0]
         return node,var
 
+    def get_esol(self,var):
+        """
+        Element results as arrays: "f" (axial force) and "s" (axial
+        stress), computed for all elements at once.
+        """
+        if var in ("f","s"):
+            EC = self.get_connectivity()
+            ux = self.get_nsol("ux")
+            E = self._get_element_property("E")
+            A = self._get_element_property("A")
+            L = self.get_element_geometry()["L"]
+            f = (E*A/L)*(ux[EC[:,1]] - ux[EC[:,0]])
+            return f if var=="f" else f/A
+        return Model.get_esol(self,var)
+
 
 
 #~ *********************************************************************
@@ -238,110 +121,25 @@ class TrussModel(Model):
     """
     def __init__(self,name="Truss Model 01"):
         Model.__init__(self,name=name,mtype="truss")
-        self.F = {} # Forces
-        self.U = {} # Displacements
         self.dof = 2 # 2 DOF for truss element
-        self.IS_KG_BUILDED = False
-        
-    def build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes()
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            self.KG[2*n1.label, 2*n1.label] += ku[0,0]
-            self.KG[2*n1.label, 2*n1.label+1] += ku[0,1]
-            self.KG[2*n1.label, 2*n2.label] += ku[0,2]
-            self.KG[2*n1.label, 2*n2.label+1] += ku[0,3]
-            
-            self.KG[2*n1.label+1, 2*n1.label] += ku[1,0]
-            self.KG[2*n1.label+1, 2*n1.label+1] += ku[1,1]
-            self.KG[2*n1.label+1, 2*n2.label] += ku[1,2]
-            self.KG[2*n1.label+1, 2*n2.label+1] += ku[1,3]
-            
-            self.KG[2*n2.label, 2*n1.label] += ku[2,0]
-            self.KG[2*n2.label, 2*n1.label+1] += ku[2,1]
-            self.KG[2*n2.label, 2*n2.label] += ku[2,2]
-            self.KG[2*n2.label, 2*n2.label+1] += ku[2,3]
-            
-            self.KG[2*n2.label+1, 2*n1.label] += ku[3,0]
-            self.KG[2*n2.label+1, 2*n1.label+1] += ku[3,1]
-            self.KG[2*n2.label+1, 2*n2.label] += ku[3,2]
-            self.KG[2*n2.label+1, 2*n2.label+1] += ku[3,3]
-            
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-        
-    def build_forces_vector(self):
-        for node in self.nodes.values():
-            self.F[node.label] = {"fx":0, "fy":0}
+        self.dof_names = ("ux","uy")
+        self.force_names = ("fx","fy")
+        self._nodal_fields = ("ux","uy","fx","fy")
+        self._element_fields = ("f","s")
         
-    def build_displacements_vector(self):
-        for node in self.nodes.values():
-            self.U[node.label] = {"ux":np.nan, "uy":np.nan}
-    
     def add_force(self,node,force):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["fx"] = force[0]
-        self.F[node.label]["fy"] = force[1]
+        self._check_dof_map()
         node.fx = force[0]
         node.fy = force[1]
         
     def add_constraint(self,node,**constraint):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
+        self._check_dof_map()
         cs = constraint
-        if "ux" in cs and "uy" in cs: #
-            ux = cs.get('ux')
-            uy = cs.get('uy')
-            node.set_displacements(ux=ux, uy=uy) # eqv to node.ux = ux, node.uy = uy
-            self.U[node.label]["ux"] = ux
-            self.U[node.label]["uy"] = uy
-        elif "ux" in cs:
-            ux = cs.get('ux')
-            node.set_displacements(ux=ux)
-            self.U[node.label]["ux"] = ux
-        elif "uy" in cs:
-            uy = cs.get('uy')
-            node.set_displacements(uy=uy)
-            self.U[node.label]["uy"] = uy
-        else: pass # todo
+        if "ux" in cs:
+            node.ux = cs.get('ux')
+        if "uy" in cs:
+            node.uy = cs.get('uy')
         
-    def solve(self):
-        # Solve LS
-        self.VU = [node[key] for node in self.U.values() for key in ("ux","uy")]
-        self.VF = [node[key] for node in self.F.values() for key in ("fx","fy")]
-        knw = [pos for pos,value in enumerate(self.VU) if not value is np.nan]
-        unknw = [pos for pos,value in enumerate(self.VU) if value is np.nan]
-        self.K2S = np.delete(np.delete(self.KG,knw,0),knw,1)
-        self.F2S = np.delete(self.VF,knw,0)
-        
-        # For displacements
-        self.solved_u = la.solve(self.K2S,self.F2S)
-        for k,ic in enumerate(unknw):
-            nd, var = self.index2key(ic)
-            self.U[nd][var] = self.solved_u[k]
-            
-        # Updating nodes displacements
-        for nd in self.nodes.values():
-            if np.isnan(nd.ux):
-                nd.ux = self.U[nd.label]["ux"]
-            if np.isnan(nd.uy):
-                nd.uy = self.U[nd.label]["uy"]
-                    
-        # For nodal forces/reactions
-        self.NF = self.F.copy()
-        self.VU = [node[key] for node in self.U.values() for key in ("ux","uy")]
-        nf_calc = np.dot(self.KG, self.VU)
-        for k in range(2*self.get_number_of_nodes()):
-            nd, var = self.index2key(k, ("fx","fy"))
-            self.NF[nd][var] = nf_calc[k]
-            cnlab = np.floor(k/float(self.dof))
-            if var=="fx": 
-                self.nodes[cnlab].fx = nf_calc[k]
-            elif var=="fy":
-                self.nodes[cnlab].fy = nf_calc[k]
-                
     def index2key(self,idx,opts=("ux","uy")):
         """
         Index to key, where key can be ux or uy
@@ -360,6 +158,7 @@ class TrussModel(Model):
         ax = fig.add_subplot(111)
         
         for elm in self.get_elements():
+            if isinstance(elm, Superelement): continue
             ni, nj = elm.get_nodes()
             ax.plot([ni.x,nj.x],[ni.y,nj.y],"b-")
             for nd in (ni,nj):
@@ -416,6 +215,7 @@ class TrussModel(Model):
         df = dfactor*self._calculate_deformed_factor()
         
         for elm in self.get_elements():
+            if isinstance(elm, Superelement): continue
             ni,nj = elm.get_nodes()
             x, y = [ni.x,nj.x], [ni.y,nj.y]
             xx = [ni.x+ni.ux*df, nj.x+nj.ux*df]
@@ -458,73 +258,33 @@ class TrussModel(Model):
         ky = (ymx-ymn)/factor
         return xmn-kx, xmx+kx, ymn-ky, ymx+ky
         
-    def simple_report(self,report_type="print",fname="nusa_rpt.txt"):
-        from .templates import TRUSS_SIMPLE_REPORT
-        options = {"headers":"firstrow",
-                   "tablefmt":"rst",
-                   "numalign":"right"}
-        _str = TRUSS_SIMPLE_REPORT.format(
-                model_name=self.name,
-                nodes=self.get_number_of_nodes(),
-                elements=self.get_number_of_elements(),
-                nodal_displacements=self._get_ndisplacements(options),
-                nodal_forces=self._get_nforces(options),
-                element_forces=self._get_eforces(options),
-                element_stresses=self._get_estresses(options),
-                nodes_info=self._get_nodes_info(options),
-                elements_info=self._get_elements_info(options))
-        if report_type=="print": print(_str)
-        elif report_type=="write": self._write_report(_str, fname)
-        elif report_type=="string": return _str
-        else: return _str
-        
-    def _write_report(self,txt,fname):
-        fobj = open(fname,"w")
-        fobj.write(txt)
-        fobj.close()
-        
-    def _get_ndisplacements(self,options):
-        from tabulate import tabulate
-        D = [["Node","UX","UY"]]
-        for n in self.get_nodes():
-            D.append([n.label+1,n.ux,n.uy])
-        return tabulate(D, **options)
-        
-    def _get_nforces(self,options):
-        from tabulate import tabulate
-        F = [["Node","FX","FY"]]
-        for n in self.get_nodes():
-            F.append([n.label+1,n.fx,n.fy])
-        return tabulate(F, **options)
-        
-    def _get_eforces(self,options):
-        from tabulate import tabulate
-        F = [["Element","F"]]
-        for elm in self.get_elements():
-            F.append([elm.label+1, elm.f])
-        return tabulate(F, **options)
-        
-    def _get_estresses(self,options):
-        from tabulate import tabulate
-        S = [["Element","S"]]
-        for elm in self.get_elements():
-            S.append([elm.label+1, elm.s])
-        return tabulate(S, **options)
-    
-    def _get_nodes_info(self,options):
-        from tabulate import tabulate
-        F = [["Node","X","Y"]]
-        for n in self.get_nodes():
-            F.append([n.label+1, n.x, n.y])
-        return tabulate(F, **options)
-    
-    def _get_elements_info(self,options):
-        from tabulate import tabulate
-        S = [["Element","NI","NJ"]]
-        for elm in self.get_elements():
-            ni, nj = elm.get_nodes()
-            S.append([elm.label+1, ni.label+1, nj.label+1])
-        return tabulate(S, **options)
+    def get_esol(self,var):
+        """
+        Element results as arrays. "f" (axial force) and "s" (axial
+        stress) are computed for all elements in a single vectorized pass.
+        """
+        if var in ("f","s"):
+            EC = self.get_connectivity()
+            U = np.column_stack((self.get_nsol("ux"), self.get_nsol("uy")))
+            E = self._get_element_property("E")
+            A = self._get_element_property("A")
+            geom = self.get_element_geometry()
+            du = U[EC[:,1]] - U[EC[:,0]]
+            f = (E*A/geom["L"])*(geom["C"]*du[:,0] + geom["S"]*du[:,1])
+            return f if var=="f" else f/A
+        return Model.get_esol(self,var)
+
+    def _report_results(self):
+        nlabels = np.array([n.label for n in self.get_nodes()]) + 1
+        elabels = np.array([e.label for e in self.get_elements()]) + 1
+        f = self.get_esol("f")
+        A = self._get_element_property("A")
+        return [("NODAL DISPLACEMENTS", ("Node","UX","UY"),
+                    (nlabels, self.get_nsol("ux"), self.get_nsol("uy")), "dgg"),
+                ("NODAL FORCES", ("Node","FX","FY"),
+                    (nlabels, self.get_nsol("fx"), self.get_nsol("fy")), "dgg"),
+                ("ELEMENT FORCES", ("Element","F"), (elabels, f), "dg"),
+                ("ELEMENT STRESSES", ("Element","S"), (elabels, f/A), "dg")]
 
 
 
@@ -537,147 +297,35 @@ class BeamModel(Model):
     """
     def __init__(self,name="Beam Model 01"):
         Model.__init__(self,name=name,mtype="beam")
-        self.F = {} # Forces
-        self.U = {} # Displacements
         self.dof = 2 # 2 DOF for beam element
-        self.IS_KG_BUILDED = False
+        self.dof_names = ("uy","ur")
+        self.force_names = ("fy","m")
+        self._nodal_fields = ("uy","ur","fy","m")
         
-    def build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes()
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            self.KG[2*n1.label, 2*n1.label] += ku[0,0]
-            self.KG[2*n1.label, 2*n1.label+1] += ku[0,1]
-            self.KG[2*n1.label, 2*n2.label] += ku[0,2]
-            self.KG[2*n1.label, 2*n2.label+1] += ku[0,3]
-            
-            self.KG[2*n1.label+1, 2*n1.label] += ku[1,0]
-            self.KG[2*n1.label+1, 2*n1.label+1] += ku[1,1]
-            self.KG[2*n1.label+1, 2*n2.label] += ku[1,2]
-            self.KG[2*n1.label+1, 2*n2.label+1] += ku[1,3]
-            
-            self.KG[2*n2.label, 2*n1.label] += ku[2,0]
-            self.KG[2*n2.label, 2*n1.label+1] += ku[2,1]
-            self.KG[2*n2.label, 2*n2.label] += ku[2,2]
-            self.KG[2*n2.label, 2*n2.label+1] += ku[2,3]
-            
-            self.KG[2*n2.label+1, 2*n1.label] += ku[3,0]
-            self.KG[2*n2.label+1, 2*n1.label+1] += ku[3,1]
-            self.KG[2*n2.label+1, 2*n2.label] += ku[3,2]
-            self.KG[2*n2.label+1, 2*n2.label+1] += ku[3,3]
-            
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-    
-    def _build_global_matrix(self):
-        msz = (self.dof)*self.get_number_of_nodes()
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2 = element.get_nodes()
-            self.KG[2*n1.label, 2*n1.label] += ku[0,0]
-            self.KG[2*n1.label, 2*n1.label+1] += ku[0,1]
-            self.KG[2*n1.label, 2*n2.label] += ku[0,2]
-            self.KG[2*n1.label, 2*n2.label+1] += ku[0,3]
-            
-            self.KG[2*n1.label+1, 2*n1.label] += ku[1,0]
-            self.KG[2*n1.label+1, 2*n1.label+1] += ku[1,1]
-            self.KG[2*n1.label+1, 2*n2.label] += ku[1,2]
-            self.KG[2*n1.label+1, 2*n2.label+1] += ku[1,3]
-            
-            self.KG[2*n2.label, 2*n1.label] += ku[2,0]
-            self.KG[2*n2.label, 2*n1.label+1] += ku[2,1]
-            self.KG[2*n2.label, 2*n2.label] += ku[2,2]
-            self.KG[2*n2.label, 2*n2.label+1] += ku[2,3]
-            
-            self.KG[2*n2.label+1, 2*n1.label] += ku[3,0]
-            self.KG[2*n2.label+1, 2*n1.label+1] += ku[3,1]
-            self.KG[2*n2.label+1, 2*n2.label] += ku[3,2]
-            self.KG[2*n2.label+1, 2*n2.label+1] += ku[3,3]
-            
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-    
-    def build_forces_vector(self):
-        for node in self.nodes.values():
-            self.F[node.label] = {"fy":0.0, "m":0.0} # (fy, m)
-            
-    def build_displacements_vector(self):
-        for node in self.nodes.values():
-            self.U[node.label] = {"uy":np.nan, "ur":np.nan} # (uy, r)
-    
     def add_force(self,node,force):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["fy"] = force[0]
+        self._check_dof_map()
         node.fy = force[0]
         
     def add_moment(self,node,moment):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["m"] = moment[0]
+        self._check_dof_map()
         node.m = moment[0]
         
     def add_constraint(self,node,**constraint):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
+        self._check_dof_map()
         cs = constraint
         if "ux" in cs and "uy" in cs and "ur" in cs: # 
-            ux = cs.get('ux')
-            uy = cs.get('uy')
-            ur = cs.get('ur')
-            node.set_displacements(ux=ux, uy=uy, ur=ur)
             #~ print("Encastre")
-            self.U[node.label]["uy"] = uy
-            self.U[node.label]["ur"] = ur
+            node.ux = cs.get('ux')
+            node.uy = cs.get('uy')
+            node.ur = cs.get('ur')
         elif "ux" in cs and "uy" in cs: # 
-            ux = cs.get('ux')
-            uy = cs.get('uy')
-            node.set_displacements(ux=ux, uy=uy)
             #~ print("Fixed")
-            self.U[node.label]["uy"] = uy
+            node.ux = cs.get('ux')
+            node.uy = cs.get('uy')
         elif "uy" in cs:
-            uy = cs.get('uy')
-            node.set_displacements(uy=uy)
             #~ print("Simple support")
-            self.U[node.label]["uy"] = uy
+            node.uy = cs.get('uy')
         
-    def solve(self):
-        # Solve LS
-        self.VU = [node[key] for node in self.U.values() for key in ("uy","ur")]
-        self.VF = [node[key] for node in self.F.values() for key in ("fy","m")]
-        knw = [pos for pos,value in enumerate(self.VU) if not value is np.nan]
-        unknw = [pos for pos,value in enumerate(self.VU) if value is np.nan]
-        self.K2S = np.delete(np.delete(self.KG,knw,0),knw,1)
-        self.F2S = np.delete(self.VF,knw,0)
-        
-        # For displacements
-        self.solved_u = la.solve(self.K2S,self.F2S)
-        for k,ic in enumerate(unknw):
-            nd, var = self.index2key(ic)
-            self.U[nd][var] = self.solved_u[k]
-            
-        # Updating nodes displacements
-        for nd in self.nodes.values():
-            if np.isnan(nd.uy):
-                nd.uy = self.U[nd.label]["uy"]
-            if np.isnan(nd.ur):
-                nd.ur = self.U[nd.label]["ur"]
-                    
-        # For nodal forces/reactions
-        self.NF = self.F.copy()
-        self.VU = [node[key] for node in self.U.values() for key in ("uy","ur")]
-        nf_calc = np.dot(self.KG, self.VU)
-        for k in range(2*self.get_number_of_nodes()):
-            nd, var = self.index2key(k, ("fy","m"))
-            self.NF[nd][var] = nf_calc[k]
-            cnlab = np.floor(k/float(self.dof))
-            if var=="fy": 
-                self.nodes[cnlab].fy = nf_calc[k]
-            elif var=="m": 
-                self.nodes[cnlab].m = nf_calc[k]
-            
     def index2key(self,idx,opts=("uy","ur")):
         node = idx//2
         var = opts[0] if ((-1)**idx)==1 else opts[1]
@@ -690,6 +338,7 @@ class BeamModel(Model):
         ax = fig.add_subplot(111)
         
         for elm in self.get_elements():
+            if isinstance(elm, Superelement): continue
             ni,nj = elm.get_nodes()
             xx = [ni.x, nj.x]
             yy = [ni.y, nj.y]
@@ -760,6 +409,7 @@ class BeamModel(Model):
         xx = []
         yy = []
         for elm in self.get_elements():
+            if isinstance(elm, Superelement): continue
             ni,nj = elm.get_nodes()
             xx.append( ni.x )
             xx.append( nj.x )
@@ -791,29 +441,95 @@ class BeamModel(Model):
         ax.fill_between(X, S, facecolor="#559EE5")
         
     def _get_data_for_moment_diagram(self):
-        cx = 0
-        X, M = [], []
-        for el in self.get_elements():
-            L = el.L
-            X = np.concatenate((X, np.array([cx, cx+L])))
-            mel = el.m.squeeze()
-            mel[0] = - mel[0]
-            M = np.concatenate((M, mel))
-            cx = cx + L
+        X, M = self._get_diagram_data("m")
         return X, M
-        
+
     def _get_data_for_shear_diagram(self):
-        cx = 0
-        X, S = [], []
-        for el in self.get_elements():
-            L = el.L # element length
-            X = np.concatenate((X, np.array([cx, cx+L])))
-            fel = el.fy.squeeze()
-            fel[-1] = - fel[-1]
-            S = np.concatenate((S, fel))
-            cx = cx + L
+        X, S = self._get_diagram_data("v")
         return X, S
-    
+
+    def _get_diagram_data(self,var):
+        """
+        Values of *var* at both ends of each element, with the elements
+        placed one after the other (x from 0 to the total length)
+        """
+        x0, EI, L, U = self._get_beam_arrays()
+        k = np.arange(len(L))
+        cx = np.concatenate(([0], np.cumsum(L)[:-1]))
+        X = np.column_stack((cx, cx+L)).ravel()
+        ends = self._sample_elements(np.repeat(k,2), np.tile([0.0,1.0],len(k)))
+        return X, ends[var]
+
+    def _get_beam_arrays(self):
+        """
+        Start coordinate, EI, length and nodal displacements
+        (uy_i, ur_i, uy_j, ur_j) of the beam elements (superelements
+        excluded)
+        """
+        elements = [elm for elm in self.get_elements() if not isinstance(elm, Superelement)]
+        EC = np.array([[nd.label for nd in elm.get_nodes()] for elm in elements], dtype=int).reshape(-1,2)
+        X = self.get_coordinates()
+        EI = np.array([elm.E*elm.I for elm in elements], dtype=float)
+        rows = self._get_element_rows()
+        L = self.get_element_geometry()["L"][[rows[elm.label] for elm in elements]]
+        uy, ur = Model.get_nsol(self,"uy"), Model.get_nsol(self,"ur")
+        U = np.column_stack((uy[EC[:,0]], ur[EC[:,0]], uy[EC[:,1]], ur[EC[:,1]]))
+        return X[EC[:,0],0], EI, L, U
+
+    def _sample_elements(self,k,xi):
+        """
+        Evaluate the Hermite interpolation of elements *k* at the local
+        coordinates *xi* (0 at the first node, 1 at the second one)
+        """
+        x0, EI, L, U = self._get_beam_arrays()
+        L, EI, (v1, t1, v2, t2) = L[k], EI[k], U[k].T
+        x = xi*L
+        uy = (1 - 3*xi**2 + 2*xi**3)*v1 + L*(xi - 2*xi**2 + xi**3)*t1 \
+             + (3*xi**2 - 2*xi**3)*v2 + L*(xi**3 - xi**2)*t2
+        ur = (6*xi**2 - 6*xi)/L*v1 + (1 - 4*xi + 3*xi**2)*t1 \
+             + (6*xi - 6*xi**2)/L*v2 + (3*xi**2 - 2*xi)*t2
+        m = EI*((12*x - 6*L)*v1 + (6*x - 4*L)*L*t1 + (6*L - 12*x)*v2 + (6*x - 2*L)*L*t2)/L**3
+        v = EI*(12*v1 + 6*L*t1 - 12*v2 + 6*L*t2)/L**3
+        return {"uy":uy, "ur":ur, "m":m, "v":v}
+
+    def sample(self,x):
+        """
+        Evaluate the solution at arbitrary stations along the beam.
+
+        The cubic (Hermite) shape functions of the element that
+        contains each station give the deflection and the slope,
+        bending moment and shear force are EI*v'' and EI*v'''.
+        All the stations are evaluated at once.
+
+        *x* : array_like
+            x-coordinates of the stations (elements are assumed to lie
+            on the x-axis, from their first to their second node)
+
+        Returns a dict of arrays: "uy" (deflection), "ur" (slope),
+        "m" (bending moment) and "v" (shear force), NaN for stations
+        outside the beam. Signs follow :meth:`plot_moment_diagram`
+        and :meth:`plot_shear_diagram`.
+
+        Example ::
+
+            x = np.linspace(0, 10, 200)
+            res = m.sample(x)
+            plt.plot(x, res["m"])
+        """
+        x = np.atleast_1d(np.asarray(x, dtype=float))
+        x0, EI, L, U = self._get_beam_arrays()
+        order = np.argsort(x0)
+        pos = np.clip(np.searchsorted(x0[order], x, side="right") - 1, 0, len(order)-1)
+        k = order[pos]
+        xi = (x - x0[k])/L[k]
+        inside = (xi >= -1e-12) & (xi <= 1 + 1e-12)
+        values = self._sample_elements(k[inside], np.clip(xi[inside],0,1))
+        results = {}
+        for var,val in values.items():
+            results[var] = np.full(len(x), np.nan)
+            results[var][inside] = val
+        return results
+
     def show(self):
         import matplotlib.pyplot as plt
         plt.show()
@@ -826,76 +542,21 @@ class LinearTriangleModel(Model):
     """
     Model for finite element analysis
     """
-    def __init__(self,name="LT Model 01"):
+    sparse_matrix = True # KG as a CSR matrix
+
+    def __init__(self,name="LT Model 01",n_workers=1,chunksize=50000):
         Model.__init__(self,name=name,mtype="triangle")
-        self.F = {} # Forces
-        self.U = {} # Displacements
         self.dof = 2 # 2 DOF for triangle element (per node)
-        self.IS_KG_BUILDED = False
+        self.dof_names = ("ux","uy")
+        self.force_names = ("fx","fy")
+        self.n_workers = n_workers # Threads used by the assembly kernel
+        self.chunksize = chunksize # Elements per kernel chunk
+        self._nodal_fields = ("ux","uy","usum","fx","fy",
+                              "sx","sy","sxy","seqv","ex","ey","exy")
+        self._element_fields = ("sx","sy","sxy","seqv","ex","ey","exy")
         
-    def build_global_matrix(self):
-        """
-        Build global matrix -> KG
-        """
-        msz = (self.dof)*self.get_number_of_nodes()
-        self.KG = np.zeros((msz,msz))
-        for element in self.elements.values():
-            ku = element.get_element_stiffness()
-            n1,n2,n3 = element.get_nodes()
-            i, j, m = n1.label, n2.label, n3.label
-            self.KG[2*i,2*i] += ku[0,0]
-            self.KG[2*i,2*i+1] += ku[0,1]
-            self.KG[2*i,2*j] += ku[0,2]
-            self.KG[2*i,2*j+1] += ku[0,3]
-            self.KG[2*i,2*m] += ku[0,4]
-            self.KG[2*i,2*m+1] += ku[0,5]
-            self.KG[2*i+1,2*i] += ku[1,0]
-            self.KG[2*i+1,2*i+1] += ku[1,1]
-            self.KG[2*i+1,2*j] += ku[1,2]
-            self.KG[2*i+1,2*j+1] += ku[1,3]
-            self.KG[2*i+1,2*m] += ku[1,4]
-            self.KG[2*i+1,2*m+1] += ku[1,5]
-            self.KG[2*j,2*i] += ku[2,0]
-            self.KG[2*j,2*i+1] += ku[2,1]
-            self.KG[2*j,2*j] += ku[2,2]
-            self.KG[2*j,2*j+1] += ku[2,3]
-            self.KG[2*j,2*m] += ku[2,4]
-            self.KG[2*j,2*m+1] += ku[2,5]
-            self.KG[2*j+1,2*i] += ku[3,0]
-            self.KG[2*j+1,2*i+1] += ku[3,1]
-            self.KG[2*j+1,2*j] += ku[3,2]
-            self.KG[2*j+1,2*j+1] += ku[3,3]
-            self.KG[2*j+1,2*m] += ku[3,4]
-            self.KG[2*j+1,2*m+1] += ku[3,5]
-            self.KG[2*m,2*i] += ku[4,0]
-            self.KG[2*m,2*i+1] += ku[4,1]
-            self.KG[2*m,2*j] += ku[4,2]
-            self.KG[2*m,2*j+1] += ku[4,3]
-            self.KG[2*m,2*m] += ku[4,4]
-            self.KG[2*m,2*m+1] += ku[4,5]
-            self.KG[2*m+1,2*i] += ku[5,0]
-            self.KG[2*m+1,2*i+1] += ku[5,1]
-            self.KG[2*m+1,2*j] += ku[5,2]
-            self.KG[2*m+1,2*j+1] += ku[5,3]
-            self.KG[2*m+1,2*m] += ku[5,4]
-            self.KG[2*m+1,2*m+1] += ku[5,5]
-            
-        self.build_forces_vector()
-        self.build_displacements_vector()
-        self.IS_KG_BUILDED = True
-    
-    def build_forces_vector(self):
-        for node in self.nodes.values():
-            self.F[node.label] = {"fx":0.0, "fy":0.0} # (fy, m)
-            
-    def build_displacements_vector(self):
-        for node in self.nodes.values():
-            self.U[node.label] = {"ux":np.nan, "uy":np.nan} # (uy, r)
-    
     def add_force(self,node,force):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
-        self.F[node.label]["fx"] = force[0]
-        self.F[node.label]["fy"] = force[1]
+        self._check_dof_map()
         node.fx = force[0]
         node.fy = force[1]
         
@@ -903,64 +564,30 @@ class LinearTriangleModel(Model):
         pass
         
     def add_constraint(self,node,**constraint):
-        if not(self.IS_KG_BUILDED): self.build_global_matrix()
+        self._check_dof_map()
         cs = constraint
         if "ux" in cs and "uy" in cs: # 
-            ux = cs.get('ux')
-            uy = cs.get('uy')
-            node.set_displacements(ux=ux, uy=uy)
-            self.U[node.label]["ux"] = ux
-            self.U[node.label]["uy"] = uy
+            node.ux = cs.get('ux')
+            node.uy = cs.get('uy')
         elif "uy" in cs:
-            uy = cs.get('uy')
-            node.set_displacements(uy=uy)
-            self.U[node.label]["uy"] = uy
+            node.uy = cs.get('uy')
         
     def _check_nodes(self):
-        for node in self.get_nodes():
-            if node._elements == []: self.add_constraint(node, ux=0, uy=0)
-        
-    def solve(self):
-        self._check_nodes()
-        # Solve LS
-        self.VU = [node[key] for node in self.U.values() for key in ("ux","uy")]
-        self.VF = [node[key] for node in self.F.values() for key in ("fx","fy")]
-        knw = [pos for pos,value in enumerate(self.VU) if not value is np.nan]
-        unknw = [pos for pos,value in enumerate(self.VU) if value is np.nan]
-        self.K2S = np.delete(np.delete(self.KG,knw,0),knw,1)
-        self.F2S = np.delete(self.VF,knw,0)
+        # Nodes without elements are fixed
+        EC = self.get_connectivity()
+        orphans = np.bincount(EC.ravel(), minlength=self.get_number_of_nodes()) == 0
+        if orphans.any(): self.add_constraints(orphans, ux=0, uy=0)
         
-        # For displacements
+    def _factorize(self,K):
+        """
+        Sparse LU factorization of the reduced matrix (see
+        :meth:`Model._factorize`), least squares if it is singular.
+        """
         try:
-            self.solved_u = la.solve(self.K2S,self.F2S)
-        except:
-            print("Solved using LSTSQ")
-            self.solved_u = la.lstsq(self.K2S, self.F2S)[0]
-            
-        for k,ic in enumerate(unknw):
-            nd, var = self.index2key(ic)
-            self.U[nd][var] = self.solved_u[k]
-            
-        # Updating nodes displacements
-        for nd in self.nodes.values():
-            if np.isnan(nd.ux):
-                nd.ux = self.U[nd.label]["ux"]
-            if np.isnan(nd.uy):
-                nd.uy = self.U[nd.label]["uy"]
-                    
-        # For nodal forces/reactions
-        self.NF = self.F.copy()
-        self.VU = [node[key] for node in self.U.values() for key in ("ux","uy")]
-        nf_calc = np.dot(self.KG, self.VU)
-        for k in range(2*self.get_number_of_nodes()):
-            nd, var = self.index2key(k, ("fx","fy"))
-            self.NF[nd][var] = nf_calc[k]
-            cnlab = np.floor(k/float(self.dof))
-            if var=="fx": 
-                self.nodes[cnlab].fx = nf_calc[k]
-            elif var=="fy": 
-                self.nodes[cnlab].fy = nf_calc[k]
-                
+            return Model._factorize(self,K)
+        except np.linalg.LinAlgError: # Singular matrix
+            return (lambda b: spla.lsqr(K,b)[0]), "scipy.sparse.linalg.lsqr"
+
     def index2key(self,idx,opts=("ux","uy")):
         """
         Index to key, where key can be ux or uy
@@ -969,6 +596,97 @@ class LinearTriangleModel(Model):
         var = opts[0] if ((-1)**idx)==1 else opts[1]
         return node,var
 
+    def get_nsol(self,var):
+        """
+        Nodal results as arrays (see :meth:`get_results`)
+        """
+        return self.get_results((var,),"nodes")[var]
+
+    def get_esol(self,var):
+        """
+        Element results as arrays (see :meth:`get_results`)
+        """
+        return self.get_results((var,),"elements")[var]
+
+    def get_results(self,fields,location="nodes"):
+        """
+        Compute several results in a single vectorized pass.
+
+        Element strains and stresses are computed once for all the
+        elements and, for *location* = "nodes", averaged at the nodes
+        (same as :attr:`~nusa.core.Node.sx` and friends).
+
+        *fields* : sequence of str
+            "ux", "uy", "usum", "fx", "fy" (nodes only) and
+            "sx", "sy", "sxy", "seqv", "ex", "ey", "exy"
+            ("sxx", "syy", "exx", "eyy" are also accepted).
+        *location* : str
+            "nodes" or "elements"
+        """
+        if location not in ("nodes","elements"):
+            raise ValueError("location must be 'nodes' or 'elements'")
+        keys = [SOLUTION_ALIASES.get(var,var) for var in fields]
+        results = {}
+        if location == "nodes":
+            for var,key in zip(fields,keys):
+                if key in ("ux","uy","fx","fy","x","y"):
+                    results[var] = Model.get_nsol(self,key)
+                elif key == "usum":
+                    results[var] = np.hypot(Model.get_nsol(self,"ux"), Model.get_nsol(self,"uy"))
+        fields = [var for var in fields if var not in results]
+        if not fields:
+            return results
+        strains = self._get_element_strains()
+        stresses = self._get_element_stresses(strains)
+        if location == "nodes":
+            with self.profile.phase("nodal_averaging"):
+                strains = self._nodal_average(strains)
+                stresses = self._nodal_average(stresses)
+        sx, sy, sxy = stresses.T
+        values = {"sx":sx, "sy":sy, "sxy":sxy,
+                  "seqv":np.sqrt(sx**2 - sx*sy + sy**2 + 3*sxy**2),
+                  "ex":strains[:,0], "ey":strains[:,1], "exy":strains[:,2]}
+        for var in fields:
+            key = SOLUTION_ALIASES.get(var,var)
+            if key not in values:
+                raise ValueError("Unknown result: {0}".format(var))
+            results[var] = values[key]
+        return results
+
+    def _get_element_strains(self):
+        """
+        Strains {ex, ey, exy} = [B]{u} of all elements, shape (ne, 3)
+        """
+        EC = self.get_connectivity()
+        U = np.column_stack((Model.get_nsol(self,"ux"), Model.get_nsol(self,"uy")))
+        B = self.get_element_geometry()["B"]
+        return np.einsum("kij,kj->ki", B, U[EC].reshape(len(EC),6))
+
+    def _get_element_stresses(self,strains):
+        """
+        Stresses {sx, sy, sxy} = [D]{e} (plane stress), shape (ne, 3)
+        """
+        E = self._get_element_property("E")
+        nu = self._get_element_property("nu")
+        ex, ey, exy = strains.T
+        c = E/(1-nu**2)
+        return np.column_stack((c*(ex + nu*ey), c*(nu*ex + ey), c*(1-nu)/2*exy))
+
+    def _nodal_average(self,values):
+        """
+        Average element values (ne, k) at the nodes -> (n, k)
+        """
+        EC = self.get_connectivity()
+        n = self.get_number_of_nodes()
+        nen = EC.shape[1]
+        sums = np.zeros((n,values.shape[1]))
+        np.add.at(sums, EC.ravel(), np.repeat(values,nen,axis=0))
+        counts = np.bincount(EC.ravel(), minlength=n)
+        avg = np.zeros_like(sums)
+        has_elements = counts > 0
+        avg[has_elements] = sums[has_elements]/counts[has_elements,None]
+        return avg
+
     def plot_model(self):
         """
         Plot the mesh model, including bcs
@@ -1033,51 +751,101 @@ class LinearTriangleModel(Model):
         return np.mean([kfx,kfy])
         
     def _get_tri(self):
+        """
+        Triangulation of the model (cached until nodes are added or moved)
+        """
         import matplotlib.tri as tri
-        
-        _x,_y = [],[]
-        # ~ df = 1
-        for n in self.get_nodes():
-            _x.append(n.x)
-            # ~ _x.append(n.x + n.ux*df)
-            _y.append(n.y)
-            # ~ _y.append(n.y + n.uy*df)
-            
-        tg = []
-        for e in self.get_elements():
-            ni,nj,nm = e.get_nodes()
-            tg.append([ni.label, nj.label, nm.label])
-            
-        tr = tri.Triangulation(_x,_y, triangles=tg)
-        return tr
+        if "triangulation" not in self._geometry:
+            X = self.get_coordinates()
+            self._geometry["triangulation"] = tri.Triangulation(X[:,0], X[:,1], triangles=self.get_connectivity())
+        return self._geometry["triangulation"]
 
+    def _get_trifinder(self):
+        """
+        Point location structure of the triangulation (cached)
+        """
+        import matplotlib.tri as tri
+        if "trifinder" not in self._geometry:
+            self._geometry["trifinder"] = tri.TrapezoidMapTriFinder(self._get_tri())
+        return self._geometry["trifinder"]
+
+    def probe(self,points,field):
+        """
+        Evaluate nodal results at arbitrary points.
+
+        The element containing each point is found with a (cached)
+        :class:`matplotlib.tri.TrapezoidMapTriFinder`, and the nodal
+        values are interpolated with the linear shape functions of
+        that element. All points are processed at once.
+
+        *points* : array_like
+            (npoints, 2) coordinates
+        *field* : str or sequence of str
+            Nodal results (see :meth:`get_results`), or "u" for
+            (ux, uy), "s" for (sx, sy, sxy) and "e" for (ex, ey, exy).
+
+        Returns an (npoints, ncomponents) array, NaN for the points
+        outside the mesh.
+        """
+        groups = {"u":("ux","uy"), "s":("sx","sy","sxy"), "e":("ex","ey","exy")}
+        if isinstance(field,str):
+            field = groups.get(field,(field,))
+        fields = [var for f in field for var in groups.get(f,(f,))]
+        P = np.atleast_2d(np.asarray(points,dtype=float))
+        X = self.get_coordinates()
+        EC = self.get_connectivity()
+        elm = self._get_trifinder()(P[:,0], P[:,1])
+        inside = elm >= 0
+        nodes = EC[elm[inside]] # (nin, 3)
+        x, y = X[nodes,0], X[nodes,1]
+        px, py = P[inside,0], P[inside,1]
+        d = (y[:,1]-y[:,2])*(x[:,0]-x[:,2]) + (x[:,2]-x[:,1])*(y[:,0]-y[:,2])
+        L = np.empty((len(nodes),3)) # Shape functions (area coordinates)
+        L[:,0] = ((y[:,1]-y[:,2])*(px-x[:,2]) + (x[:,2]-x[:,1])*(py-y[:,2]))/d
+        L[:,1] = ((y[:,2]-y[:,0])*(px-x[:,2]) + (x[:,0]-x[:,2])*(py-y[:,2]))/d
+        L[:,2] = 1 - L[:,0] - L[:,1]
+        results = self.get_results(fields,"nodes")
+        values = np.full((len(P),len(fields)), np.nan)
+        for k,var in enumerate(fields):
+            values[inside,k] = (L*results[var][nodes]).sum(axis=1)
+        return values
+
+    def sample_path(self,polyline,n,field):
+        """
+        Evaluate results along a path (see :meth:`probe`).
+
+        *polyline* : array_like
+            (k, 2) vertices of the path
+        *n* : int
+            Number of points, equally spaced along the path
+        *field* : str or sequence of str
+            Results to evaluate (see :meth:`probe`)
+
+        Returns the distance of each point along the path, shape (n,),
+        and the values, shape (n, ncomponents).
+
+        Example ::
+
+            s, sx = m.sample_path([(0.5,0.65),(0.5,1.0)], 100, "sx")
+        """
+        V = np.asarray(polyline, dtype=float)
+        seglen = np.hypot(*np.diff(V, axis=0).T)
+        cum = np.concatenate(([0], np.cumsum(seglen)))
+        dist = np.linspace(0, cum[-1], n)
+        P = np.column_stack((np.interp(dist, cum, V[:,0]), np.interp(dist, cum, V[:,1])))
+        return dist, self.probe(P, field)
 
     def plot_nsol(self,var="ux"):
         import matplotlib.pyplot as plt
-        import numpy as np
         
         fig = plt.figure()
         ax = fig.add_subplot(111)
         
-        solutions = {
-             "ux": (n.ux for n in self.get_nodes()),
-             "uy": (n.uy for n in self.get_nodes()),
-             "usum": (np.sqrt(n.ux**2 + n.uy**2) for n in self.get_nodes()),
-             "sxx": (n.sx for n in self.get_nodes()),
-             "syy": (n.sy for n in self.get_nodes()),
-             "sxy": (n.sxy for n in self.get_nodes()),
-             "seqv": (n.seqv for n in self.get_nodes()),
-             "exx": (n.ex for n in self.get_nodes()),
-             "eyy": (n.ey for n in self.get_nodes()),
-             "exy": (n.exy for n in self.get_nodes())
-             }
-        
         tr = self._get_tri()
         try:
-            fsol = list(solutions.get(var))
+            fsol = self.get_nsol(var)
         except:
             return None
-        if isinstance(fsol,list): fsol = np.array(fsol)
         tp = ax.tricontourf(tr, fsol, cmap="jet")
         fig.colorbar(tp)
         x0,x1,y0,y1 = self.rect_region()
@@ -1090,7 +858,6 @@ class LinearTriangleModel(Model):
 
     def plot_esol(self,var="ux"):
         import matplotlib.pyplot as plt
-        import numpy as np
         from matplotlib.patches import Polygon
         from matplotlib.collections import PatchCollection
         
@@ -1108,15 +875,7 @@ class LinearTriangleModel(Model):
             patches.append(polygon)
             
         pc = PatchCollection(patches, cmap="jet", alpha=1)
-        solutions = {
-             "sxx": (e.sx for e in self.get_elements()),
-             "syy": (e.sy for e in self.get_elements()),
-             "sxy": (e.sxy for e in self.get_elements()),
-             "exx": (e.ex for e in self.get_elements()),
-             "eyy": (e.ey for e in self.get_elements()),
-             "exy": (e.exy for e in self.get_elements())
-             }
-        fsol = np.array(list(solutions.get(var.lower())))
+        fsol = self.get_esol(var.lower())
         pc.set_array(fsol)
         ax.add_collection(pc)
         fig.colorbar(pc)
@@ -0,0 +1,134 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Out-of-core assembly of the global matrix.
+
+Element matrices are computed in chunks and written as sorted COO
+runs (key = row*n + col, value) to :class:`numpy.memmap` scratch
+files. The runs are then merged by blocks of rows (external sort and
+merge) into a CSR matrix stored on disk, which is opened again through
+memory maps. The DOFs and matrices of each chunk are computed from the
+coordinates, connectivity and properties of the model, so besides the
+model itself (its nodes and elements) the resident memory is *memory*
+plus O(ne) for those arrays and O(n) for the row pointer of the matrix.
+
+Models use it with ``out_of_core`` (see :meth:`~nusa.core.Model.solve`)::
+
+    m = LinearTriangleModel()
+    ...
+    m.out_of_core = "/scratch/model"
+    m.memory_limit = 512*2**20
+    m.solve()
+"""
+import os
+import numpy as np
+import scipy.sparse as sparse
+
+
+def assemble_out_of_core(dofs,kernel,ne,n,directory,memory=256*2**20):
+    """
+    Assemble a global matrix to a CSR matrix on disk.
+
+    *dofs* : callable
+        ``dofs(chunk)`` returns the (m, k) global DOFs of the elements
+        in the slice *chunk*
+    *kernel* : callable
+        ``kernel(chunk)`` returns their (m, k, k) element matrices
+    *ne* : int
+        Number of elements
+    *n* : int
+        Number of global DOFs
+    *directory* : str
+        Directory for the scratch runs and the CSR files
+    *memory* : int
+        Approximate memory budget (bytes) of the chunks and merge blocks
+
+    Returns the memory-mapped CSR matrix (see :func:`load_csr`).
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+    k = dofs(slice(0,1)).shape[1] if ne else 1
+    chunksize = max(1, memory//(k*k*64)) # keys, values and sort buffers
+    runs = []
+    for start in range(0, ne, chunksize):
+        chunk = slice(start, start+chunksize)
+        d = dofs(chunk).astype(np.int64)
+        keys = (np.repeat(d, k, axis=1)*n + np.tile(d, (1,k))).ravel()
+        keys, inv = np.unique(keys, return_inverse=True)
+        vals = np.bincount(inv.ravel(), weights=kernel(chunk).ravel(), minlength=len(keys))
+        run = os.path.join(directory, "run{0}".format(len(runs)))
+        runs.append((_write(run+".keys", keys), _write(run+".vals", vals)))
+
+    total = sum(len(keys) for keys,vals in runs)
+    nblocks = max(1, int(np.ceil(total*48.0/memory)))
+    bounds = np.linspace(0, n, nblocks+1).astype(np.int64)
+    index_dtype = np.int32 if max(n, total) < np.iinfo(np.int32).max else np.int64
+    indptr = np.zeros(n+1, dtype=index_dtype)
+    nnz = 0
+    with open(_path(directory,"indices"),"wb") as findices, open(_path(directory,"data"),"wb") as fdata:
+        for r0,r1 in zip(bounds[:-1], bounds[1:]):
+            keys, vals = [], []
+            for rkeys,rvals in runs:
+                i0, i1 = np.searchsorted(rkeys, (r0*n, r1*n))
+                keys.append(np.asarray(rkeys[i0:i1]))
+                vals.append(np.asarray(rvals[i0:i1]))
+            keys, inv = np.unique(np.concatenate(keys), return_inverse=True)
+            vals = np.bincount(inv.ravel(), weights=np.concatenate(vals), minlength=len(keys))
+            rows = keys//n
+            indptr[r0+1:r1+1] = nnz + np.cumsum(np.bincount(rows-r0, minlength=r1-r0))
+            findices.write((keys - rows*n).astype(index_dtype).tobytes())
+            fdata.write(vals.tobytes())
+            nnz += len(keys)
+    _write(_path(directory,"indptr"), indptr)
+    scratch = [mm.filename for run in runs for mm in run]
+    del runs
+    for fname in scratch:
+        os.remove(fname)
+    with open(os.path.join(directory,"shape.txt"),"w") as fobj:
+        fobj.write("{0} {1} {2}".format(n, nnz, np.dtype(index_dtype).name))
+    return load_csr(directory)
+
+
+def load_csr(directory):
+    """
+    Open a CSR matrix written by :func:`assemble_out_of_core`, its
+    arrays are read-only memory maps.
+    """
+    with open(os.path.join(directory,"shape.txt")) as fobj:
+        n, nnz, index_dtype = fobj.read().split()
+    n, nnz = int(n), int(nnz)
+    indptr = _open(_path(directory,"indptr"), index_dtype, n+1)
+    indices = _open(_path(directory,"indices"), index_dtype, nnz)
+    data = _open(_path(directory,"data"), np.float64, nnz)
+    return sparse.csr_matrix((data, indices, indptr), shape=(n,n))
+
+
+def _path(directory,name):
+    return os.path.join(directory, "K.{0}.bin".format(name))
+
+def _open(fname,dtype,size):
+    """
+    Read-only memmap of a 1-D array (files of empty arrays can't be
+    mapped)
+    """
+    if size == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(fname, dtype=dtype, mode="r", shape=(size,))
+
+def _write(fname,values):
+    """
+    Write *values* to a memmap file and return the memmap (read-only)
+    """
+    mm = np.memmap(fname, dtype=values.dtype, mode="w+", shape=values.shape)
+    mm[:] = values
+    mm.flush()
+    del mm
+    return _open(fname, values.dtype, len(values))
+
+
+if __name__=='__main__':
+    pass
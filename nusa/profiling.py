@@ -0,0 +1,232 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Instrumentation tools for models.
+
+Every model owns a :class:`ModelProfile` (``model.profile``) that
+records the wall time of each solution phase (assembly, reduction,
+solver, update...) of the last solution plus some information about
+the system of equations. Heavier instrumentation (cProfile, tracemalloc, condition
+number) is only enabled inside the :meth:`ModelProfile.capture`
+context manager.
+
+Example ::
+
+    m.solve()
+    print(m.profile.to_json())
+
+    with m.profile.capture(cprofile=True):
+        m.solve()
+    m.profile.print_stats()
+"""
+import json
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class ModelProfile(object):
+    """
+    Per-phase timing and memory records of a model.
+
+    *enabled* : bool
+        If False, phases are not timed and nothing is recorded.
+    """
+    def __init__(self,enabled=True):
+        self.enabled = enabled
+        self.detailed = False # cond. number & peak memory (see capture)
+        self.phases = {} # {name: {"time":..., "calls":..., "parent":...}}
+        self.info = {} # matrix size, nnz, solver, iterations...
+        self.solves = 0 # number of solve() calls
+        self.cprofile_stats = None
+        self._tracemalloc = False
+        self._stack = [] # Names of the running phases (nesting)
+        self._peaks = [] # Peak memory of the running phases so far
+
+    def reset(self):
+        """
+        Clear all records
+        """
+        self.phases = {}
+        self.info = {}
+        self.solves = 0
+        self.cprofile_stats = None
+
+    def start_solve(self):
+        """
+        Count a new solution and discard the phases of the previous one
+        """
+        self.solves += 1
+        if self.enabled:
+            self.phases = {}
+
+    def _push_peak(self):
+        """
+        Start measuring a peak memory, the peak of the enclosing
+        measurement so far is saved (tracemalloc has a single peak)
+        """
+        import tracemalloc
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self._peaks.append(0)
+
+    def _pop_peak(self):
+        """
+        Peak memory since the matching :meth:`_push_peak`
+        """
+        import tracemalloc
+        peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        return peak
+
+    @contextmanager
+    def phase(self,name):
+        """
+        Context manager that records the wall time (and the peak
+        memory when tracemalloc capture is active) of a phase. Times of
+        repeated calls are added up; phases can be nested (e.g.
+        "symbolic" within "assembly"), see :attr:`total_time`.
+        """
+        if not self.enabled:
+            yield
+            return
+        tracing = self._tracemalloc
+        if tracing:
+            self._push_peak()
+        parent = self._stack[-1] if self._stack else None
+        self._stack.append(name)
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t0
+            self._stack.pop()
+            rec = self.phases.setdefault(name, {"time":0.0, "calls":0, "parent":parent})
+            rec["time"] += dt
+            rec["calls"] += 1
+            if tracing:
+                rec["peak_memory"] = max(rec.get("peak_memory", 0), self._pop_peak())
+
+    def record(self,**info):
+        """
+        Store extra information (matrix size, nnz, solver iterations...)
+        """
+        if self.enabled:
+            self.info.update(info)
+
+    def record_system(self,K,solver=None,iterations=None):
+        """
+        Store size, number of non-zeros and (in detailed mode) the
+        condition estimate of the reduced system matrix *K* (only the
+        size for matrix-free operators).
+        """
+        if not self.enabled:
+            return
+        if hasattr(K,"nnz"): # scipy sparse
+            nnz = int(K.nnz)
+        elif isinstance(K,np.ndarray):
+            nnz = int(np.count_nonzero(K))
+        else: # matrix-free operator
+            nnz = None
+        self.info.update(matrix_size=int(K.shape[0]), nnz=nnz,
+                         solver=solver, iterations=iterations)
+        if self.detailed and K.shape[0] > 0 and nnz is not None:
+            if hasattr(K,"toarray"): K = K.toarray()
+            self.info["condition"] = float(np.linalg.cond(K,1))
+
+    @contextmanager
+    def capture(self,cprofile=False,memory=True,condition=True):
+        """
+        Context manager for a detailed profile of the enclosed calls.
+
+        *cprofile* : bool
+            Run the enclosed code under :mod:`cProfile`; stats are
+            stored in ``cprofile_stats``.
+        *memory* : bool
+            Trace allocations with :mod:`tracemalloc` and record the
+            peak memory of each phase.
+        *condition* : bool
+            Record the condition number (1-norm) of the reduced matrix.
+        """
+        enabled, detailed = self.enabled, self.detailed
+        self.enabled, self.detailed = True, condition
+        started = False
+        if memory:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started = True
+            self._tracemalloc = True
+            self._push_peak()
+        profiler = None
+        if cprofile:
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler is not None:
+                import pstats
+                profiler.disable()
+                self.cprofile_stats = pstats.Stats(profiler)
+            if memory:
+                import tracemalloc
+                self.info["peak_memory"] = self._pop_peak()
+                if started: tracemalloc.stop()
+                self._tracemalloc = False
+            self.enabled, self.detailed = enabled, detailed
+
+    def print_stats(self,sort="cumulative",limit=20):
+        """
+        Print the cProfile stats of the last capture
+        """
+        if self.cprofile_stats is not None:
+            self.cprofile_stats.sort_stats(sort).print_stats(limit)
+
+    @property
+    def total_time(self):
+        """
+        Wall time of the last solution (top-level phases only, nested
+        ones are part of their parent)
+        """
+        return sum(rec["time"] for rec in self.phases.values() if rec.get("parent") is None)
+
+    def to_dict(self):
+        """
+        Return the records as a (JSON-serializable) dictionary
+        """
+        return {"solves": self.solves,
+                "total_time": self.total_time,
+                "phases": {name:dict(rec) for name,rec in self.phases.items()},
+                "info": dict(self.info)}
+
+    def to_json(self,fname=None,**kwargs):
+        """
+        Return the records as a JSON string, or write them to *fname*
+        """
+        kwargs.setdefault("indent",2)
+        _str = json.dumps(self.to_dict(), **kwargs)
+        if fname is None:
+            return _str
+        with open(fname,"w") as fobj:
+            fobj.write(_str)
+
+    def __str__(self):
+        lines = ["{0:<16}{1:>12}".format("Phase","Time [s]")]
+        for name,rec in self.phases.items():
+            if rec.get("parent") is not None:
+                name = "  " + name
+            lines.append("{0:<16}{1:>12.6f}".format(name,rec["time"]))
+        return "\n".join(lines)
+
+
+if __name__=='__main__':
+    pass
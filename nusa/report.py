@@ -0,0 +1,120 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Streaming report engine.
+
+Tables are written in chunks of rows directly to a file object, so
+the report of a large model never lives in memory as a single string.
+Supported formats: reStructuredText simple tables ("rst"),
+CSV ("csv") and Markdown ("md").
+"""
+import numpy as np
+
+REPORT_FORMATS = ("rst","csv","md")
+
+FLOAT_WIDTH = 13 # widest "%.6g" representation (e.g. -1.23457e-100)
+
+
+class ReportWriter(object):
+    """
+    Write titles and tables to a file object.
+
+    *fobj* : file-like
+        Any object with a ``write`` method (opened file, sys.stdout,
+        io.StringIO...)
+    *fmt* : str
+        Output format: "rst", "csv" or "md"
+    *chunksize* : int
+        Number of rows formatted and written per chunk
+
+    Example ::
+
+        with open("report.rst","w") as fobj:
+            rw = ReportWriter(fobj, "rst")
+            rw.write_title("NODAL DISPLACEMENTS")
+            rw.write_table(("Node","UX"), (labels, ux), ("d","g"))
+    """
+    def __init__(self,fobj,fmt="rst",chunksize=10000):
+        if fmt not in REPORT_FORMATS:
+            raise ValueError("fmt must be one of: " + ", ".join(REPORT_FORMATS))
+        self.fobj = fobj
+        self.fmt = fmt
+        self.chunksize = chunksize
+
+    def write(self,txt):
+        """
+        Write plain text (written as comments in CSV reports)
+        """
+        if self.fmt == "csv":
+            txt = "\n".join(("# "+line if line.strip() else line)
+                            for line in txt.split("\n"))
+        self.fobj.write(txt)
+
+    def write_title(self,title):
+        """
+        Write a section title
+        """
+        if self.fmt == "md":
+            self.fobj.write("\n### {0}\n\n".format(title))
+        elif self.fmt == "csv":
+            self.fobj.write("\n# {0}\n".format(title))
+        else:
+            self.fobj.write("\n{0}\n".format(title))
+
+    def write_table(self,headers,columns,types=None):
+        """
+        Write a table whose columns are given as 1-D arrays.
+
+        *headers* : sequence of str
+            Column headers
+        *columns* : sequence of array_like
+            Column values, all with the same length
+        *types* : sequence of str
+            "d" for integer columns, "g" for float columns
+            (default: "g" for all columns)
+        """
+        columns = [np.asarray(col) for col in columns]
+        if types is None:
+            types = ["g"]*len(columns)
+        nrows = len(columns[0]) if columns else 0
+        widths = []
+        for header,col,tp in zip(headers,columns,types):
+            if tp == "d":
+                w = len(str(int(col.max()))) if nrows else 1
+            else:
+                w = FLOAT_WIDTH
+            widths.append(max(w, len(header)) + 2)
+
+        if self.fmt == "csv":
+            rowfmt = ",".join(("%d" if tp=="d" else "%.17g") for tp in types) + "\n"
+            self.fobj.write(",".join(headers) + "\n")
+        elif self.fmt == "md":
+            specs = ["%{0}{1}".format(w, "d" if tp=="d" else ".6g")
+                     for w,tp in zip(widths,types)]
+            rowfmt = "|" + "|".join(" "+sp+" " for sp in specs) + "|\n"
+            self.fobj.write("|" + "|".join(" "+h.rjust(w)+" " for h,w in zip(headers,widths)) + "|\n")
+            self.fobj.write("|" + "|".join(" "+"-"*(w-1)+": " for w in widths) + "|\n")
+        else:
+            specs = ["%{0}{1}".format(w, "d" if tp=="d" else ".6g")
+                     for w,tp in zip(widths,types)]
+            rowfmt = "  ".join(specs) + "\n"
+            rule = "  ".join("="*w for w in widths) + "\n"
+            self.fobj.write(rule)
+            self.fobj.write("  ".join(h.rjust(w) for h,w in zip(headers,widths)) + "\n")
+            self.fobj.write(rule)
+
+        for start in range(0, nrows, self.chunksize):
+            stop = start + self.chunksize
+            chunk = np.column_stack([col[start:stop] for col in columns])
+            self.fobj.write("".join(rowfmt % tuple(row) for row in chunk.tolist()))
+
+        if self.fmt == "rst":
+            self.fobj.write(rule)
+
+
+if __name__=='__main__':
+    pass
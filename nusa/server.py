@@ -0,0 +1,282 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Local solve server (``nusa serve``).
+
+An asyncio HTTP/1.1 server, on localhost or a Unix socket, that solves
+.nusa models (see :func:`~nusa.io.model_from_dict`) sent as JSON::
+
+    POST /solve   {"type": "truss", "nodes": ..., "elements": ...,
+                   "constraints": ..., "forces": ...}
+    GET /health
+
+Models are solved in worker processes that keep them assembled and
+factorized in an LRU cache. The cache key is a hash of the model
+without its "forces", so requests that only change loads are a single
+back-substitution. Each model is routed to the same worker, and
+concurrent requests for the same model are coalesced into one
+multi-RHS solve (:meth:`~nusa.core.Model.solve_loads`).
+
+The response has the displacements and reactions by node
+({"u": [[ux, uy], ...], "reaction": ..., "dof_names": ["ux", "uy"]}).
+"""
+import os
+import json
+import signal
+import asyncio
+import hashlib
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+_MODELS = OrderedDict() # Warm models of a worker process
+_CACHE_SIZE = [32]
+
+
+def _init_worker(cache_size):
+    signal.signal(signal.SIGINT, signal.SIG_IGN) # Ctrl-C stops the server, which stops the workers
+    _CACHE_SIZE[0] = cache_size
+    import nusa.io  # noqa: F401 (import nusa once, at startup)
+
+def _ping():
+    return os.getpid()
+
+def _solve_cases(key,data,cases):
+    """
+    Solve the load cases *cases* (lists of "forces") of a model in a
+    worker process. Returns the results of each case, or the exception
+    raised by its forces (a malformed case fails alone), or None if the
+    model is not cached and *data* is None (the server then sends it
+    again).
+    """
+    from .io import model_from_dict, apply_loads
+    m = _MODELS.get(key)
+    if m is None:
+        if data is None:
+            return None
+        m = model_from_dict(data)
+        m.solve() # assembly and factorization
+        _MODELS[key] = m
+        if len(_MODELS) > _CACHE_SIZE[0]:
+            _MODELS.popitem(last=False)
+    else:
+        _MODELS.move_to_end(key)
+    results, F, valid = [], [], []
+    for k,forces in enumerate(cases):
+        try:
+            apply_loads(m, forces, reset=True)
+        except Exception as e:
+            results.append(e)
+        else:
+            results.append(None)
+            F.append(m.f.copy())
+            valid.append(k)
+    if valid:
+        U, R = m.solve_loads(np.column_stack(F))
+        names = {"dof_names": list(m.dof_names), "force_names": list(m.force_names)}
+        for j,k in enumerate(valid):
+            results[k] = dict(names, u=U[m.dofmap,j].tolist(), reaction=R[m.dofmap,j].tolist())
+    return results
+
+
+class SolveServer(object):
+    """
+    Solve server with warm models and request coalescing.
+
+    *workers* : int
+        Worker processes (default: number of CPUs)
+    *cache_size* : int
+        Models kept assembled and factorized by each worker
+    *window* : float
+        Seconds a batch waits for more requests for the same model
+        before it is solved
+    """
+    def __init__(self,workers=None,cache_size=32,window=0.002):
+        self.workers = workers or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self.window = window
+        self._pools = None
+        self._warm = [OrderedDict() for k in range(self.workers)] # Keys cached by each worker
+        self._pending = {} # key: open batch [(forces, future), ...]
+        self._running = {} # key: last dispatch task
+        self.stats = {"requests": 0, "batches": 0, "builds": 0}
+
+    def start(self):
+        """
+        Start the worker processes (spawned: nusa is imported once per
+        worker, here rather than on the first request)
+        """
+        ctx = multiprocessing.get_context("spawn")
+        self._pools = [ProcessPoolExecutor(1, mp_context=ctx, initializer=_init_worker,
+                                           initargs=(self.cache_size,))
+                       for k in range(self.workers)]
+        for pool in self._pools:
+            pool.submit(_ping).result()
+
+    def close(self):
+        """
+        Stop the worker processes
+        """
+        for pool in self._pools or []:
+            pool.shutdown(cancel_futures=True)
+        self._pools = None
+
+    @staticmethod
+    def model_key(data):
+        """
+        Cache key of a model dict: hash of its canonical JSON without
+        "forces"
+        """
+        text = json.dumps(data, sort_keys=True, separators=(",",":"))
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    async def solve(self,data):
+        """
+        Solve a .nusa model dict, returns the results dict
+        """
+        if not isinstance(data, dict):
+            raise ValueError("The request body must be a JSON object")
+        data = dict(data)
+        forces = data.pop("forces", [])
+        key = self.model_key(data)
+        self.stats["requests"] += 1
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            previous = self._running.get(key)
+            self._running[key] = asyncio.ensure_future(self._dispatch(key, data, batch, previous))
+        batch.append((forces, future))
+        return await future
+
+    async def _dispatch(self,key,data,batch,previous):
+        """
+        Solve a batch after the coalescing window and after the previous
+        batch of the same model (requests keep joining until then)
+        """
+        await asyncio.sleep(self.window)
+        if previous is not None:
+            await asyncio.wait([previous])
+        del self._pending[key]
+        slot = int(key[:8], 16) % self.workers
+        warm = self._warm[slot]
+        cases = [forces for forces,future in batch]
+        loop = asyncio.get_running_loop()
+        self.stats["batches"] += 1
+        try:
+            results = None
+            if key in warm:
+                results = await loop.run_in_executor(self._pools[slot], _solve_cases, key, None, cases)
+            if results is None:
+                self.stats["builds"] += 1
+                results = await loop.run_in_executor(self._pools[slot], _solve_cases, key, data, cases)
+            warm[key] = True
+            warm.move_to_end(key)
+            if len(warm) > self.cache_size:
+                warm.popitem(last=False)
+        except Exception as e:
+            for forces,future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (forces,future),result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            if self._running.get(key) is asyncio.current_task():
+                del self._running[key]
+
+    async def handle(self,reader,writer):
+        """
+        HTTP/1.1 connection handler (persistent connections)
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line.strip():
+                    break
+                method, path = line.decode("latin-1").split()[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, result = await self._route(method, path, body)
+                payload = json.dumps(result).encode()
+                close = headers.get("connection", "").lower() == "close"
+                writer.write(("HTTP/1.1 {0}\r\nContent-Type: application/json\r\n"
+                              "Content-Length: {1}\r\nConnection: {2}\r\n\r\n").format(
+                              status, len(payload), "close" if close else "keep-alive").encode())
+                writer.write(payload)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass # client gone or malformed request line
+        finally:
+            writer.close()
+
+    async def _route(self,method,path,body):
+        if method == "GET" and path == "/health":
+            return "200 OK", dict(self.stats, status="ok", workers=self.workers)
+        if method != "POST" or path != "/solve":
+            return "404 Not Found", {"error": "Unknown endpoint {0} {1}".format(method, path)}
+        try:
+            return "200 OK", await self.solve(json.loads(body))
+        except (ValueError, KeyError, TypeError, IndexError) as e: # bad model or load data
+            return "400 Bad Request", {"error": "{0}: {1}".format(type(e).__name__, e)}
+        except Exception as e:
+            return "500 Internal Server Error", {"error": "{0}: {1}".format(type(e).__name__, e)}
+
+    async def serve_forever(self,host="127.0.0.1",port=8642,unix=None):
+        """
+        Serve on *host*:*port*, or on the Unix socket *unix*
+        """
+        if self._pools is None:
+            self.start()
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        stop = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        except (NotImplementedError, AttributeError): # Windows
+            pass
+        async with server:
+            await stop.wait()
+
+
+def serve(host="127.0.0.1",port=8642,unix=None,workers=None,cache_size=32,window=0.002):
+    """
+    Run a :class:`SolveServer` until interrupted
+    """
+    server = SolveServer(workers, cache_size, window)
+    server.start()
+    print("nusa: serving on {0} ({1} workers)".format(unix or "http://{0}:{1}".format(host, port),
+                                                     server.workers), flush=True)
+    try:
+        asyncio.run(server.serve_forever(host, port, unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if unix and os.path.exists(unix):
+            os.remove(unix)
+
+
+if __name__=='__main__':
+    pass
@@ -0,0 +1,196 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Shared-memory models for multiprocessing workers.
+
+:meth:`~nusa.core.Model.to_shared` copies the arrays of a model
+(coordinates, connectivity, element properties, DOF map, loads,
+constraints and the assembled global matrix) to
+:mod:`multiprocessing.shared_memory` blocks. The returned
+:class:`SharedModel` pickles as a few block names, and workers attach
+to the blocks without copying them::
+
+    def load_case(args):
+        handle, node, force = args
+        f = handle.f.copy()
+        f[handle.dofmap[node,0]] = force
+        u, reaction = handle.solve(f)
+        return u.max()
+
+    with m.to_shared() as handle:
+        with multiprocessing.Pool() as pool:
+            umax = pool.map(load_case, [(handle, k, 1e3) for k in nodes])
+"""
+import numpy as np
+import scipy.linalg as sla
+import scipy.sparse as sparse
+import scipy.sparse.linalg as spla
+from multiprocessing import shared_memory
+
+
+class SharedModel(object):
+    """
+    Handle to the arrays of a model stored in shared memory.
+
+    *arrays* : dict
+        Arrays to share, {name: ndarray}
+    *meta* : dict
+        Small picklable data (model name, type, DOF names...)
+
+    Arrays are read-only attributes of the handle (``handle.coordinates``,
+    ``handle.u``, ``handle.f``, ``handle.dofmap``...) and :meth:`solve`
+    solves load cases with the shared global matrix; the factorization
+    is computed once per process.
+
+    The process that creates the handle owns the blocks and must
+    :meth:`unlink` them (a ``with`` block does it).
+    """
+    def __init__(self,arrays,meta):
+        self.meta = dict(meta)
+        self.blocks = {}
+        self._shm = {}
+        self._arrays = {}
+        self._owner = True
+        self._factor = None
+        for name,values in arrays.items():
+            values = np.ascontiguousarray(values)
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes,1))
+            view = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+            view[...] = values
+            view.flags.writeable = False
+            self.blocks[name] = (shm.name, values.shape, values.dtype.str)
+            self._shm[name] = shm
+            self._arrays[name] = view
+
+    def __getstate__(self):
+        return {"meta": self.meta, "blocks": self.blocks}
+
+    def __setstate__(self,state):
+        self.meta = state["meta"]
+        self.blocks = state["blocks"]
+        self._shm = {}
+        self._arrays = {}
+        self._owner = False
+        self._factor = None
+
+    def _attach(self,name):
+        shmname, shape, dtype = self.blocks[name]
+        try:
+            shm = shared_memory.SharedMemory(name=shmname, track=False)
+        except TypeError: # Python < 3.13: the tracker would unlink it at exit
+            from multiprocessing import resource_tracker
+            shm = shared_memory.SharedMemory(name=shmname)
+            resource_tracker.unregister(shm._name, "shared_memory")
+        view = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        view.flags.writeable = False
+        self._shm[name] = shm
+        self._arrays[name] = view
+        return view
+
+    def get_array(self,name):
+        """
+        Shared array *name* (attached on first access)
+        """
+        if name not in self._arrays:
+            self._attach(name)
+        return self._arrays[name]
+
+    def __getattr__(self,name):
+        if name in self.__dict__.get("blocks", {}):
+            return self.get_array(name)
+        raise AttributeError(name)
+
+    def get_property(self,name):
+        """
+        Element property (E, A, ...) as an array, by element label
+        """
+        return self.get_array("property."+name) if "property."+name in self.blocks else None
+
+    @property
+    def KG(self):
+        """
+        Global matrix (dense or CSR) built on the shared arrays
+        """
+        if "KG" in self.blocks:
+            return self.get_array("KG")
+        if "KG.data" not in self.blocks:
+            raise ValueError("The model was shared without its global matrix")
+        n = len(self.u)
+        return sparse.csr_matrix((self.get_array("KG.data"), self.get_array("KG.indices"),
+                                  self.get_array("KG.indptr")), shape=(n,n))
+
+    def solve(self,f=None,u=None):
+        """
+        Solve a load case with the shared global matrix and constraints.
+
+        *f* : array_like
+            Load vector (default: loads of the model)
+        *u* : array_like
+            Displacements, only the prescribed ones are used (default:
+            prescribed displacements of the model)
+
+        Returns the displacements and the reactions (arrays in equation
+        order, see ``dofmap``).
+        """
+        K = self.KG
+        known = self.known
+        f = self.f if f is None else np.asarray(f, dtype=float)
+        u = np.array(self.u if u is None else u, dtype=float)
+        if self._factor is None:
+            free, prescribed = np.flatnonzero(~known), np.flatnonzero(known)
+            Kf = K[free]
+            K2S = Kf[:,free]
+            if sparse.issparse(K2S):
+                solve = spla.splu(K2S.tocsc()).solve
+            else:
+                lu = sla.lu_factor(K2S, check_finite=False)
+                solve = lambda b: sla.lu_solve(lu, b, check_finite=False)
+            self._factor = (free, prescribed, Kf[:,prescribed], solve)
+        free, prescribed, Kuk, solve = self._factor
+        rhs = f[free] - Kuk.dot(u[prescribed])
+        u[free] = solve(rhs) if len(free) else np.zeros(0)
+        reaction = K.dot(u) - f
+        reaction[free] = 0.0
+        return u, reaction
+
+    def close(self):
+        """
+        Detach from the blocks (arrays of the handle are released)
+        """
+        self._arrays = {}
+        self._factor = None
+        for shm in self._shm.values():
+            shm.close()
+        self._shm = {}
+
+    def unlink(self):
+        """
+        Free the blocks (owner process, after the workers are done)
+        """
+        if self._owner:
+            for shmname,shape,dtype in self.blocks.values():
+                try:
+                    shm = shared_memory.SharedMemory(name=shmname)
+                except FileNotFoundError:
+                    continue
+                shm.close()
+                shm.unlink()
+            self._owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self,*args):
+        self.unlink()
+        self.close()
+
+    def __repr__(self):
+        return "<SharedModel {0!r} ({1} blocks)>".format(self.meta.get("name"), len(self.blocks))
+
+
+if __name__=='__main__':
+    pass
@@ -0,0 +1,166 @@
+# ***********************************
+#  Author: Pedro Jorge De Los Santos
+#  E-mail: delossantosmfq@gmail.com
+#  Blog: numython.github.io
+#  License: MIT License
+# ***********************************
+"""
+Static condensation (Guyan reduction) of sub-models into superelements.
+
+A :class:`Substructure` condenses the interior DOFs of a model and
+caches the boundary stiffness. Any number of :class:`Superelement`
+instances can share the same substructure, e.g. the repeated panels
+of a truss tower::
+
+    panel = TrussModel("Panel")
+    ... # nodes and elements of one panel
+    sub = Substructure(panel, boundary=(p1,p2,p3,p4))
+
+    tower = TrussModel("Tower")
+    ... # tower nodes
+    for k in range(npanels):
+        tower.add_element(Superelement(tower_nodes[k], sub))
+    ...
+    tower.solve()
+    ui = tower.elements[0].get_interior_displacements()
+"""
+import numpy as np
+import numpy.linalg as la
+from .core import Element
+
+# Nodal DOFs (in global matrix order) of each model type
+DOF_NAMES = {"spring":("ux",), "bar":("ux",), "truss":("ux","uy"), "beam":("uy","ur")}
+
+
+class Substructure(object):
+    """
+    Condensed representation of a model.
+
+    *model* : :class:`~nusa.core.Model`
+        Sub-model (TrussModel, BeamModel...) without constraints.
+    *boundary* : sequence of :class:`~nusa.core.Node`
+        Nodes of *model* retained as boundary nodes, the remaining
+        nodes are interior nodes.
+
+    The global stiffness of the sub-model is partitioned into boundary
+    (b) and interior (i) DOFs, and the boundary stiffness is given by
+    the Schur complement:
+
+    .. math::
+
+        [K]_B = [K_{bb}] - [K_{bi}][K_{ii}]^{-1}[K_{ib}]
+
+    Interior loads are not condensed (only stiffness is reduced).
+    """
+    def __init__(self,model,boundary):
+        self.model = model
+        self.mtype = model.mtype
+        self.dof = model.dof
+        self.boundary = tuple(boundary)
+        blabels = set(nd.label for nd in self.boundary)
+        self.interior = tuple(nd for nd in model.get_nodes() if nd.label not in blabels)
+        self._KB = None # Condensed (boundary) stiffness
+        self._T = None # Interior displacements per unit boundary displacement
+
+    def _dofs(self,nodes):
+        dof = self.dof
+        return np.array([dof*nd.label + k for nd in nodes for k in range(dof)], dtype=int)
+
+    def condense(self):
+        """
+        Compute (and cache) the boundary stiffness matrix
+        """
+        model = self.model
+        model.build_global_matrix()
+        KG = model.KG
+        b, i = self._dofs(self.boundary), self._dofs(self.interior)
+        Kbb = KG[np.ix_(b,b)]
+        Kbi = KG[np.ix_(b,i)]
+        Kib = KG[np.ix_(i,b)]
+        Kii = KG[np.ix_(i,i)]
+        if len(i):
+            self._T = -la.solve(Kii, Kib)
+            self._KB = Kbb + np.dot(Kbi, self._T)
+        else:
+            self._T = np.zeros((0,len(b)))
+            self._KB = Kbb
+        return self._KB
+
+    @property
+    def KB(self):
+        """
+        Boundary stiffness matrix (condensed on first access)
+        """
+        if self._KB is None:
+            self.condense()
+        return self._KB
+
+    @property
+    def T(self):
+        """
+        Transformation from boundary to interior displacements
+        """
+        if self._T is None:
+            self.condense()
+        return self._T
+
+    def recover(self,ub):
+        """
+        Interior displacements for the boundary displacements *ub*.
+
+        Returns an array of shape (number of interior nodes, dof).
+        """
+        ui = np.dot(self.T, np.asarray(ub,dtype=float))
+        return ui.reshape(-1, self.dof)
+
+
+class Superelement(Element):
+    """
+    Element whose stiffness is the condensed stiffness of a
+    :class:`Substructure`.
+
+    *nodes* : tuple of :class:`~nusa.core.Node`
+        Nodes of the parent model, one for each boundary node of
+        the substructure (same order).
+    *substructure* : :class:`Substructure`
+        Shared condensed sub-model.
+
+    Instances are translated copies of the substructure: the
+    condensed stiffness is not rotated.
+    """
+    def __init__(self,nodes,substructure):
+        Element.__init__(self, etype=substructure.mtype)
+        if len(nodes) != len(substructure.boundary):
+            raise ValueError("Number of nodes must match the boundary nodes of the substructure")
+        self.nodes = tuple(nodes)
+        self.substructure = substructure
+
+    def get_element_stiffness(self):
+        """
+        Condensed stiffness matrix (shared by all the instances)
+        """
+        return self.substructure.KB
+
+    def get_boundary_displacements(self):
+        """
+        Displacements of the boundary nodes, in DOF order
+        """
+        keys = DOF_NAMES[self.etype]
+        return np.array([getattr(nd,key) for nd in self.nodes for key in keys])
+
+    def get_interior_displacements(self):
+        """
+        Recover the displacements of the interior nodes after solving
+        the parent model.
+
+        Returns an array of shape (number of interior nodes, dof), in the
+        order of ``substructure.interior``.
+        """
+        return self.substructure.recover(self.get_boundary_displacements())
+
+    def get_nodes(self):
+        return self.nodes
+
+
+if __name__=='__main__':
+    pass
@@ -5,7 +5,7 @@
 #  License: MIT License
 # ***********************************
 
-SPRING_SIMPLE_REPORT = """
+SIMPLE_REPORT_HEADER = """
 ==========================
     NuSA Simple Report
 ==========================
@@ -15,58 +15,4 @@ Number of nodes: {nodes}
 Number of elements: {elements}
 
 RESULTS
-
-NODAL DISPLACEMENTS
-{nodal_displacements}
-
-NODAL FORCES
-{nodal_forces}
-
-ELEMENT FORCES
-{element_forces}
-
-FINITE ELEMENT MODEL INFO
-
-NODES
-{nodes_info}
-
-ELEMENTS
-{elements_info}
 """
-
-
-
-
-
-TRUSS_SIMPLE_REPORT = """
-==========================
-    NuSA Simple Report
-==========================
-
-Model: {model_name}
-Number of nodes: {nodes}
-Number of elements: {elements}
-
-RESULTS
-
-NODAL DISPLACEMENTS
-{nodal_displacements}
-
-NODAL FORCES
-{nodal_forces}
-
-ELEMENT FORCES
-{element_forces}
-
-ELEMENT STRESSES
-{element_stresses}
-
-FINITE ELEMENT MODEL INFO
-
-NODES:
-{nodes_info}
-
-ELEMENTS:
-{elements_info}
-
-"""
\ No newline at end of file
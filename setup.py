@@ -27,11 +27,12 @@ setup(name='nusa',
       author_email='delossantosmfq@gmail.com',
       license = "MIT",
       keywords=["Structural Analysis","Finite Element Analysis","Mechanical Engineering"],
-      install_requires=["matplotlib","numpy","tabulate","meshio","gmsh"],
+      install_requires=["matplotlib","numpy","scipy","meshio","gmsh"],
       url='https://github.com/JorgeDeLosSantos/nusa',
       long_description=long_description,
       long_description_content_type="text/markdown",
       packages=['nusa'],
+      entry_points={"console_scripts": ["nusa=nusa.cli:main"]},
       classifiers=[
       "Development Status :: 2 - Pre-Alpha",
       "Intended Audience :: Education",
@@ -0,0 +1,96 @@
+import os
+import sys
+
+import matplotlib
+matplotlib.use("Agg")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+
+def add_elements(m, elements, first_label=None):
+    """
+    Add *elements* to *m*, labelled first_label, first_label+1... if
+    given (default: labels assigned by the model)
+    """
+    for k,elm in enumerate(elements):
+        if first_label is not None:
+            elm.set_label(first_label + k)
+        m.add_element(elm)
+
+
+def build_plate(nx=12, ny=6, E=200e9, nu=0.3, t=0.01, first_label=None):
+    """
+    Cantilever plate of linear triangles, fixed at x=0 and loaded at x=2
+    """
+    from nusa import Node, LinearTriangle, LinearTriangleModel
+    xs, ys = np.linspace(0,2,nx+1), np.linspace(0,1,ny+1)
+    m = LinearTriangleModel()
+    nodes = {}
+    for j,y in enumerate(ys):
+        for i,x in enumerate(xs):
+            nodes[i,j] = Node((x,y))
+            m.add_node(nodes[i,j])
+    elements = []
+    for j in range(ny):
+        for i in range(nx):
+            a, b, c, d = nodes[i,j], nodes[i+1,j], nodes[i+1,j+1], nodes[i,j+1]
+            elements.append(LinearTriangle((a,b,c),E,nu,t))
+            elements.append(LinearTriangle((a,c,d),E,nu,t))
+    add_elements(m, elements, first_label)
+    for j in range(ny+1):
+        m.add_constraint(nodes[0,j], ux=0, uy=0)
+        m.add_force(nodes[nx,j], (1000, -500))
+    return m
+
+
+def build_truss(panels=4, E=200e9, A=1e-4, load=-1000.0, first_label=None):
+    """
+    Cantilever Warren-like truss: nodes 0..n-1 at y=0, n..2n-1 at y=1,
+    fixed at x=0 and loaded at the free end
+    """
+    from nusa import Node, Truss, TrussModel
+    n = panels + 1
+    m = TrussModel("Truss")
+    nodes = [Node((i,0)) for i in range(n)] + [Node((i,1)) for i in range(n)]
+    for nd in nodes:
+        m.add_node(nd)
+    pairs = [(a,b) for i in range(panels) for a,b in ((i,i+1),(n+i,n+i+1),(i,n+i+1),(i+1,n+i+1))]
+    pairs.append((0,n))
+    add_elements(m, [Truss((nodes[a],nodes[b]),E,A) for a,b in pairs], first_label)
+    for nd in (nodes[0], nodes[n]):
+        m.add_constraint(nd, ux=0, uy=0)
+    m.add_force(nodes[n-1], (0, load))
+    return m
+
+
+E, A = 200e9, 1e-4 # Truss members of panel_model
+
+
+def panel_model():
+    """
+    Unit square truss panel with a center node, returns the model and
+    its corner nodes
+    """
+    from nusa import Node, Truss, TrussModel
+    m = TrussModel("panel")
+    nodes = [Node((0,0)), Node((1,0)), Node((0,1)), Node((1,1))]
+    mid = Node((0.5,0.5))
+    for nd in nodes + [mid]:
+        m.add_node(nd)
+    a, b, c, d = nodes
+    for i,j in [(a,b),(a,mid),(b,mid),(c,mid),(d,mid),(a,c),(b,d),(c,d)]:
+        m.add_element(Truss((i,j),E,A))
+    return m, nodes
+
+
+@pytest.fixture
+def plate():
+    return build_plate()
+
+
+@pytest.fixture
+def truss():
+    return build_truss()
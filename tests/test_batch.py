@@ -0,0 +1,50 @@
+import numpy as np
+import numpy.linalg as la
+import pytest
+
+from nusa.batch import solve_batch, solve_stack
+from conftest import build_plate, build_truss
+from test_dofmap import springs
+from test_sample import cantilever
+
+
+def test_solve_batch_matches_sequential():
+    models = [build_truss(panels=p, load=-1000.0*(k+1)) for k,p in enumerate([2,3,3,4,4,4])]
+    models += [cantilever(3), springs()[0], build_plate(4,2)] # other classes, sparse
+    refs = [build_truss(panels=p, load=-1000.0*(k+1)) for k,p in enumerate([2,3,3,4,4,4])]
+    refs += [cantilever(3), springs()[0], build_plate(4,2)]
+    solve_batch(models)
+    for m,ref in zip(models, refs):
+        ref.solve()
+        assert np.allclose(m.u, ref.u)
+        assert np.allclose(m.reaction, ref.reaction)
+        assert not m._dirty
+
+
+def test_solve_batch_reuses_assembled_models():
+    m = build_truss()
+    m.solve()
+    u = m.u.copy()
+    m.add_forces([2], fy=-1000.0) # new load only
+    solve_batch([m])
+    ref = build_truss()
+    ref.add_forces([2], fy=-1000.0)
+    ref.solve()
+    assert np.allclose(m.u, ref.u) and not np.allclose(m.u, u)
+
+
+def test_solve_stack_prescribed():
+    K = np.array([[[2.0,-1.0],[-1.0,2.0]]]*2)
+    f = np.array([[1.0, 0.0], [0.0, 0.0]])
+    u = np.array([[0.0, 0.0], [0.0, 0.5]])
+    known = np.array([[False, False], [False, True]])
+    U, R = solve_stack(K, f, u, known)
+    assert np.allclose(U[0], la.solve(K[0], f[0]))
+    assert np.allclose(U[1], [0.25, 0.5]) and np.allclose(R[1], [0.0, 0.75])
+
+
+def test_singular_model_is_named():
+    m = build_truss(E=0.0)
+    m.name = "loose"
+    with pytest.raises(la.LinAlgError, match="loose"):
+        solve_batch([build_truss(), m])
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from nusa import Node, LinearTriangleModel
+
+from conftest import build_plate
+
+
+def test_add_constraints_and_forces(truss):
+    X = truss.get_coordinates()
+    truss.add_forces(X[:,0] == X[:,0].max(), 10.0, fy=[-1.0,-2.0])
+    end = np.flatnonzero(X[:,0] == X[:,0].max())
+    assert np.allclose(truss.f[truss.dofmap[end,0]], 10.0)
+    assert np.allclose(truss.f[truss.dofmap[end,1]], [-1.0,-2.0])
+    truss.add_constraints([1], uy=0.0)
+    assert truss._known[truss.dofmap[1,1]] and not truss._known[truss.dofmap[1,0]]
+    truss.solve()
+    assert truss.u[truss.dofmap[1,1]] == 0.0
+
+
+def test_orphan_nodes_are_fixed():
+    m = build_plate(4, 2)
+    m.add_node(Node((5,5))) # no elements
+    m.solve()
+    assert np.all(m._known[m.dofmap[-1]])
+
+
+def test_load_only_resolve_skips_node_check(monkeypatch):
+    m = build_plate(4, 2)
+    m.solve()
+    EC = m.get_connectivity()
+    assert m.get_connectivity() is EC # cached
+    calls = []
+    monkeypatch.setattr(LinearTriangleModel, "_check_nodes", lambda self: calls.append(1))
+    m.f *= 2
+    m.mark_dirty("loads")
+    m.solve()
+    assert calls == []
+    m.add_node(Node((5,5)))
+    assert m.get_connectivity() is not EC
+    m.solve()
+    assert calls == [1]
+
+
+def test_unknown_names_raise(truss):
+    with pytest.raises(ValueError):
+        truss.add_constraints([1], uz=0.0)
+    with pytest.raises(ValueError):
+        truss.add_forces([1], fz=1.0)
+    assert not truss._known[truss.dofmap[1]].any()
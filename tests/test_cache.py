@@ -0,0 +1,112 @@
+import numpy as np
+
+from nusa.cache import StiffnessCache, ResultCache
+from conftest import build_plate, build_truss
+
+
+def test_stiffness_cache_matches_kernel():
+    for build in (build_plate, build_truss):
+        ref = build()
+        m = build()
+        m.stiffness_cache = StiffnessCache()
+        assert np.allclose(m.get_element_matrices(), ref.get_element_matrices())
+
+
+def test_stiffness_cache_shares_keys_with_per_element_path():
+    m = build_truss(panels=10)
+    batch, single = StiffnessCache(), StiffnessCache()
+    m.stiffness_cache = batch
+    m.get_element_matrices()
+    for elm in m.get_elements():
+        single.get_element_stiffness(elm)
+    assert set(batch._data) == set(single._data)
+    assert batch.stats == single.stats
+    assert len(batch) == 3 # horizontal, vertical and diagonal members
+
+
+def test_stiffness_cache_hits_on_second_assembly():
+    m = build_plate()
+    m.stiffness_cache = StiffnessCache()
+    m.get_element_matrices()
+    misses = m.stiffness_cache.misses
+    m.get_element_matrices()
+    assert m.stiffness_cache.misses == misses
+    assert m.stiffness_cache.hits == 2*m.get_number_of_elements() - misses
+
+
+def test_stiffness_cache_maxsize():
+    m = build_truss(panels=10)
+    m.stiffness_cache = StiffnessCache(maxsize=2)
+    ref = build_truss(panels=10)
+    assert np.allclose(m.get_element_matrices(), ref.get_element_matrices())
+    assert len(m.stiffness_cache) == 2
+
+
+def test_result_cache_hit_and_miss(tmp_path):
+    m = build_truss()
+    m.solve(cache_dir=str(tmp_path))
+    assert m.profile.info["result_cache"] == "miss"
+    m2 = build_truss()
+    m2.solve(cache_dir=str(tmp_path))
+    assert m2.profile.info["result_cache"] == "hit"
+    assert "assembly" not in m2.profile.phases
+    assert np.array_equal(m2.u, m.u) and np.array_equal(m2.reaction, m.reaction)
+    m3 = build_truss(load=-2000.0)
+    m3.solve(cache_dir=str(tmp_path))
+    assert m3.profile.info["result_cache"] == "miss"
+    assert np.allclose(m3.u, 2*m.u)
+
+
+def test_fingerprint():
+    a, b = build_truss(), build_truss()
+    assert a.fingerprint() == b.fingerprint()
+    assert build_truss(E=210e9).fingerprint() != a.fingerprint()
+    list(b.get_nodes())[-1].x += 1e-9
+    assert b.fingerprint() != a.fingerprint()
+
+
+def test_result_cache_discards_corrupt_files(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put("k", np.ones(4), np.zeros(4))
+    assert np.array_equal(cache.get("k")[0], np.ones(4))
+    fname = tmp_path/"k.npz"
+    fname.write_bytes(fname.read_bytes()[:40]) # truncated
+    assert cache.get("k") is None and not fname.exists()
+
+
+def test_result_cache_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path), max_bytes=3000)
+    for k in range(5):
+        cache.put("k{0}".format(k), np.full(100, k), np.zeros(100))
+    assert cache.get("k4") is not None and cache.get("k0") is None
+    assert sum(f.stat().st_size for f in tmp_path.glob("*.npz")) <= 3000
+
+
+def test_result_cache_hit_updates_state(tmp_path):
+    cached = build_truss()
+    cached.add_constraint(list(cached.get_nodes())[1], uy=0)
+    cached.solve(cache_dir=str(tmp_path))
+    m = build_truss()
+    m.solve()
+    m.add_constraint(list(m.get_nodes())[1], uy=0) # same model as the cached one
+    m.solve(cache_dir=str(tmp_path))
+    assert m.profile.info["result_cache"] == "hit"
+    assert not m._dirty and m.solved_u is None
+    u, reaction = m.u.copy(), m.reaction
+    U, R = m.solve_loads(np.column_stack([m.f]))
+    assert np.allclose(U[:,0], u) and np.allclose(R[:,0], reaction)
+    m.solve() # reduced and factorized with the new constraint
+    assert np.allclose(m.u, u) and np.allclose(m.reaction, reaction)
+
+
+def test_result_cache_tolerates_concurrent_removal(tmp_path, monkeypatch):
+    import os
+    cache = ResultCache(str(tmp_path))
+    cache.put("k", np.ones(4), np.zeros(4))
+    (tmp_path/"k.npz").write_bytes(b"corrupt")
+    def removed(*args):
+        raise FileNotFoundError(args[0])
+    monkeypatch.setattr(os, "remove", removed)
+    monkeypatch.setattr(os, "stat", removed)
+    assert cache.get("k") is None
+    cache.evict()
@@ -0,0 +1,41 @@
+import json
+
+import numpy as np
+
+from nusa.cli import main, run_model
+from nusa.io import save_model
+from conftest import build_truss
+
+
+def write_models(directory, loads):
+    for k,load in enumerate(loads):
+        save_model(build_truss(load=load), str(directory/"m{0}.nusa".format(k)))
+
+
+def test_run_model(tmp_path):
+    write_models(tmp_path, [-1000.0])
+    record = run_model(str(tmp_path/"m0.nusa"), str(tmp_path/"m0.npz"))
+    assert "error" not in record and record["dofs"] == 20
+    assert {"read", "assembly", "solver", "write"} <= set(record["phases"])
+    ref = build_truss()
+    ref.solve()
+    with np.load(str(tmp_path/"m0.npz")) as data:
+        assert np.allclose(data["ux"], ref.get_nsol("ux"))
+
+
+def test_run_command(tmp_path, capsys):
+    loads = [-1000.0, -2000.0, -3000.0]
+    write_models(tmp_path, loads)
+    out = tmp_path/"out"
+    status = main(["run", str(tmp_path/"*.nusa"), "-o", str(out), "-w", "2", "-f", "csv", "--profile"])
+    assert status == 0
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert sorted(r["model"] for r in records) == sorted(str(tmp_path/"m{0}.nusa".format(k)) for k in range(3))
+    uy = [np.genfromtxt(str(out/"m{0}.csv".format(k)), delimiter=",", names=True)["uy"] for k in range(3)]
+    assert np.allclose(uy[1], 2*uy[0]) and np.allclose(uy[2], 3*uy[0])
+
+
+def test_run_reports_errors(tmp_path, capsys):
+    (tmp_path/"bad.nusa").write_text('{"type": "shell", "nodes": []}')
+    assert main(["run", str(tmp_path/"bad.nusa"), "-q"]) == 1
+    assert "bad.nusa: ValueError" in capsys.readouterr().err
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+
+def phases(m):
+    return set(m.profile.phases)
+
+
+def test_first_solve_runs_everything(truss):
+    truss.solve()
+    assert {"assembly", "reduction", "factorization", "solver"} <= phases(truss)
+    assert not truss._dirty
+
+
+def test_load_change_only_solves(truss):
+    truss.solve()
+    u = truss.u.copy()
+    nd = list(truss.get_nodes())[truss.get_number_of_nodes()//2 - 1]
+    truss.add_force(nd, (0, -2000.0))
+    truss.solve()
+    assert "assembly" not in phases(truss) and "factorization" not in phases(truss)
+    assert not np.allclose(truss.u, u)
+
+
+def test_property_change_reassembles(truss):
+    truss.solve()
+    u = truss.u.copy()
+    for elm in truss.get_elements():
+        elm.A = 2*elm.A
+    assert "properties" in truss._dirty
+    truss.solve()
+    assert {"assembly", "factorization"} <= phases(truss)
+    assert np.allclose(truss.u, u/2)
+
+
+def test_geometry_change_reassembles(truss):
+    truss.solve()
+    nd = list(truss.get_nodes())[-1]
+    nd.x = nd.x + 0.1
+    assert "geometry" in truss._dirty
+    truss.solve()
+    assert "assembly" in phases(truss)
+
+
+def test_constraint_change_reduces_only(truss):
+    truss.solve()
+    truss.add_constraint(list(truss.get_nodes())[1], uy=0)
+    truss.solve()
+    assert "assembly" not in phases(truss)
+    assert {"reduction", "factorization"} <= phases(truss)
+    assert truss.u[truss.dofmap[1,1]] == 0.0
+
+
+def test_mark_dirty_validates(truss):
+    with pytest.raises(ValueError):
+        truss.mark_dirty("colour")
@@ -0,0 +1,55 @@
+import numpy as np
+
+from nusa import Node, Spring, SpringModel
+
+
+def test_dofmap_layout(truss):
+    truss._check_dof_map()
+    n = truss.get_number_of_nodes()
+    assert truss.dofmap.shape == (n, 2)
+    assert np.array_equal(np.sort(truss.dofmap.ravel()), np.arange(2*n))
+    assert truss.u.shape == truss.f.shape == truss.reaction.shape == (2*n,)
+
+
+def test_node_attributes_read_model_arrays(truss):
+    truss.solve()
+    for nd in truss.get_nodes():
+        eqs = truss.dofmap[nd.label]
+        assert (nd.ux, nd.uy) == tuple(truss.u[eqs])
+        assert (nd.fx, nd.fy) == tuple(truss.f[eqs] + truss.reaction[eqs]) # loads or reactions
+
+
+def test_free_node_storage():
+    nd = Node((0,0))
+    nd.ux = 1.5
+    assert nd.ux == 1.5
+
+
+def springs(k1=1000.0, k2=3000.0, d=0.01):
+    m = SpringModel("series")
+    nodes = [Node((0,0)) for k in range(3)]
+    for nd in nodes:
+        m.add_node(nd)
+    m.add_element(Spring((nodes[0],nodes[1]),k1))
+    m.add_element(Spring((nodes[1],nodes[2]),k2))
+    m.add_constraint(nodes[0], ux=0)
+    m.add_constraint(nodes[2], ux=d) # prescribed, non-zero
+    return m, nodes
+
+
+def test_prescribed_displacement():
+    k1, k2, d = 1000.0, 3000.0, 0.01
+    m, nodes = springs(k1, k2, d)
+    m.solve()
+    force = k1*k2*d/(k1 + k2)
+    assert np.isclose(nodes[1].ux, k2*d/(k1 + k2))
+    assert np.isclose(nodes[2].ux, d)
+    assert np.allclose(m.reaction[m.dofmap[:,0]], [-force, 0.0, force])
+
+
+def test_solve_twice():
+    m, nodes = springs()
+    m.solve()
+    u = m.u.copy()
+    m.solve()
+    assert np.array_equal(m.u, u)
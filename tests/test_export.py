@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("location", ["nodes", "elements"])
+def test_export_formats_agree(tmp_path, plate, location):
+    plate.solve()
+    fields = plate._nodal_fields if location == "nodes" else plate._element_fields
+    npz = str(tmp_path/"res.npz")
+    csv = str(tmp_path/"res.csv")
+    plate.export_results(npz, location=location)
+    plate.export_results(csv, location=location, chunksize=7)
+    with np.load(npz) as data:
+        ref = plate.get_results(fields, location)
+        for var in fields:
+            assert np.array_equal(data[var], ref[var], equal_nan=True)
+        table = np.genfromtxt(csv, delimiter=",", names=True)
+        label = "node" if location == "nodes" else "element"
+        assert np.array_equal(table[label], data[label])
+        for var in fields:
+            assert np.array_equal(table[var], data[var], equal_nan=True)
+
+
+def test_export_selected_fields(tmp_path, truss):
+    truss.solve()
+    fname = str(tmp_path/"res.npz")
+    truss.export_results(fname, fields=["ux","uy"])
+    with np.load(fname) as data:
+        assert sorted(data.files) == ["node", "ux", "uy"]
+        assert np.array_equal(data["node"], np.arange(1, truss.get_number_of_nodes()+1))
+
+
+def test_export_parquet(tmp_path, truss):
+    pq = pytest.importorskip("pyarrow.parquet")
+    truss.solve()
+    fname = str(tmp_path/"res.parquet")
+    truss.export_results(fname, chunksize=3)
+    table = pq.read_table(fname)
+    assert np.allclose(table.column("ux").to_numpy(), truss.get_nsol("ux"))
+
+
+def test_export_errors(tmp_path, truss):
+    truss.solve()
+    with pytest.raises(ValueError):
+        truss.export_results(str(tmp_path/"res.xlsx"))
+    with pytest.raises(ValueError):
+        truss.export_results(str(tmp_path/"res.csv"), location="faces")
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from nusa import Node, Truss, TrussModel, LinearTriangle, Substructure, Superelement
+from conftest import build_plate, build_truss, panel_model, E, A
+
+
+def test_truss_geometry():
+    m = TrussModel()
+    n1, n2, n3 = Node((0,0)), Node((3,4)), Node((0,4))
+    for nd in (n1,n2,n3):
+        m.add_node(nd)
+    e1, e2 = Truss((n1,n2),E,A), Truss((n3,n2),E,A)
+    m.add_element(e1)
+    m.add_element(e2)
+    geom = m.get_element_geometry()
+    assert np.allclose(geom["L"], [5, 3])
+    assert np.allclose(geom["C"], [0.6, 1])
+    assert np.allclose(geom["S"], [0.8, 0])
+    assert np.all(np.isnan(geom["A"]))
+    assert e1.L == pytest.approx(5)
+    n2.x = 6 # moving a node invalidates the cache
+    assert e2.L == pytest.approx(6)
+
+
+def test_triangle_geometry():
+    from nusa import LinearTriangleModel
+    m = LinearTriangleModel()
+    nodes = [Node((0,0)), Node((2,0)), Node((0,1))]
+    for nd in nodes:
+        m.add_node(nd)
+    elm = LinearTriangle(tuple(nodes), 200e9, 0.3, 0.1)
+    m.add_element(elm)
+    geom = m.get_element_geometry()
+    assert geom["A"][0] == pytest.approx(1)
+    assert np.all(np.isnan(geom["L"]))
+    assert np.allclose(geom["B"][0], elm.B)
+
+
+def test_superelement_only_truss():
+    panel, boundary = panel_model()
+    sub = Substructure(panel, boundary)
+    m = TrussModel("tower")
+    levels = [[Node((0,k)), Node((1,k))] for k in range(3)]
+    for lv in levels:
+        for nd in lv:
+            m.add_node(nd)
+    for k in range(2):
+        m.add_element(Superelement((levels[k][0],levels[k][1],levels[k+1][0],levels[k+1][1]), sub))
+    m.add_constraints([0,1], ux=0, uy=0)
+    m.add_forces([4], fx=1000)
+    m.solve()
+    geom = m.get_element_geometry()
+    for key in ("L","C","S","A"):
+        assert np.all(np.isnan(geom[key]))
+    assert np.all(np.isnan(m.get_esol("f")))
+    assert "ELEMENT FORCES" in m.simple_report("string")
+
+
+@pytest.mark.parametrize("build", [build_truss, build_plate])
+def test_relabelled_elements(build):
+    ref = build()
+    ref.solve()
+    m = build(first_label=1) # labels 1..ne
+    m.solve()
+    assert np.allclose(m.u, ref.u)
+    elements = list(m.get_elements())
+    assert elements[0].label == 1
+    key = "L" if build is build_truss else "A"
+    assert getattr(elements[-1], key) == getattr(list(ref.get_elements())[-1], key)
@@ -0,0 +1,60 @@
+import numpy as np
+
+from nusa import Node, Bar, BarModel, Truss, TrussModel
+from nusa.core import ELEMENT_KERNELS, register_kernel
+from test_dofmap import springs
+from test_sample import cantilever
+from nusa.cache import StiffnessCache
+from conftest import build_plate, build_truss
+
+
+def bars():
+    m = BarModel("bars")
+    nodes = [Node((x,0)) for x in (0.0, 0.5, 1.5)]
+    for nd in nodes:
+        m.add_node(nd)
+    m.add_element(Bar((nodes[0],nodes[1]),200e9,1e-4))
+    m.add_element(Bar((nodes[1],nodes[2]),70e9,2e-4))
+    return m
+
+
+def per_element(m):
+    return np.concatenate([np.ravel(elm.get_element_stiffness()) for elm in m.get_elements()])
+
+
+def test_kernels_match_element_stiffness(plate, truss):
+    for m in (plate, truss, cantilever(), springs()[0], bars()):
+        assert np.allclose(m.get_element_matrices(), per_element(m))
+
+
+def test_registered_kernel_is_used(truss):
+    class MyTruss(Truss):
+        pass
+    calls = []
+    @register_kernel(MyTruss)
+    def kernel(model, elements):
+        calls.append(len(elements))
+        return np.array([elm.get_element_stiffness() for elm in elements])
+    try:
+        m = TrussModel("custom")
+        for nd in truss.get_nodes():
+            m.add_node(Node((nd.x, nd.y)))
+        nodes = list(m.get_nodes())
+        for elm in truss.get_elements():
+            i, j = [nd.label for nd in elm.get_nodes()]
+            m.add_element(MyTruss((nodes[i],nodes[j]), elm.E, elm.A))
+        m.build_global_matrix()
+        truss.build_global_matrix()
+        assert calls == [m.get_number_of_elements()]
+        assert np.allclose(m.KG, truss.KG)
+    finally:
+        del ELEMENT_KERNELS[MyTruss]
+
+
+def test_kernels_with_relabelled_elements():
+    for build in (build_truss, build_plate):
+        ref = build()
+        m = build(first_label=100)
+        assert np.allclose(m.get_element_matrices(), ref.get_element_matrices())
+        m.stiffness_cache = StiffnessCache()
+        assert np.allclose(m.get_element_matrices(), ref.get_element_matrices())
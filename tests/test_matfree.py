@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from conftest import build_plate
+
+
+@pytest.mark.parametrize("mode", ["cached", "onthefly"])
+def test_matrix_free_matches_direct(mode):
+    ref = build_plate()
+    ref.solve()
+    m = build_plate()
+    m.matrix_free = mode
+    m.chunksize = 50 # several chunks per product
+    m.solve()
+    assert np.allclose(m.u, ref.u, rtol=1e-6, atol=1e-9*np.abs(ref.u).max())
+
+
+def test_onthefly_does_not_cache_geometry():
+    m = build_plate()
+    m.matrix_free = "onthefly"
+    m.solve()
+    assert "elements" not in m._geometry # no model-wide A, B
+
+
+def test_operator_products():
+    m = build_plate()
+    m.build_global_matrix()
+    K = m.KG.toarray() if hasattr(m.KG, "toarray") else np.asarray(m.KG)
+    x = np.random.RandomState(0).rand(m.dofmap.size)
+    for cached in (True, False):
+        op = m.get_operator(cached)
+        assert np.allclose(op.matvec(x), K.dot(x))
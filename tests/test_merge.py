@@ -0,0 +1,35 @@
+import numpy as np
+
+from nusa.mesh import merge_coincident_nodes
+
+
+def two_squares(gap=0.0):
+    """
+    Two unit squares (two triangles each) meshed separately, side by
+    side: the shared edge has duplicated nodes
+    """
+    nc = np.array([[0,0],[1,0],[1,1],[0,1], [1+gap,0],[2,0],[2,1],[1+gap,1]], dtype=float)
+    ec = np.array([[0,1,2],[0,2,3], [4,5,6],[4,6,7]])
+    return nc, ec
+
+
+def test_merge_shared_edge():
+    nc, ec = two_squares(gap=1e-12)
+    nc2, ec2, merged = merge_coincident_nodes(nc, ec, tol=1e-8)
+    assert merged == 2
+    assert np.array_equal(nc2, nc[[0,1,2,3,5,6]]) # order kept, first node of each group
+    assert np.array_equal(ec2, [[0,1,2],[0,2,3],[1,4,5],[1,5,2]])
+
+
+def test_nothing_to_merge():
+    nc, ec = two_squares(gap=0.1)
+    nc2, ec2, merged = merge_coincident_nodes(nc, ec, tol=1e-8)
+    assert merged == 0 and nc2 is nc and np.array_equal(ec2, ec)
+
+
+def test_chains_and_collapsed_elements():
+    nc = np.array([[0,0],[0.6e-8,0],[1.2e-8,0],[1,0],[0,1]]) # 0-1-2 chained within tol
+    ec = np.array([[0,3,4],[0,1,3],[1,2,4]])
+    nc2, ec2, merged = merge_coincident_nodes(nc, ec, tol=1e-8)
+    assert merged == 2 and len(nc2) == 3
+    assert np.array_equal(ec2, [[0,1,2]]) # elements with repeated nodes dropped
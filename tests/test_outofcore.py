@@ -0,0 +1,44 @@
+import numpy as np
+
+from conftest import build_plate
+
+
+def test_out_of_core_matches_in_memory(tmp_path):
+    ref = build_plate()
+    ref.sparse_matrix = True
+    ref.build_global_matrix()
+    m = build_plate()
+    m.out_of_core = str(tmp_path)
+    m.memory_limit = 2**16 # many runs and merge blocks
+    m.build_global_matrix()
+    assert abs(m.KG - ref.KG).max() <= 1e-9*abs(ref.KG).max()
+    assert (tmp_path/"K.data.bin").stat().st_size == 8*m.KG.nnz
+    assert "elements" not in m._geometry # no model-wide A, B
+
+
+def test_out_of_core_solve(tmp_path):
+    ref = build_plate()
+    ref.solve()
+    m = build_plate()
+    m.out_of_core = str(tmp_path)
+    m.solve()
+    assert np.allclose(m.u, ref.u, rtol=1e-6, atol=1e-9*np.abs(ref.u).max())
+
+
+def test_clone_does_not_share_files(tmp_path):
+    m = build_plate()
+    m.out_of_core = str(tmp_path)
+    m.solve()
+    u = m.u.copy()
+    KG = m.KG.data.copy()
+    variant = m.clone()
+    assert variant.out_of_core is None
+    for elm in variant.get_elements():
+        elm.E = 100e9
+    variant.solve()
+    assert np.allclose(variant.u, 2*u)
+    assert np.array_equal(m.KG.data, KG) # the original's memory maps are untouched
+    m.f *= 3
+    m.mark_dirty("loads")
+    m.solve()
+    assert np.allclose(m.u, 3*u)
@@ -0,0 +1,51 @@
+import copy
+import pickle
+
+import numpy as np
+
+from conftest import build_plate
+
+
+def test_pickle_roundtrip(truss):
+    truss.solve()
+    m = pickle.loads(pickle.dumps(truss))
+    assert [e.label for e in m.get_elements()] == [e.label for e in truss.get_elements()]
+    m.solve()
+    assert np.allclose(m.u, truss.u)
+    assert np.allclose(m.reaction, truss.reaction)
+
+
+def test_deepcopy_is_independent(truss):
+    truss.solve()
+    m = copy.deepcopy(truss)
+    m.add_forces([4], fy=-2000.0)
+    m.solve()
+    assert not np.allclose(m.u, truss.u)
+
+
+def test_clone_new_loads(plate):
+    plate.solve()
+    variant = plate.clone()
+    variant.f *= 2
+    variant.mark_dirty("loads")
+    variant.solve()
+    assert "assembly" not in variant.profile.phases
+    assert np.allclose(variant.u, 2*plate.u)
+
+
+def test_clone_isolated_from_original_resolve():
+    m = build_plate()
+    m.solve()
+    variant = m.clone()
+    variant.solve()
+    u, reaction = variant.u.copy(), variant.reaction.copy()
+    for elm in m.get_elements(): # the original changes and refills its KG
+        elm.E = 100e9
+    m.solve()
+    assert np.allclose(m.u, 2*u)
+    variant.f *= 3
+    variant.mark_dirty("loads")
+    variant.solve()
+    assert np.allclose(variant.u, 3*u)
+    assert np.allclose(variant.reaction, 3*reaction)
+    assert np.allclose(variant.KG.dot(variant.u)[variant._free], variant.f[variant._free])
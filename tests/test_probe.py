@@ -0,0 +1,25 @@
+import numpy as np
+
+
+def test_probe_at_nodes(plate):
+    plate.solve()
+    X = plate.get_coordinates()
+    u = plate.probe(X, "u")
+    assert u.shape == (len(X), 2)
+    assert np.allclose(u[:,0], plate.get_nsol("ux"))
+    assert np.allclose(plate.probe(X, "seqv")[:,0], plate.get_nsol("seqv"))
+
+
+def test_probe_interpolates_linearly(plate):
+    plate.solve()
+    X = plate.get_coordinates()
+    EC = plate.get_connectivity()
+    i, j = EC[0,0], EC[0,1]
+    mid = plate.probe((X[i] + X[j])/2, ("ux","uy"))
+    assert np.allclose(mid[0], (plate.probe(X[[i,j]], "u")).mean(axis=0))
+
+
+def test_probe_outside_is_nan(plate):
+    plate.solve()
+    values = plate.probe([(-1.0, 0.5), (0.5, 0.5)], "ux")
+    assert np.isnan(values[0,0]) and not np.isnan(values[1,0])
@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pytest
+
+from nusa.profiling import ModelProfile
+
+
+def test_phases_of_a_solve(plate):
+    plate.solve()
+    phases = plate.profile.phases
+    for name in ("assembly","reduction","factorization","solver","update"):
+        assert phases[name]["calls"] == 1
+    assert phases["symbolic"]["parent"] == "assembly"
+    top = sum(rec["time"] for name,rec in phases.items() if name != "symbolic")
+    assert plate.profile.total_time == pytest.approx(top)
+    assert plate.profile.info["matrix_size"] == np.count_nonzero(~plate._known)
+    data = json.loads(plate.profile.to_json())
+    assert data["solves"] == 1
+
+
+def test_phases_are_reset_per_solve(plate):
+    plate.solve()
+    plate.f *= 2
+    plate.mark_dirty("loads")
+    plate.solve()
+    assert plate.profile.solves == 2
+    assert "assembly" not in plate.profile.phases # load-only re-solve
+    assert plate.profile.phases["solver"]["calls"] == 1
+
+
+def test_repeated_calls_add_up():
+    profile = ModelProfile()
+    for k in range(3):
+        with profile.phase("a"):
+            pass
+    rec = profile.phases["a"]
+    assert rec["calls"] == 3 and rec["time"] > 0
+
+
+def test_nested_peak_memory():
+    profile = ModelProfile()
+    with profile.capture(cprofile=False, condition=False):
+        with profile.phase("outer"):
+            big = np.ones(2*10**6) # 16 MB
+            del big
+            with profile.phase("inner"):
+                np.ones(10**4)
+    outer, inner = profile.phases["outer"], profile.phases["inner"]
+    assert outer["peak_memory"] >= 16*10**6
+    assert inner["peak_memory"] < 16*10**6
+    assert profile.info["peak_memory"] >= outer["peak_memory"]
+
+
+def test_disabled_profile(plate):
+    plate.profile.enabled = False
+    plate.solve()
+    assert plate.profile.phases == {}
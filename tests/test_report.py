@@ -0,0 +1,41 @@
+import io
+
+import numpy as np
+import pytest
+
+from nusa.report import ReportWriter
+
+
+def test_csv_table_round_trip():
+    labels, ux = np.arange(7), np.linspace(-1, 1, 7)/3
+    buf = io.StringIO()
+    rw = ReportWriter(buf, "csv", chunksize=3) # rows split in chunks
+    rw.write_title("NODAL DISPLACEMENTS")
+    rw.write_table(("Node","UX"), (labels, ux), ("d","g"))
+    data = np.loadtxt(io.StringIO(buf.getvalue()), delimiter=",", comments="#", skiprows=3)
+    assert np.array_equal(data[:,0], labels)
+    assert np.array_equal(data[:,1], ux) # %.17g is exact
+
+
+@pytest.mark.parametrize("fmt", ["rst", "md"])
+def test_text_tables(fmt):
+    buf = io.StringIO()
+    ReportWriter(buf, fmt, chunksize=2).write_table(("Node","UX"), (np.arange(5), np.ones(5)), ("d","g"))
+    lines = buf.getvalue().splitlines()
+    assert len(lines) == (9 if fmt == "rst" else 7) # header, rules, 5 rows
+    assert len(set(len(line) for line in lines)) == 1 # aligned columns
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        ReportWriter(io.StringIO(), "html")
+
+
+@pytest.mark.parametrize("fmt", ["rst", "csv", "md"])
+def test_simple_report(tmp_path, truss, fmt):
+    truss.solve()
+    fname = str(tmp_path/"report.txt")
+    truss.simple_report("write", fname, fmt)
+    text = open(fname).read()
+    assert text == truss.simple_report("string", fmt=fmt)
+    assert "NODAL DISPLACEMENTS" in text
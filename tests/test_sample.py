@@ -0,0 +1,43 @@
+import numpy as np
+
+from nusa import Node, Beam, BeamModel
+
+E, I, L, P = 200e9, 1e-6, 2.0, 1000.0
+
+
+def cantilever(nelm=4):
+    m = BeamModel("Cantilever")
+    nodes = [Node((x,0)) for x in np.linspace(0, L, nelm+1)]
+    for nd in nodes:
+        m.add_node(nd)
+    for a,b in zip(nodes[:-1], nodes[1:]):
+        m.add_element(Beam((a,b),E,I))
+    m.add_constraint(nodes[0], ux=0, uy=0, ur=0) # encastre
+    m.add_force(nodes[-1], (-P,))
+    m.solve()
+    return m
+
+
+def test_beam_sample_matches_closed_form():
+    m = cantilever()
+    x = np.linspace(0, L, 41)
+    res = m.sample(x)
+    assert np.allclose(res["uy"], -P*x**2*(3*L - x)/(6*E*I)) # cubic: exact
+    assert np.allclose(res["ur"], -P*x*(2*L - x)/(2*E*I))
+    assert np.allclose(np.abs(res["m"]), P*(L - x))
+    assert np.allclose(np.abs(res["v"]), P)
+
+
+def test_beam_sample_outside_is_nan():
+    res = cantilever().sample([-0.5, 1.0, L + 0.5])
+    assert np.isnan(res["uy"][[0,2]]).all() and not np.isnan(res["uy"][1])
+
+
+def test_sample_path(plate):
+    plate.solve()
+    X = plate.get_coordinates()
+    y = X[:,1].max()/2
+    dist, values = plate.sample_path([(0,y), (1,y), (2,y)], 21, ("ux","uy"))
+    assert dist.shape == (21,) and values.shape == (21,2)
+    assert np.allclose(dist, np.linspace(0, 2, 21))
+    assert np.allclose(values, plate.probe(np.column_stack((dist, np.full(21,y))), "u"))
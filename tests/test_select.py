@@ -0,0 +1,42 @@
+import numpy as np
+
+
+def brute_force(X, box=None, circle=None, line=None, tol=1e-9):
+    mask = np.ones(len(X), dtype=bool)
+    if box is not None:
+        lo, hi = np.minimum(*box) - tol, np.maximum(*box) + tol
+        mask &= np.all((X >= lo) & (X <= hi), axis=1)
+    if circle is not None:
+        mask &= np.hypot(*(X - circle[0]).T) <= circle[1] + tol
+    if line is not None:
+        p0, p1 = np.asarray(line, dtype=float)
+        d = p1 - p0
+        s = np.clip(np.dot(X - p0, d)/np.dot(d, d), 0, 1)
+        mask &= np.hypot(*(X - p0 - s[:,None]*d).T) <= tol
+    return np.flatnonzero(mask)
+
+
+def test_select_matches_brute_force(plate):
+    X = plate.get_coordinates()
+    queries = [dict(box=((0.5,0.2),(1.2,0.8))),
+               dict(circle=((1.0,0.5),0.35)),
+               dict(line=((0,0),(0,1))),
+               dict(line=((0,0),(2,1))), # diagonal through the nodes
+               dict(box=((0,0),(2,1)), circle=((2,1),0.6))]
+    for q in queries:
+        assert np.array_equal(plate.select_nodes(tol=1e-9, **q), brute_force(X, tol=1e-9, **q))
+
+
+def test_select_all_and_usable_as_constraints(plate):
+    assert np.array_equal(plate.select_nodes(), np.arange(plate.get_number_of_nodes()))
+    right = plate.select_nodes(line=((2,0),(2,1)))
+    plate.add_constraints(right, ux=0)
+    assert plate._known[plate.dofmap[right,0]].all()
+
+
+def test_kdtree_invalidated_by_geometry(plate):
+    tree = plate.get_kdtree()
+    nd = list(plate.get_nodes())[0]
+    nd.x = -1.0
+    assert plate.get_kdtree() is not tree
+    assert list(plate.select_nodes(circle=((-1.0,0.0),1e-6))) == [nd.label]
@@ -0,0 +1,49 @@
+import pickle
+import multiprocessing
+
+import numpy as np
+import pytest
+
+
+def load_case(args):
+    handle, node, force = args
+    f = np.zeros_like(handle.f)
+    f[handle.dofmap[node,1]] = force
+    u, reaction = handle.solve(f)
+    handle.close()
+    return u
+
+
+@pytest.mark.parametrize("model", ["plate", "truss"]) # sparse and dense KG
+def test_shared_solve_matches_model(model, request):
+    m = request.getfixturevalue(model)
+    with m.to_shared() as handle:
+        u, reaction = handle.solve()
+        m.solve()
+        assert np.allclose(u, m.u) and np.allclose(reaction, m.reaction)
+        assert np.array_equal(handle.coordinates, m.get_coordinates())
+        with pytest.raises(ValueError):
+            handle.f[0] = 1.0 # read-only
+
+
+def test_pickled_handle_attaches(truss):
+    with truss.to_shared() as handle:
+        data = pickle.dumps(handle)
+        assert len(data) < 2000 # block names, not arrays
+        copy = pickle.loads(data)
+        u, reaction = copy.solve()
+        copy.close()
+    truss.solve()
+    assert np.allclose(u, truss.u)
+
+
+def test_workers(truss):
+    if "fork" not in multiprocessing.get_all_start_methods():
+        pytest.skip("fork start method required")
+    nodes = list(range(1, truss.get_number_of_nodes()))
+    with truss.to_shared() as handle:
+        with multiprocessing.get_context("fork").Pool(2) as pool:
+            results = pool.map(load_case, [(handle, k, -1000.0) for k in nodes])
+        for k,u in zip(nodes, results):
+            ref, reaction = handle.solve(np.where(np.arange(len(handle.f)) == handle.dofmap[k,1], -1000.0, 0.0))
+            assert np.allclose(u, ref)
@@ -0,0 +1,96 @@
+import numpy as np
+
+from nusa import server
+from nusa.io import model_to_dict, save_model, load_model
+from conftest import build_plate, build_truss
+
+
+def load_cases(m, ncases=3):
+    rng = np.random.RandomState(0)
+    F = np.zeros((m.dofmap.size, ncases))
+    F[m.dofmap[-1]] = rng.rand(m.dof, ncases)*1000
+    return F
+
+
+def test_solve_loads_matches_solve():
+    m = build_plate()
+    m.solve()
+    F = load_cases(m)
+    U, R = m.solve_loads(F)
+    for k in range(F.shape[1]):
+        ref = build_plate()
+        ref._check_dof_map()
+        ref.f[:] = F[:,k]
+        ref.mark_dirty("loads")
+        ref.solve()
+        assert np.allclose(U[:,k], ref.u)
+        assert np.allclose(R[:,k], ref.reaction, atol=1e-6*np.abs(F).max())
+
+
+def test_solve_loads_keeps_state():
+    m = build_truss()
+    m.solve()
+    u, reaction = m.u.copy(), m.reaction.copy()
+    for elm in m.get_elements():
+        elm.E = 2*elm.E # properties dirty: assembly and factorization only
+    U, R = m.solve_loads(np.column_stack([m.f]))
+    assert np.array_equal(m.u, u) and np.array_equal(m.reaction, reaction)
+    assert np.allclose(U[:,0], u/2)
+    m.solve()
+    assert np.allclose(m.u, u/2)
+
+
+def test_model_dict_round_trip(tmp_path):
+    m = build_truss()
+    fname = str(tmp_path/"truss.nusa")
+    save_model(m, fname)
+    m2 = load_model(fname)
+    assert model_to_dict(m2) == model_to_dict(m)
+    m.solve()
+    m2.solve()
+    assert np.allclose(m2.u, m.u)
+
+
+def test_legacy_read_model():
+    import os
+    import nusa
+    fname = os.path.join(os.path.dirname(nusa.__file__), "data", "truss_model.nusa")
+    m = nusa.read_model(fname, "truss") # not shadowed by nusa.io
+    assert m.get_number_of_elements() > 0
+
+
+def test_server_cases():
+    m = build_truss()
+    data = model_to_dict(m)
+    forces = data.pop("forces")
+    key = server.SolveServer.model_key(data)
+    doubled = [dict(spec, fy=[2*v for v in spec["fy"]]) for spec in forces]
+    results = server._solve_cases(key, data, [forces, doubled])
+    warm = server._solve_cases(key, None, [forces]) # cached model
+    assert np.allclose(warm[0]["u"], results[0]["u"])
+    m.solve()
+    assert np.allclose(results[0]["u"], m.u[m.dofmap])
+    assert np.allclose(results[1]["u"], 2*m.u[m.dofmap])
+    assert server._solve_cases("unknown", None, [forces]) is None
+    bad = server._solve_cases(key, None, [[{"nodes": [99], "fy": 1.0}], doubled])
+    assert isinstance(bad[0], Exception)
+    assert np.allclose(bad[1]["u"], results[1]["u"]) # a malformed case fails alone
+    server._MODELS.clear()
+
+
+def test_server_coalesces_requests():
+    import asyncio
+    m = build_truss()
+    data = model_to_dict(m)
+    srv = server.SolveServer(workers=1, window=0.05)
+    srv.start()
+    try:
+        async def run():
+            cases = [dict(data, forces=[{"nodes": [4], "fy": -1000.0*k}]) for k in range(1,6)]
+            return await asyncio.gather(*[srv.solve(case) for case in cases])
+        results = asyncio.run(run())
+    finally:
+        srv.close()
+    assert srv.stats == {"requests": 5, "batches": 1, "builds": 1}
+    uy = np.array([np.array(r["u"])[:,1] for r in results])
+    assert np.allclose(uy, np.outer(np.arange(1,6), uy[0]))
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from nusa import Node, Truss, TrussModel, Substructure, Superelement
+from conftest import panel_model, E, A
+
+MEMBERS = [(0,1),(0,4),(1,4),(2,4),(3,4),(0,2),(1,3),(2,3)] # panel_model, node 4 at the center
+
+
+def full_tower(npanels):
+    """
+    Stacked panels as a plain truss: corners (0,k), (1,k) and centers
+    (0.5,k+0.5)
+    """
+    m = TrussModel("full")
+    corners = [[Node((0,k)), Node((1,k))] for k in range(npanels+1)]
+    centers = [Node((0.5,k+0.5)) for k in range(npanels)]
+    for nd in [nd for lv in corners for nd in lv] + centers:
+        m.add_node(nd)
+    for k in range(npanels):
+        nodes = corners[k] + corners[k+1] + [centers[k]]
+        for i,j in MEMBERS: # shared edges get a member of each panel, as superelements
+            m.add_element(Truss((nodes[i],nodes[j]),E,A))
+    return m, corners, centers
+
+
+def super_tower(npanels):
+    panel, boundary = panel_model()
+    sub = Substructure(panel, boundary)
+    m = TrussModel("tower")
+    corners = [[Node((0,k)), Node((1,k))] for k in range(npanels+1)]
+    for nd in [nd for lv in corners for nd in lv]:
+        m.add_node(nd)
+    for k in range(npanels):
+        m.add_element(Superelement(tuple(corners[k] + corners[k+1]), sub))
+    return m, corners
+
+
+def test_superelements_match_full_model():
+    npanels = 3
+    full, fcorners, centers = full_tower(npanels)
+    sup, scorners = super_tower(npanels)
+    for m, corners in ((full, fcorners), (sup, scorners)):
+        for nd in corners[0]:
+            m.add_constraint(nd, ux=0, uy=0)
+        m.add_force(corners[-1][1], (1000, -500))
+        m.solve()
+    for fl, sl in zip(fcorners, scorners):
+        for fn, sn in zip(fl, sl):
+            assert np.allclose([fn.ux, fn.uy], [sn.ux, sn.uy])
+    for k,elm in enumerate(sup.get_elements()):
+        ui = elm.get_interior_displacements()
+        assert np.allclose(ui[0], [centers[k].ux, centers[k].uy])
+
+
+def test_substructure_is_shared():
+    sup, corners = super_tower(2)
+    e0, e1 = sup.get_elements()
+    assert e0.get_element_stiffness() is e1.get_element_stiffness()
+    assert e0.get_element_stiffness().shape == (8,8)
+
+
+def test_superelement_node_count():
+    panel, boundary = panel_model()
+    with pytest.raises(ValueError):
+        Superelement(tuple(boundary[:3]), Substructure(panel, boundary))
@@ -0,0 +1,55 @@
+import numpy as np
+
+from nusa import Node, LinearTriangle
+from conftest import build_plate, build_truss
+
+
+def test_pattern_reused_on_property_change(plate):
+    plate.solve()
+    pattern, KG, ordering = plate._pattern, plate.KG, plate._ordering
+    for elm in plate.get_elements():
+        elm.E = 2*elm.E
+    plate.solve()
+    assert "symbolic" not in plate.profile.phases
+    assert plate._pattern is pattern and plate.KG is KG # refilled in place
+    assert plate._ordering is ordering # LU ordering kept
+    ref = build_plate(E=2*200e9)
+    ref.solve()
+    assert np.allclose(plate.u, ref.u)
+    assert abs(plate.KG - ref.KG).max() <= 1e-12*abs(ref.KG).max()
+
+
+def test_pattern_rebuilt_on_topology_change(plate):
+    plate.solve()
+    pattern = plate._pattern
+    nodes = list(plate.get_nodes())
+    extra = Node((nodes[-1].x + 0.5, nodes[-1].y))
+    plate.add_node(extra)
+    plate.add_element(LinearTriangle((nodes[-2], nodes[-1], extra), 200e9, 0.3, 0.1))
+    plate.solve()
+    assert "symbolic" in plate.profile.phases
+    assert plate._pattern is not pattern
+    assert plate.KG.shape == (2*len(nodes) + 2,)*2
+
+
+def test_dense_pattern(truss):
+    truss.solve()
+    u = truss.u.copy()
+    for elm in truss.get_elements():
+        elm.E = 2*elm.E
+    truss.solve()
+    assert "symbolic" not in truss.profile.phases
+    assert np.allclose(truss.u, u/2)
+
+
+def test_sparse_truss_reuses_ordering():
+    m = build_truss()
+    m.sparse_matrix = True
+    m.solve()
+    u, ordering = m.u.copy(), m._ordering
+    assert m._solver == "scipy.sparse.linalg.splu" and ordering is not None
+    for elm in m.get_elements():
+        elm.E = 2*elm.E
+    m.solve()
+    assert m._ordering is ordering
+    assert np.allclose(m.u, u/2)
@@ -0,0 +1,21 @@
+import numpy as np
+
+from conftest import build_plate
+
+
+def test_threaded_assembly_matches_serial():
+    serial = build_plate()
+    serial.build_global_matrix()
+    m = build_plate()
+    m.n_workers, m.chunksize = 4, 10 # many chunks on 4 threads
+    m.build_global_matrix()
+    assert np.array_equal(m.get_element_matrices(), serial.get_element_matrices())
+    assert abs(m.KG - serial.KG).max() == 0.0
+
+
+def test_threaded_solve(plate):
+    ref = build_plate()
+    ref.solve()
+    plate.n_workers, plate.chunksize = 2, 25
+    plate.solve()
+    assert np.allclose(plate.u, ref.u)
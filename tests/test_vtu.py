@@ -0,0 +1,75 @@
+import base64
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from nusa import Node, Truss, TrussModel, Substructure, Superelement
+from nusa.io import write_vtu, PVDWriter
+from conftest import build_plate, build_truss, panel_model
+
+
+def read_cells(fname):
+    """
+    Cell arrays of a base64 .vtu file (meshio skips polyvertex cells)
+    """
+    root = ET.parse(fname).getroot()
+    data = root.find("AppendedData").text.strip()[1:]
+    dtypes = {"Int64": "<i8", "UInt8": "u1"}
+    cells = {}
+    for arr in root.iter("DataArray"):
+        if arr.get("Name") in ("connectivity", "offsets", "types"):
+            start = int(arr.get("offset"))
+            size = np.frombuffer(base64.b64decode(data[start:start+12])[:8], "<u8")[0]
+            block = base64.b64decode(data[start:start+4*((size+8+2)//3)])
+            cells[arr.get("Name")] = np.frombuffer(block[8:], dtypes[arr.get("type")])
+    return cells
+
+
+@pytest.mark.parametrize("encoding", ["raw", "base64"])
+def test_vtu_round_trip(tmp_path, encoding):
+    meshio = pytest.importorskip("meshio")
+    m = build_plate()
+    m.solve()
+    fname = str(tmp_path/"plate.vtu")
+    write_vtu(m, fname, encoding)
+    with open(fname, "rb") as fobj:
+        assert b'byte_order="LittleEndian"' in fobj.read(200) # whatever the platform
+    mesh = meshio.read(fname)
+    assert np.allclose(mesh.points[:,:2], m.get_coordinates())
+    assert np.array_equal(mesh.cells_dict["triangle"], m.get_connectivity())
+    assert np.allclose(mesh.point_data["displacement"][:,0], m.get_nsol("ux"))
+    assert np.allclose(mesh.point_data["seqv"].ravel(), m.get_nsol("seqv"))
+
+
+def test_vtu_mixed_elements(tmp_path):
+    panel, boundary = panel_model()
+    sub = Substructure(panel, boundary)
+    m = TrussModel("tower")
+    nodes = [Node((0,0)), Node((1,0)), Node((0,1)), Node((1,1)), Node((0.5,2))]
+    for nd in nodes:
+        m.add_node(nd)
+    m.add_element(Superelement(tuple(nodes[:4]), sub))
+    m.add_element(Truss((nodes[2],nodes[4]), 200e9, 1e-4))
+    m.add_element(Truss((nodes[3],nodes[4]), 200e9, 1e-4))
+    for nd in nodes[:2]:
+        m.add_constraint(nd, ux=0, uy=0)
+    m.add_force(nodes[4], (1000, 0))
+    m.solve()
+    fname = str(tmp_path/"tower.vtu")
+    write_vtu(m, fname, "base64")
+    cells = read_cells(fname)
+    assert np.array_equal(cells["connectivity"], [0,1,2,3, 2,4, 3,4])
+    assert np.array_equal(cells["offsets"], [4,6,8])
+    assert np.array_equal(cells["types"], [2,3,3]) # VTK_POLY_VERTEX, VTK_LINE
+
+
+def test_pvd_steps(tmp_path):
+    m = build_truss()
+    m.solve()
+    pvd = PVDWriter(str(tmp_path/"truss.pvd"))
+    pvd.add(m, 0.0)
+    pvd.add(m, 1.0)
+    pvd.close()
+    text = (tmp_path/"truss.pvd").read_text()
+    assert text.count("<DataSet") == 2